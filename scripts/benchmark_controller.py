@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Benchmark the batched geometric controller.
+
+Builds batches of randomized drones (Phase 3: ±15% gains, ±10% mass/inertia),
+feeds them random hover-neighbourhood states and reports commands/second for
+one batched call versus a per-drone Python loop.
+
+Usage:
+    python scripts/benchmark_controller.py
+    python scripts/benchmark_controller.py --batch_sizes 1 64 1024 --repeats 200
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.control.geometric_controller import GeometricController
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark batched geometric controller throughput")
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 16, 128, 512, 2048],
+                        help="Numbers of drones per call")
+    parser.add_argument("--repeats", type=int, default=100, help="Timed calls per batch size")
+    parser.add_argument("--loop_drones", type=int, default=128, help="Drones in the per-drone loop baseline")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    return parser.parse_args()
+
+
+def random_batch(rng, n):
+    """Random states near hover and a reference at the origin."""
+    quat = np.concatenate([np.ones((n, 1)), rng.normal(0.0, 0.1, (n, 3))], axis=1)
+    quat /= np.linalg.norm(quat, axis=1, keepdims=True)
+    state = {
+        'odom_pos': rng.uniform(-1.0, 1.0, (n, 3)),
+        'odom_vel': rng.normal(0.0, 1.0, (n, 3)),
+        'odom_quat': quat,
+        'imu_gyro': rng.normal(0.0, 0.5, (n, 3)),
+    }
+    reference = {
+        'position': np.zeros((n, 3)),
+        'velocity': np.zeros((n, 3)),
+        'acceleration': np.zeros((n, 3)),
+        'yaw': rng.uniform(-np.pi, np.pi, n),
+    }
+    return state, reference
+
+
+def main():
+    """Run the benchmark."""
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    print("=" * 80)
+    print("Geometric controller benchmark - commands per second")
+    print("=" * 80)
+
+    for n in args.batch_sizes:
+        controller = GeometricController.randomized(n, rng)
+        state, reference = random_batch(rng, n)
+        controller.compute(state, reference)  # warm-up
+
+        t0 = time.perf_counter()
+        for _ in range(args.repeats):
+            controller.compute(state, reference)
+        per_call = (time.perf_counter() - t0) / args.repeats
+        print(f"  N = {n:5d} | {per_call * 1e6:9.1f} us/call | {n / per_call:12,.0f} commands/s")
+
+    # Baseline: the same drones one at a time
+    n = args.loop_drones
+    controllers = [GeometricController.randomized(1, rng) for _ in range(n)]
+    state, reference = random_batch(rng, n)
+    singles = [({k: v[i:i + 1] for k, v in state.items()}, {k: v[i:i + 1] for k, v in reference.items()})
+               for i in range(n)]
+    t0 = time.perf_counter()
+    for _ in range(max(1, args.repeats // 10)):
+        for ctrl, (s, r) in zip(controllers, singles):
+            ctrl.compute(s, r)
+    per_sweep = (time.perf_counter() - t0) / max(1, args.repeats // 10)
+    print("-" * 80)
+    print(f"  Per-drone loop baseline (N = {n}): {n / per_sweep:12,.0f} commands/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Benchmark random-access sampling from episode shards.
+
+Writes a synthetic dataset (default 8 episodes x 10 s at 20 Hz, 480x640
+depth) once with LZ4 blocks and once raw, then draws uniformly random
+(episode, t) samples of K = 4 depth frames plus odometry and actions, both
+directly and through the multi-process EpisodeLoader.
+
+Usage:
+    python scripts/benchmark_dataset.py
+    python scripts/benchmark_dataset.py --episodes 200 --height 240 --width 320
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.dataset.loader import EpisodeLoader
+from src.dataset.reader import EpisodeDataset
+from src.dataset.shards import ShardWriter
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark memory-mapped dataset sampling")
+    parser.add_argument("--episodes", type=int, default=8, help="Episodes written")
+    parser.add_argument("--duration", type=float, default=10.0, help="Episode length in seconds")
+    parser.add_argument("--height", type=int, default=480, help="Depth image height")
+    parser.add_argument("--width", type=int, default=640, help="Depth image width")
+    parser.add_argument("--window", type=int, default=4, help="Depth frames per sample (K)")
+    parser.add_argument("--samples", type=int, default=5000, help="Random samples drawn")
+    parser.add_argument("--batch", type=int, default=64, help="Batch size for batched sampling")
+    parser.add_argument("--workers", type=int, default=2, help="EpisodeLoader worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    return parser.parse_args()
+
+
+def synthetic_episode(rng, seed, steps, height, width):
+    """Smooth depth (compressible like rendered scenes) plus odometry/actions."""
+    rows = np.linspace(1.0, 30.0, height, dtype=np.float32)[:, None]
+    base = np.broadcast_to(rows, (height, width))
+    depth = base[None] + rng.normal(0.0, 0.01, (steps, 1, width)).astype(np.float32).round(2)
+    return {
+        'scene_family': 'forest',
+        'seed': seed,
+        'difficulty': ('easy', 'medium', 'hard')[seed % 3],
+        'qc': {'feasible': True},
+        'timestamp': np.arange(steps) * 0.05,
+        'depth': depth,
+        'odom_pos': rng.normal(size=(steps, 3)),
+        'odom_vel': rng.normal(size=(steps, 3)),
+        'odom_quat': np.tile([1.0, 0.0, 0.0, 0.0], (steps, 1)),
+        'action': rng.normal(size=(steps, 4)).astype(np.float32),
+    }
+
+
+def run(dataset, indices, batch):
+    """Samples/s for single-sample views and for stacked batches."""
+    t0 = time.perf_counter()
+    for index in indices:
+        dataset[int(index)]['depth'].sum()          # touch the pages
+    single = indices.size / (time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    for start in range(0, indices.size, batch):
+        dataset.sample_batch(indices[start:start + batch])
+    batched = indices.size / (time.perf_counter() - t0)
+    return single, batched
+
+
+def main():
+    """Run the benchmark."""
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    steps = int(args.duration * 20)
+
+    print("=" * 80)
+    print(f"Dataset sampling benchmark - {args.episodes} episodes x {steps} steps, "
+          f"{args.height}x{args.width} depth, K={args.window}")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for compression in ('lz4', 'none'):
+            root = Path(tmp) / compression
+            t0 = time.perf_counter()
+            with ShardWriter(root, max_episodes=32, compression=compression) as writer:
+                for seed in range(args.episodes):
+                    writer.write_episode(synthetic_episode(rng, seed, steps, args.height, args.width))
+            write_s = time.perf_counter() - t0
+            size_mb = writer.bytes_written / 1e6
+
+            dataset = EpisodeDataset(root, window=args.window)
+            indices = rng.integers(0, len(dataset), size=args.samples)
+            single, batched = run(dataset, indices, args.batch)
+            print(f"  {compression:>4}: {size_mb:8.1f} MB written in {write_s:5.2f} s | "
+                  f"{single:10,.0f} samples/s single | {batched:10,.0f} samples/s batch {args.batch} | "
+                  f"{dataset.stats['decompressed_bytes'] / 1e6:,.0f} MB decompressed")
+            dataset.close()
+
+            # Prefetching loader: workers decode, the consumer only waits on the queue
+            with EpisodeLoader(root, batch_size=args.batch, window=args.window,
+                               num_workers=args.workers, seed=args.seed) as loader:
+                t0 = time.perf_counter()
+                count = 0
+                for batch in loader:
+                    count += len(batch['t'])
+                    if count >= args.samples:
+                        break
+                elapsed = time.perf_counter() - t0
+                print(f"        EpisodeLoader x{args.workers}: {count / elapsed:10,.0f} samples/s | "
+                      f"consumer waited {loader.stats['wait_s'] / elapsed:5.1%} of the time")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Benchmark kinodynamic A* and B-spline optimization across all scene families.
+
+Builds a synthetic obstacle field for each family in scenes_config.yaml
+(extent and obstacle count drawn from the family's size_range and asset
+count_range), plans corner-to-corner, and reports nodes expanded, search
+time, B-spline optimization time and a warm-started re-optimization (as run
+by the 10 Hz replanner) per plan.
+
+Usage:
+    python scripts/benchmark_planner.py
+    python scripts/benchmark_planner.py --plans 10 --resolution 0.25
+"""
+
+import argparse
+import importlib
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.planning.mapping.esdf_builder import EsdfMap
+
+# 'global' is a Python keyword, so the subpackage is imported by name
+bspline_optimizer = importlib.import_module("src.planning.global.bspline_optimizer")
+trajectory_planner = importlib.import_module("src.planning.global.trajectory_planner")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark kinodynamic A* per scene family")
+    parser.add_argument("--config", type=str, default="config/env/scenes_config.yaml",
+                        help="Path to scenes configuration file")
+    parser.add_argument("--plans", type=int, default=5, help="Plans per family (random start/goal)")
+    parser.add_argument("--resolution", type=float, default=0.2, help="ESDF voxel size in metres")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    return parser.parse_args()
+
+
+def build_family_map(family_cfg, resolution, rng):
+    """Rasterize a random box field sized from the family config into an ESDF."""
+    size_lo, size_hi = (np.asarray(s, dtype=float) for s in family_cfg['dimensions']['size_range'])
+    size = rng.uniform(size_lo, size_hi)
+    num_obstacles = sum(int(rng.integers(a['count_range'][0], a['count_range'][1] + 1))
+                        for a in family_cfg.get('assets', []))
+
+    # Shrink footprints in dense families so obstacles cover at most ~25% of the floor
+    max_half = float(np.clip(0.5 * np.sqrt(0.25 * size[0] * size[1] / max(num_obstacles, 1)), 0.25, 1.0))
+
+    esdf = EsdfMap(size_m=size, resolution=resolution)
+    lo_world = esdf.origin
+    for _ in range(num_obstacles):
+        center = lo_world + rng.uniform([0, 0, 0], size)
+        half = rng.uniform([0.1, 0.1, 0.5], [max_half, max_half, size[2] / 2])
+        center[2] = half[2]  # Obstacles stand on the ground
+        lo = np.clip(esdf.world_to_index(center - half), 0, esdf.shape)
+        hi = np.clip(esdf.world_to_index(center + half) + 1, 0, esdf.shape)
+        esdf.occupied[lo[0]:hi[0], lo[1]:hi[1], lo[2]:hi[2]] = True
+    return esdf, size, num_obstacles
+
+
+def sample_free_point(esdf, size, rng, corner, margin=1.0):
+    """Random point near a map corner with clearance from obstacles."""
+    for _ in range(1000):
+        frac = rng.uniform(0.02, 0.15, size=2)
+        xy = np.where(corner, 1.0 - frac, frac) * size[:2]
+        point = esdf.origin + np.array([xy[0], xy[1], min(1.5, size[2] / 2)])
+        if esdf.query(point[None])[0] >= margin:
+            return point
+    return None
+
+
+def main():
+    """Run the benchmark."""
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    with open(args.config, 'r') as f:
+        families = yaml.safe_load(f)['scene_families']
+
+    print("=" * 80)
+    print("Planner benchmark - A* search, B-spline optimization, warm re-optimization")
+    print("=" * 80)
+
+    all_times, all_opt, all_warm = [], [], []
+    for name, family_cfg in families.items():
+        if not family_cfg.get('enabled', True):
+            continue
+        esdf, size, count = build_family_map(family_cfg, args.resolution, rng)
+        esdf.rebuild()
+
+        results = []
+        for _ in range(args.plans):
+            start = sample_free_point(esdf, size, rng, corner=np.array([False, False]))
+            goal = sample_free_point(esdf, size, rng, corner=np.array([True, True]))
+            if start is None or goal is None:
+                continue
+            t0 = time.perf_counter()
+            result = trajectory_planner.plan_trajectory({'position': start}, {'position': goal}, esdf)
+            elapsed = time.perf_counter() - t0
+
+            warm = np.nan
+            if result.success:
+                optimizer = bspline_optimizer.BsplineOptimizer(esdf=esdf)
+                initial = bspline_optimizer.UniformBspline.from_trajectory(result.path)
+                warm = optimizer.optimize(initial, warm_start=result.trajectory.control_points).optimize_time_s
+            results.append((result.success, result.nodes_expanded, elapsed, result.optimize_time_s, warm))
+
+        if not results:
+            print(f"  {name:10s} no free start/goal found")
+            continue
+        ok, nodes, times, opt, warm = (np.array(c) for c in zip(*results))
+        all_times.extend(times.tolist())
+        all_opt.extend(opt[ok].tolist())
+        all_warm.extend(warm[ok].tolist())
+        print(f"  {name:10s} {size[0]:4.0f}x{size[1]:4.0f}x{size[2]:4.1f} m, {count:4d} obstacles | "
+              f"success {ok.sum()}/{len(ok)} | nodes median {np.median(nodes):6.0f} | "
+              f"plan median {np.median(times) * 1e3:6.1f} ms max {times.max() * 1e3:6.1f} ms | "
+              f"opt median {np.median(opt[ok]) * 1e3:5.1f} ms warm {np.median(warm[ok]) * 1e3:5.1f} ms")
+
+    print("-" * 80)
+    print(f"  Overall median plan time: {np.median(all_times) * 1e3:.1f} ms  "
+          f"p95: {np.percentile(all_times, 95) * 1e3:.1f} ms")
+    print(f"  B-spline optimization median: {np.median(all_opt) * 1e3:.1f} ms  "
+          f"p95: {np.percentile(all_opt, 95) * 1e3:.1f} ms")
+    print(f"  Warm-started re-optimization median: {np.median(all_warm) * 1e3:.1f} ms  "
+          f"p95: {np.percentile(all_warm, 95) * 1e3:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
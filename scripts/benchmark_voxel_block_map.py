@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark the sparse voxel block map against a dense grid.
+
+Fills both stores with the surface voxels of a synthetic forest-like scene
+(the largest scenes_config.yaml extent, 50x50x10 m) and compares memory use,
+random-lookup latency and sliding-window eviction.
+
+Usage:
+    python scripts/benchmark_voxel_block_map.py
+    python scripts/benchmark_voxel_block_map.py --resolution 0.05 --queries 500000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.planning.mapping.voxel_block_map import VoxelBlockMap
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark sparse vs dense voxel storage")
+    parser.add_argument("--resolution", type=float, default=0.1, help="Voxel size in metres")
+    parser.add_argument("--block_size", type=int, default=8, help="Voxels per block edge")
+    parser.add_argument("--trees", type=int, default=80, help="Number of tree trunks in the scene")
+    parser.add_argument("--queries", type=int, default=200000, help="Random lookups per timing run")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    return parser.parse_args()
+
+
+def forest_surface_points(rng, num_trees, resolution, size=(50.0, 50.0, 10.0)):
+    """Surface samples of a ground plane patch and cylindrical trunks."""
+    points = []
+    for _ in range(num_trees):
+        cx, cy = rng.uniform(-size[0] / 2 + 1, size[0] / 2 - 1), rng.uniform(-size[1] / 2 + 1, size[1] / 2 - 1)
+        radius = rng.uniform(0.15, 0.5)
+        height = rng.uniform(3.0, size[2])
+        theta, z = np.meshgrid(np.linspace(0, 2 * np.pi, int(2 * np.pi * radius / resolution * 2) + 8),
+                               np.arange(0.0, height, resolution / 2))
+        points.append(np.stack([cx + radius * np.cos(theta), cy + radius * np.sin(theta), z], -1).reshape(-1, 3))
+    # Observed ground only along a corridor the drone flew through
+    gx, gy = np.meshgrid(np.arange(-size[0] / 2, size[0] / 2, resolution), np.arange(-3.0, 3.0, resolution))
+    points.append(np.stack([gx, gy, np.zeros_like(gx)], -1).reshape(-1, 3))
+    return np.concatenate(points)
+
+
+def main():
+    """Run the benchmark."""
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    size = np.array([50.0, 50.0, 10.0])
+    origin = np.array([-25.0, -25.0, 0.0])
+
+    points = forest_surface_points(rng, args.trees, args.resolution)
+    shape = tuple(int(n) for n in np.ceil(size / args.resolution))
+    # Index relative to the origin voxel exactly as the block map does
+    origin_voxel = np.floor(origin / args.resolution).astype(np.int64)
+
+    print("=" * 80)
+    print("Voxel storage benchmark - sparse block hash vs dense grid")
+    print("=" * 80)
+    print(f"  - Scene: 50x50x10 m @ {args.resolution} m, {points.shape[0]} surface samples")
+    print(f"  - Dense grid: {shape} = {np.prod(shape) / 1e6:.1f} M voxels")
+    print(f"  - Block size: {args.block_size}^3 voxels")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    dense = np.zeros(shape, dtype=np.float32)
+    idx = np.floor(points / args.resolution).astype(np.int64) - origin_voxel
+    inside = np.all((idx >= 0) & (idx < shape), axis=1)
+    dense[tuple(idx[inside].T)] = 1.0
+    dense_fill = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sparse = VoxelBlockMap(resolution=args.resolution, block_size=args.block_size)
+    sparse.set(points[inside], 1.0)
+    sparse_fill = time.perf_counter() - start
+
+    print(f"  Memory   dense: {dense.nbytes / 2**20:8.1f} MiB   sparse: {sparse.memory_bytes() / 2**20:8.1f} MiB "
+          f"({sparse.num_blocks} blocks)")
+    print(f"  Fill     dense: {dense_fill * 1e3:8.1f} ms    sparse: {sparse_fill * 1e3:8.1f} ms")
+
+    # Queries concentrated near the drone, as the planner issues them
+    drone = np.array([0.0, 0.0, 2.0])
+    queries = drone + rng.normal(scale=[4.0, 4.0, 1.0], size=(args.queries, 3))
+    queries = np.clip(queries, origin, origin + size - 1e-6)
+
+    start = time.perf_counter()
+    qi = np.floor(queries / args.resolution).astype(np.int64) - origin_voxel
+    dense_vals = dense[tuple(qi.T)]
+    dense_query = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sparse_vals = sparse.get(queries)
+    sparse_query = time.perf_counter() - start
+
+    mismatch = int(np.count_nonzero(dense_vals != sparse_vals))
+    print(f"  Lookup   dense: {dense_query / args.queries * 1e9:8.1f} ns/q  sparse: "
+          f"{sparse_query / args.queries * 1e9:8.1f} ns/q  (mismatches: {mismatch})")
+
+    start = time.perf_counter()
+    evicted = sparse.evict_outside(drone, half_extent_m=(10.0, 10.0, 5.0))
+    evict_time = time.perf_counter() - start
+    print(f"  Evict    {evicted} blocks outside a 20x20x10 m window in {evict_time * 1e3:.1f} ms "
+          f"-> {sparse.num_blocks} blocks live")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
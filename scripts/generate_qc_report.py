@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Run timestep/episode/dataset QC over the dataset shards.
+
+One streaming pass (``src/analysis/qc.py``) scores every indexed episode
+and writes ``<name>_episodes.parquet`` (per-episode scores and the
+``passed`` flag) and ``<name>_scorecard.json`` (dataset checks plus a
+per-family breakdown) to ``--output``. Thresholds come from the
+``validation`` block of ``sensors.yaml`` and the Phase 5 plan.
+
+Usage:
+    python scripts/generate_qc_report.py
+    python scripts/generate_qc_report.py --dataset data/dataset --difficulty hard --name hard_v1
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import yaml
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.analysis.qc import TIMESTEP_CHECKS, QcEngine, QcThresholds
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate the QC scorecard of a dataset")
+    parser.add_argument("--dataset", type=str, default=str(project_root / "data/dataset"), help="Dataset root")
+    parser.add_argument("--sensors", type=str, default=str(project_root / "config/env/sensors.yaml"),
+                        help="Sensor config with the validation thresholds")
+    parser.add_argument("--output", type=str, default=str(project_root / "data/qc/scorecards"),
+                        help="Scorecard directory")
+    parser.add_argument("--name", type=str, default=None, help="Scorecard name (default: qc_<timestamp>)")
+    parser.add_argument("--difficulty", type=str, default=None, choices=["easy", "medium", "hard"],
+                        help="Only episodes of this difficulty")
+    return parser.parse_args()
+
+
+def _mark(ok: bool) -> str:
+    return "✓" if ok else "✗"
+
+
+def main():
+    """Score the dataset and print the scorecard."""
+    args = parse_args()
+    with open(args.sensors, 'r') as f:
+        thresholds = QcThresholds.from_config(yaml.safe_load(f))
+    filters = [('difficulty', '=', args.difficulty)] if args.difficulty else None
+
+    print("=" * 80)
+    print(f"QC scorecard - {args.dataset}")
+    print("=" * 80)
+    scorecard = QcEngine(thresholds).run(args.dataset, args.output, name=args.name, filters=filters)
+    episodes, dataset = scorecard['episodes'], scorecard['dataset']
+    if not episodes['episodes']:
+        print("No episodes indexed")
+        return 1
+
+    print(f"\nEpisodes: {episodes['accepted']}/{episodes['episodes']} accepted "
+          f"({episodes['acceptance_rate']:.1%}); rejected for duration: {episodes['rejected']['duration']}, "
+          f"completeness: {episodes['rejected']['completeness']}")
+    print("Timestep failures: " + ", ".join(f"{name} {episodes['timestep_fail_frac'][name]:.2%}"
+                                            for name in TIMESTEP_CHECKS))
+    print(f"\n{'family':<12}{'episodes':>10}{'accepted':>10}{'failures':>10}")
+    for family, summary in scorecard['scene_families'].items():
+        print(f"{family:<12}{summary['episodes']:>10d}{summary['accepted']:>10d}{summary['outcome_failures']:>10d}")
+
+    low, high = thresholds.failure_rate_range
+    print(f"\n{_mark(dataset['failure_rate_ok'])} failure rate {dataset['failure_rate']:.1%} (target {low:.0%}-{high:.0%})")
+    print(f"{_mark(dataset['scene_families_ok'])} scene families {dataset['num_scene_families']} "
+          f"(min {thresholds.min_scene_families})")
+    print(f"{_mark(dataset['family_balance_ok'])} largest family share {dataset['max_family_fraction']:.1%} "
+          f"(max {thresholds.max_family_fraction:.0%}), entropy {dataset['family_entropy']:.2f}")
+    print(f"\n✓ Scorecard: {scorecard['files']['scorecard']}")
+    print(f"✓ Episode scores: {scorecard['files']['episodes']}")
+    return 0 if dataset['passed'] else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Generate procedural scene descriptions for one or all scene families.
+
+Every (family, seed) pair becomes a backend-neutral JSON description
+(``src/sim/scene_generator.py``) written to ``--output`` together with a
+``manifest.jsonl`` listing family, seed, config hash, description hash and
+validation result. Generation is deterministic, so the full 10 x 50 set is
+identical on every machine; ``--workers`` only changes the wall time.
+
+Seeds follow ``generation.random_seed_base`` from ``scenes_config.yaml``:
+family scenes use seeds ``base .. base + count - 1``.
+
+With ``--esdf`` the ground-truth ESDF of every scene is precomputed into the
+scene cache (``<scene_cache_dir>/esdf``), where ``IsaacSimEnvironment`` and
+the planning/QC tools memory-map it instead of mapping from depth.
+
+Usage:
+    python scripts/generate_scenes.py                          # all families, 50 each
+    python scripts/generate_scenes.py --family forest --count 5 --seed 100
+    python scripts/generate_scenes.py --workers 8 --output data/raw/scenes/descriptions
+    python scripts/generate_scenes.py --esdf --cache-dir data/raw/scenes/cache
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.sim.scene_cache import SceneCache, load_scene_configs
+from src.sim.scene_esdf import load_scene_esdf
+from src.sim.scene_generator import generate_scenes, scene_to_json
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate procedural scene descriptions")
+    parser.add_argument("--config", type=str, default=str(project_root / "config/env/scenes_config.yaml"),
+                        help="Scenes config file")
+    parser.add_argument("--family", type=str, nargs="+", default=None,
+                        help="Scene families to generate (default: all enabled)")
+    parser.add_argument("--count", type=int, default=None,
+                        help="Scenes per family (default: generation.scenes_per_family)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="First seed (default: generation.random_seed_base)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", type=str, default=str(project_root / "data/raw/scenes/descriptions"),
+                        help="Output directory")
+    parser.add_argument("--esdf", action="store_true", help="Precompute ground-truth ESDF maps")
+    parser.add_argument("--cache-dir", type=str, default=str(project_root / "data/raw/scenes/cache"),
+                        help="Scene cache directory (ESDF maps go to <cache-dir>/esdf)")
+    return parser.parse_args()
+
+
+def main():
+    """Generate the scenes and write the manifest."""
+    args = parse_args()
+    config = load_scene_configs(args.config)
+    families = config.get('scene_families', {})
+    generation = config.get('generation', {})
+    count = args.count if args.count is not None else int(generation.get('scenes_per_family', 50))
+    first_seed = args.seed if args.seed is not None else int(generation.get('random_seed_base', 42))
+    min_free = float(generation.get('validation', {}).get('min_free_space_percent', 0)) / 100.0
+
+    names = args.family or [name for name, family in families.items() if family.get('enabled', True)]
+    unknown = [name for name in names if name not in families]
+    if unknown:
+        print(f"Unknown scene families: {', '.join(unknown)} (available: {', '.join(families)})")
+        return 1
+
+    tasks = [(name, seed, families[name]) for name in names for seed in range(first_seed, first_seed + count)]
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    global_config = config.get('global', {})
+    esdf_cache = SceneCache(Path(args.cache_dir) / "esdf", extension='.npy',
+                            budget_mb=global_config.get('scene_cache_budget_mb', 20480)) if args.esdf else None
+
+    print("=" * 80)
+    print(f"Scene generation - {len(names)} families x {count} scenes, seeds {first_seed}..{first_seed + count - 1}")
+    print("=" * 80)
+
+    manifest, invalid = [], 0
+    t0 = time.perf_counter()
+    for done, scene in enumerate(generate_scenes(tasks, workers=args.workers), 1):
+        name = f"{scene['scene_family']}_seed{scene['seed']}"
+        (output / f"{name}.json").write_text(scene_to_json(scene))
+        valid = scene['navigable'] and scene['free_fraction'] >= min_free
+        invalid += not valid
+        if esdf_cache is not None:
+            load_scene_esdf(esdf_cache, scene['scene_family'], scene['seed'], families[scene['scene_family']],
+                            scene=scene, resolution=global_config.get('scene_esdf_resolution', 0.2),
+                            truncation_m=global_config.get('scene_esdf_truncation_m', 2.0))
+        manifest.append({
+            'scene_family': scene['scene_family'],
+            'seed': scene['seed'],
+            'difficulty': scene['difficulty'],
+            'config_hash': scene['config_hash'],
+            'description_hash': scene['description_hash'],
+            'num_primitives': len(scene['primitives']['kind']),
+            'free_fraction': scene['free_fraction'],
+            'navigable': scene['navigable'],
+            'valid': valid,
+            'file': f"{name}.json",
+        })
+        if done % 25 == 0 or done == len(tasks):
+            elapsed = time.perf_counter() - t0
+            eta = elapsed / done * (len(tasks) - done)
+            print(f"  {done:4d}/{len(tasks)} scenes | {elapsed:6.1f} s elapsed | ETA {eta:6.1f} s")
+
+    with open(output / "manifest.jsonl", 'w') as f:
+        for row in manifest:
+            f.write(json.dumps(row, sort_keys=True) + "\n")
+
+    print(f"\n✓ {len(manifest)} scenes written to {output} in {time.perf_counter() - t0:.1f} s")
+    if esdf_cache is not None:
+        print(f"✓ ESDF maps: {esdf_cache.stats['stores']} built, {esdf_cache.stats['hits']} already cached "
+              f"({esdf_cache.size_bytes() / 1e6:.0f} MB in {esdf_cache.cache_dir})")
+    if invalid:
+        print(f"⚠ {invalid} scenes failed validation (navigable endpoints, "
+              f">= {min_free:.0%} free space); see manifest.jsonl")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,190 @@
-"""Execute planning stack against configured scenarios."""
+#!/usr/bin/env python3
+"""Execute planning stack against configured scenarios.
+
+Every (scene family, seed) pair is one job: the scene is generated, its
+ground-truth ESDF mapped (or loaded from the scene cache), the global
+planner plans start -> goal and the geometric controller flies the plan in
+the simulator (``src/sim/episode_runner.py``). Jobs run on a process pool
+with a per-episode timeout; finished episodes stream into the dataset shards
+and their trajectory metrics (one ``episodes`` row per job, ``timesteps``
+columns per recorded step) into the QC metrics store under ``data/qc/metrics``.
+
+Completed job ids are committed to ``<output>/checkpoint.jsonl`` after each
+shard flush, so rerunning the same command after a crash resumes where it
+stopped. Failed and timed-out jobs are not committed and run again; episodes
+already in the shard index but missing from the checkpoint (a crash between
+flush and commit) are committed on resume instead of being recorded twice.
+
+Usage:
+    python scripts/run_planner.py                                # all families, 50 seeds each
+    python scripts/run_planner.py --family office maze --count 5
+    python scripts/run_planner.py --difficulty hard --workers 16 --timeout 300
+    python scripts/run_planner.py --esdf-cache data/raw/scenes/cache/esdf
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# One BLAS/OpenMP thread per worker: the pool already uses every core
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.dataset.shards import ShardWriter, load_index
+from src.sim.episode_runner import (CHECKPOINT_FILE, EpisodeConfig, EpisodeJob, EpisodeResult, EpisodeScheduler,
+                                    expand_jobs, run_episode)
+from src.sim.scene_cache import load_scene_configs
+from tools.logging_utils import configure_metrics_store, record_metrics
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Run the planning stack over scene families and seeds")
+    parser.add_argument("--config", type=str, default=str(project_root / "config/env/scenes_config.yaml"),
+                        help="Scenes config file")
+    parser.add_argument("--family", type=str, nargs="+", default=None,
+                        help="Scene families (default: all enabled)")
+    parser.add_argument("--difficulty", type=str, nargs="+", default=None, choices=["easy", "medium", "hard"],
+                        help="Only families of these difficulties")
+    parser.add_argument("--count", type=int, default=None,
+                        help="Seeds per family (default: generation.scenes_per_family)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="First seed (default: generation.random_seed_base)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Wall-clock limit per episode in seconds")
+    parser.add_argument("--retries", type=int, default=1, help="Re-runs of a failed or timed-out episode")
+    parser.add_argument("--output", type=str, default=str(project_root / "data/dataset"),
+                        help="Dataset root (shards, index and checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=10,
+                        help="Episodes between shard flushes / checkpoint commits")
+    parser.add_argument("--esdf-cache", type=str, default=None,
+                        help="Ground-truth ESDF cache directory (default: map every scene in memory)")
+    parser.add_argument("--metrics", type=str, default=str(project_root / "data/qc/metrics"),
+                        help="QC metrics store directory")
+    parser.add_argument("--run-id", type=str, default=None,
+                        help="Metrics partition of this run (default: start timestamp)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and run every job")
+    return parser.parse_args()
+
+
+def commit_flushed_episodes(scheduler: EpisodeScheduler, output: Path, jobs) -> int:
+    """Commit jobs whose episode reached the shard index but not the checkpoint.
+
+    A crash between ``writer.flush()`` and ``scheduler.commit()`` leaves such
+    episodes behind; rerunning their jobs would store them twice.
+    """
+    index = load_index(output, columns=['scene_family', 'seed', 'difficulty'])
+    if not index.num_rows:
+        return 0
+    data = index.to_pydict()
+    persisted = {EpisodeJob(family, seed, difficulty).job_id
+                 for family, seed, difficulty in zip(data['scene_family'], data['seed'], data['difficulty'])}
+    flushed = [EpisodeResult(job, 'ok') for job in jobs
+               if job.job_id in persisted - scheduler.completed_ids()]
+    scheduler.commit(flushed)
+    return len(flushed)
+
 
 def main():
-    # TODO: Load configs, spin up planner nodes, and collect trajectory metrics
-    return None
+    """Run the sweep and stream the results."""
+    args = parse_args()
+    config = load_scene_configs(args.config)
+    families = config.get('scene_families', {})
+    generation = config.get('generation', {})
+    global_config = config.get('global', {})
+    count = args.count if args.count is not None else int(generation.get('scenes_per_family', 50))
+    first_seed = args.seed if args.seed is not None else int(generation.get('random_seed_base', 42))
+
+    unknown = [name for name in args.family or [] if name not in families]
+    if unknown:
+        print(f"Unknown scene families: {', '.join(unknown)} (available: {', '.join(families)})")
+        return 1
+    jobs = expand_jobs(families, args.family, range(first_seed, first_seed + count), args.difficulty)
+    if not jobs:
+        print("No jobs match the selected families/difficulties")
+        return 1
+
+    output = Path(args.output)
+    checkpoint = output / CHECKPOINT_FILE
+    if args.restart and checkpoint.exists():
+        checkpoint.unlink()
+    episode_config = EpisodeConfig(
+        scene_families=families,
+        esdf_cache_dir=args.esdf_cache,
+        esdf_resolution=global_config.get('scene_esdf_resolution', 0.2),
+        esdf_truncation_m=global_config.get('scene_esdf_truncation_m', 2.0),
+    )
+    scheduler = EpisodeScheduler(run_episode, (episode_config,), workers=args.workers,
+                                 timeout_s=args.timeout, max_retries=args.retries,
+                                 checkpoint_path=checkpoint)
+    recovered = 0 if args.restart else commit_flushed_episodes(scheduler, output, jobs)
+    metrics_store = configure_metrics_store(root=args.metrics, run_id=args.run_id)
+    remaining = len(jobs) - len(scheduler.completed_ids() & {job.job_id for job in jobs})
+
+    print("=" * 80)
+    print(f"Planner sweep - {len(jobs)} episodes ({remaining} to run), {scheduler.workers} workers, "
+          f"timeout {args.timeout:.0f} s")
+    if recovered:
+        print(f"Committed {recovered} episode(s) flushed to the shards by an interrupted run")
+    print("=" * 80)
+
+    statuses, uncommitted = {}, []
+    t0 = time.perf_counter()
+    with ShardWriter(output) as writer:
+        for done, result in enumerate(scheduler.run(jobs), 1):
+            statuses[result.status] = statuses.get(result.status, 0) + 1
+            if result.episode is not None:
+                row = writer.write_episode(result.episode)
+                result.metrics['episode_id'] = row['episode_id']
+                steps = len(result.per_step['timestamp'])
+                record_metrics({**result.per_step, 'episode_id': np.full(steps, row['episode_id']),
+                                'seed': np.full(steps, result.job.seed)},
+                               table='timesteps', scene_family=result.job.scene_family)
+            job = result.job
+            record_metrics(result.metrics or {'job_id': job.job_id, 'scene_family': job.scene_family,
+                                              'seed': job.seed, 'difficulty': job.difficulty,
+                                              'status': result.status})
+            if result.status in ('error', 'timeout'):
+                print(f"  ✗ {result.job.job_id}: {result.status} after {result.attempts} attempt(s)")
+                if result.error:
+                    print("    " + result.error.strip().splitlines()[-1])
+            uncommitted.append(result)
+
+            if len(uncommitted) >= args.checkpoint_every or done == remaining:
+                writer.flush()
+                metrics_store.flush()
+                scheduler.commit(uncommitted)
+                uncommitted = []
+                elapsed = time.perf_counter() - t0
+                eta = elapsed / done * (remaining - done)
+                print(f"  {done:4d}/{remaining} episodes | {elapsed:7.1f} s elapsed | ETA {eta:7.1f} s")
+        writer.flush()
+        metrics_store.close()                     # flush and compact this run's checkpoint files
+        scheduler.commit(uncommitted)
+
+    elapsed = time.perf_counter() - t0
+    print(f"\n✓ {sum(statuses.values())} episodes in {elapsed:.1f} s "
+          f"({sum(statuses.values()) / max(elapsed, 1e-9) * 3600:.0f} episodes/h)")
+    print("  " + ", ".join(f"{status}: {n}" for status, n in sorted(statuses.items())))
+    print(f"  skipped (checkpoint): {scheduler.stats['skipped']}, retries: {scheduler.stats['retries']}, "
+          f"timeouts: {scheduler.stats['timeouts']}")
+    print(f"✓ Dataset: {output}")
+    if metrics_store.rows_written:
+        print(f"✓ Metrics: {metrics_store.root} (run {metrics_store.run_id})")
+        rates = metrics_store.failure_rate(runs=[metrics_store.run_id])
+        jerk = metrics_store.percentile('jerk', 95, table='timesteps', runs=[metrics_store.run_id])
+        for family, rate in rates.items():
+            print(f"  {family:<12} failure rate {rate:6.1%} | p95 jerk {jerk.get(family, float('nan')):8.2f} m/s³")
+    return 0
+
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,367 @@
+"""Three-level quality control of recorded episodes (Phase 5).
+
+One pass over the shards evaluates, per episode:
+
+    - **timestep QC**: boolean masks over the T steps for sensor validity
+      (fraction of invalid depth pixels, IMU and odometry ranges, position
+      jumps from ``sensors.yaml`` ``validation``), dynamic feasibility and
+      tracking error (``evaluate_metrics`` per-step values)
+    - **episode QC**: duration and completeness (valid steps over the steps
+      expected at the record rate), plus the outcome flags stored in the index
+    - **dataset QC**: failure rate (episodes whose run failed, e.g. a
+      collision) inside the target band and scene diversity (families
+      present, largest family share, normalized entropy)
+
+Episodes are visited in shard order and read column by column through
+``EpisodeDataset`` (depth in chunks of ``depth_chunk_rows`` frames, or the
+recorded ``depth_invalid_frac`` column of ``SensorValidator`` when the
+episode has one, which skips decoding depth altogether), so the
+working set is one episode's low-rate columns plus one depth chunk however
+large the dataset is. Per-episode scores are streamed to
+``<name>_episodes.parquet``; the run scorecard (dataset level, per-family
+breakdown and thresholds) goes to ``<name>_scorecard.json``.
+
+Example:
+    >>> engine = QcEngine(QcThresholds.from_config(sensor_config))
+    >>> report = engine.run('data/dataset', output_dir='data/qc/scorecards')
+    >>> report['dataset']['passed'], report['episodes']['accepted']
+    >>> accepted = accepted_episode_ids(report['files']['episodes'])
+"""
+
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.analysis.trajectory_metrics import MAX_ACCELERATION, MAX_VELOCITY, evaluate_metrics
+from src.dataset.reader import EpisodeDataset
+from src.dataset.shards import load_index
+
+GRAVITY = 9.81
+TIMESTEP_CHECKS = ('depth', 'imu', 'odometry', 'feasibility', 'tracking')
+OUTCOME_FLAGS = ('qc_collision_free', 'qc_reached_goal')   # run outcome (fall back to qc_passed)
+LOW_RATE_COLUMNS = ('timestamp', 'odom_pos', 'odom_vel', 'imu_accel', 'imu_gyro', 'ref_pos')
+
+
+@dataclass(frozen=True)
+class QcThresholds:
+    """Limits of the three QC levels (defaults: Phase 5 plan and sensors.yaml)."""
+
+    # Timestep
+    max_invalid_pixels_frac: float = 0.20
+    min_valid_depth_m: float = 0.1
+    max_valid_depth_m: float = 30.0
+    max_accel_m_s2: float = 20 * GRAVITY
+    max_gyro_rad_s: float = math.radians(2500)
+    max_sensor_velocity_m_s: float = 35.0
+    max_position_jump_m: float = 1.0
+    max_velocity_m_s: float = MAX_VELOCITY        # dynamic feasibility
+    max_acceleration_m_s2: float = MAX_ACCELERATION
+    max_tracking_error_m: float = 1.0
+    # Episode
+    min_duration_s: float = 5.0
+    min_completeness: float = 0.95
+    record_rate_hz: float = 20.0
+    # Dataset
+    failure_rate_range: tuple = (0.10, 0.15)
+    min_scene_families: int = 10
+    max_family_fraction: float = 0.2
+
+    @classmethod
+    def from_config(cls, sensor_config: Dict, **overrides) -> 'QcThresholds':
+        """Thresholds from the ``validation`` block of sensors.yaml (plus overrides)."""
+        validation = sensor_config.get('validation', {})
+        depth = validation.get('depth_camera', {})
+        imu = validation.get('imu', {})
+        odometry = validation.get('odometry', {})
+        defaults = cls()
+        kwargs = dict(
+            max_invalid_pixels_frac=depth.get('max_invalid_pixels_percent', 100 * defaults.max_invalid_pixels_frac) / 100.0,
+            min_valid_depth_m=depth.get('min_valid_depth_m', defaults.min_valid_depth_m),
+            max_valid_depth_m=depth.get('max_valid_depth_m', defaults.max_valid_depth_m),
+            max_accel_m_s2=imu['max_accel_g'] * GRAVITY if 'max_accel_g' in imu else defaults.max_accel_m_s2,
+            max_gyro_rad_s=math.radians(imu['max_gyro_deg_s']) if 'max_gyro_deg_s' in imu else defaults.max_gyro_rad_s,
+            max_sensor_velocity_m_s=odometry.get('max_velocity_m_s', defaults.max_sensor_velocity_m_s),
+            max_position_jump_m=odometry.get('max_position_jump_m', defaults.max_position_jump_m),
+        )
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+
+def timestep_masks(columns: Dict[str, np.ndarray], thresholds: QcThresholds,
+                   depth_invalid_frac: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Per-step pass masks (T,) of one episode, one per ``TIMESTEP_CHECKS`` entry.
+
+    Checks whose inputs are missing pass. ``depth_invalid_frac`` is the
+    fraction of invalid pixels per frame (see ``depth_invalid_fraction``).
+    """
+    limits = thresholds
+    n = len(columns['timestamp'])
+    ok = np.ones(n, dtype=bool)
+    masks = {name: ok.copy() for name in TIMESTEP_CHECKS}
+
+    if depth_invalid_frac is not None:
+        masks['depth'] = depth_invalid_frac <= limits.max_invalid_pixels_frac
+    if 'imu_accel' in columns:
+        masks['imu'] &= np.linalg.norm(columns['imu_accel'], axis=1) <= limits.max_accel_m_s2
+    if 'imu_gyro' in columns:
+        masks['imu'] &= np.linalg.norm(columns['imu_gyro'], axis=1) <= limits.max_gyro_rad_s
+    if 'odom_vel' in columns:
+        masks['odometry'] &= np.linalg.norm(columns['odom_vel'], axis=1) <= limits.max_sensor_velocity_m_s
+    if 'odom_pos' in columns:
+        jump = np.zeros(n)
+        jump[1:] = np.linalg.norm(np.diff(columns['odom_pos'], axis=0), axis=1)
+        masks['odometry'] &= jump <= limits.max_position_jump_m
+
+        per_step = evaluate_metrics(columns, max_vel=limits.max_velocity_m_s,
+                                    max_acc=limits.max_acceleration_m_s2)['per_step']
+        masks['feasibility'] = ~(per_step['vel_violation'] | per_step['acc_violation'])
+        tracking = per_step['tracking_error']
+        masks['tracking'] = ~(tracking > limits.max_tracking_error_m)      # NaN (no reference) passes
+    for name in TIMESTEP_CHECKS:
+        ok &= masks[name]
+    masks['valid'] = ok
+    return masks
+
+
+def depth_invalid_fraction(depth: np.ndarray, thresholds: QcThresholds) -> np.ndarray:
+    """Fraction of pixels per frame that are non-finite or outside the valid range."""
+    depth = np.asarray(depth)
+    valid = np.isfinite(depth) & (depth >= thresholds.min_valid_depth_m) & (depth <= thresholds.max_valid_depth_m)
+    return 1.0 - valid.reshape(depth.shape[0], -1).mean(axis=1)
+
+
+class QcEngine:
+    """Streaming timestep/episode/dataset QC over episode shards."""
+
+    def __init__(self, thresholds: Optional[QcThresholds] = None,
+                 depth_chunk_rows: int = 64,
+                 cache_mb: float = 64.0,
+                 batch_rows: int = 1024):
+        """Initialize the engine.
+
+        Args:
+            thresholds: QC limits (default: ``QcThresholds()``)
+            depth_chunk_rows: Depth frames decoded at a time
+            cache_mb: Decompressed-frame cache of the shard reader
+            batch_rows: Episode score rows buffered per Parquet row group
+        """
+        self.thresholds = thresholds or QcThresholds()
+        self.depth_chunk_rows = int(depth_chunk_rows)
+        self.cache_mb = float(cache_mb)
+        self.batch_rows = int(batch_rows)
+
+    # ------------------------------------------------------------------
+    # Episode level
+    # ------------------------------------------------------------------
+
+    def score_episodes(self, root='data/dataset', filters=None) -> Iterator[Dict]:
+        """Yield one score row per indexed episode, in shard order."""
+        index = load_index(root, filters=filters)
+        if not index.num_rows:
+            return
+        names = index.column_names
+        columns = [c for c in LOW_RATE_COLUMNS + ('depth_invalid_frac', 'depth') if f"{c}_offset" in names]
+        dataset = EpisodeDataset(root, index=index, window=1, columns=columns, cache_mb=self.cache_mb)
+        flags = [c for c in OUTCOME_FLAGS if c in names] or [c for c in ('qc_passed',) if c in names]
+        meta = index.select([c for c in ('episode_id', 'scene_family', 'seed', 'difficulty', 'offset')
+                             if c in names] + flags).to_pydict()
+        order = np.lexsort((np.asarray(meta.get('offset', np.zeros(index.num_rows))), dataset.episode_shard))
+        try:
+            for episode in order:
+                yield self._score(dataset, int(episode), {key: values[episode] for key, values in meta.items()})
+        finally:
+            dataset.close()
+
+    def _score(self, dataset: EpisodeDataset, episode: int, meta: Dict) -> Dict:
+        limits = self.thresholds
+        num_steps = int(dataset.num_steps[episode])
+        columns = {name: np.asarray(dataset.column(episode, name), dtype=np.float64)
+                   for name in LOW_RATE_COLUMNS if name in dataset.blocks and dataset.blocks[name][0][episode] >= 0}
+        if 'timestamp' not in columns:
+            columns['timestamp'] = np.arange(num_steps) / limits.record_rate_hz
+
+        depth_frac = None
+        if 'depth_invalid_frac' in dataset.blocks and dataset.blocks['depth_invalid_frac'][0][episode] >= 0:
+            depth_frac = np.asarray(dataset.column(episode, 'depth_invalid_frac'), dtype=np.float64).reshape(-1)
+        elif 'depth' in dataset.blocks and dataset.blocks['depth'][0][episode] >= 0:
+            depth_frac = np.concatenate([
+                depth_invalid_fraction(dataset.rows(episode, 'depth', start, start + self.depth_chunk_rows), limits)
+                for start in range(0, num_steps, self.depth_chunk_rows)]) if num_steps else np.zeros(0)
+
+        masks = timestep_masks(columns, limits, depth_frac)
+        times = columns['timestamp']
+        duration = float(times[-1] - times[0]) if num_steps else 0.0
+        expected = max(int(round(duration * limits.record_rate_hz)) + 1, num_steps, 1)
+        completeness = float(masks['valid'].sum()) / expected
+        outcome_ok = all(meta[flag] is not False for flag in OUTCOME_FLAGS + ('qc_passed',) if flag in meta)
+
+        row = {
+            'episode_id': int(meta['episode_id']),
+            'scene_family': meta.get('scene_family'),
+            'seed': meta.get('seed'),
+            'difficulty': meta.get('difficulty'),
+            'num_steps': num_steps,
+            'duration_s': duration,
+            'completeness': completeness,
+            **{f"{name}_fail_frac": float(1.0 - masks[name].mean()) if num_steps else 0.0
+               for name in TIMESTEP_CHECKS},
+            'max_depth_invalid_frac': float(depth_frac.max()) if depth_frac is not None and num_steps else None,
+            'duration_ok': duration >= limits.min_duration_s,
+            'completeness_ok': completeness >= limits.min_completeness,
+            'outcome_ok': outcome_ok,
+        }
+        row['passed'] = row['duration_ok'] and row['completeness_ok']
+        return row
+
+    # ------------------------------------------------------------------
+    # Run
+    # ------------------------------------------------------------------
+
+    def run(self, root='data/dataset', output_dir='data/qc/scorecards',
+            name: Optional[str] = None, filters=None) -> Dict:
+        """Evaluate every episode and write the episode scores and the scorecard.
+
+        Args:
+            root: Dataset root
+            output_dir: Directory of ``<name>_episodes.parquet`` and ``<name>_scorecard.json``
+            name: Run name (default: ``qc_<timestamp>``)
+            filters: Optional pyarrow filters on the index
+
+        Returns:
+            The scorecard dict (also written as JSON)
+        """
+        name = name or time.strftime('qc_%Y%m%d_%H%M%S')
+        output = Path(output_dir)
+        output.mkdir(parents=True, exist_ok=True)
+        episodes_path = output / f"{name}_episodes.parquet"
+        tmp = episodes_path.with_name(episodes_path.name + '.tmp')
+
+        t0 = time.perf_counter()
+        totals = _Totals()
+        families: Dict[str, _Totals] = defaultdict(_Totals)
+        writer, batch = None, []
+        try:
+            for row in self.score_episodes(root, filters):
+                totals.add(row)
+                families[str(row['scene_family'])].add(row)
+                batch.append(row)
+                if len(batch) >= self.batch_rows:
+                    writer = _write_batch(writer, tmp, batch)
+                    batch = []
+            if batch or writer is None:
+                writer = _write_batch(writer, tmp, batch)
+        finally:
+            if writer is not None:
+                writer.close()
+        os.replace(tmp, episodes_path)
+
+        scorecard = {
+            'name': name,
+            'dataset_root': str(root),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'elapsed_s': round(time.perf_counter() - t0, 3),
+            'thresholds': asdict(self.thresholds),
+            'episodes': totals.summary(),
+            'scene_families': {family: t.summary() for family, t in sorted(families.items())},
+            'dataset': self._dataset_level(totals, families),
+            'files': {'episodes': str(episodes_path), 'scorecard': str(output / f"{name}_scorecard.json")},
+        }
+        scorecard_path = output / f"{name}_scorecard.json"
+        with open(scorecard_path.with_name(scorecard_path.name + '.tmp'), 'w') as f:
+            json.dump(scorecard, f, indent=2, sort_keys=True)
+        os.replace(scorecard_path.with_name(scorecard_path.name + '.tmp'), scorecard_path)
+        return scorecard
+
+    def _dataset_level(self, totals: '_Totals', families: Dict[str, '_Totals']) -> Dict:
+        limits = self.thresholds
+        low, high = limits.failure_rate_range
+        counts = np.array([t.episodes for t in families.values()], dtype=np.float64)
+        shares = counts / counts.sum() if counts.size else counts
+        entropy = float(-(shares * np.log(shares)).sum() / np.log(len(shares))) if len(shares) > 1 else 0.0
+        failure_rate = totals.outcome_failures / totals.episodes if totals.episodes else 0.0
+        checks = {
+            'failure_rate_ok': low <= failure_rate <= high,
+            'scene_families_ok': len(families) >= limits.min_scene_families,
+            'family_balance_ok': bool(shares.size) and float(shares.max()) <= limits.max_family_fraction,
+        }
+        return {
+            'failure_rate': failure_rate,
+            'num_scene_families': len(families),
+            'max_family_fraction': float(shares.max()) if shares.size else 0.0,
+            'family_entropy': entropy,
+            **checks,
+            'passed': all(checks.values()),
+        }
+
+
+class _Totals:
+    """Running counts of episode scores (constant size)."""
+
+    def __init__(self):
+        self.episodes = 0
+        self.accepted = 0
+        self.outcome_failures = 0
+        self.steps = 0
+        self.rejected = dict.fromkeys(('duration', 'completeness'), 0)
+        self.failed_steps = dict.fromkeys(TIMESTEP_CHECKS, 0.0)
+
+    def add(self, row: Dict):
+        self.episodes += 1
+        self.accepted += row['passed']
+        self.outcome_failures += not row['outcome_ok']
+        self.steps += row['num_steps']
+        self.rejected['duration'] += not row['duration_ok']
+        self.rejected['completeness'] += not row['completeness_ok']
+        for name in TIMESTEP_CHECKS:
+            self.failed_steps[name] += row[f"{name}_fail_frac"] * row['num_steps']
+
+    def summary(self) -> Dict:
+        return {
+            'episodes': self.episodes,
+            'accepted': self.accepted,
+            'acceptance_rate': self.accepted / self.episodes if self.episodes else 0.0,
+            'outcome_failures': self.outcome_failures,
+            'rejected': dict(self.rejected),
+            'timesteps': self.steps,
+            'timestep_fail_frac': {name: failed / self.steps if self.steps else 0.0
+                                   for name, failed in self.failed_steps.items()},
+        }
+
+
+def _score_schema():
+    import pyarrow as pa
+
+    fields = [('episode_id', pa.int64()), ('scene_family', pa.string()), ('seed', pa.int64()),
+              ('difficulty', pa.string()), ('num_steps', pa.int64()), ('duration_s', pa.float64()),
+              ('completeness', pa.float64())]
+    fields += [(f"{name}_fail_frac", pa.float64()) for name in TIMESTEP_CHECKS]
+    fields += [('max_depth_invalid_frac', pa.float64()), ('duration_ok', pa.bool_()),
+               ('completeness_ok', pa.bool_()), ('outcome_ok', pa.bool_()), ('passed', pa.bool_())]
+    return pa.schema(fields)
+
+
+def _write_batch(writer, path: Path, rows: List[Dict]):
+    """Append score rows as one row group (opening the writer on the first batch)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = writer.schema if writer is not None else _score_schema()
+    if writer is None:
+        writer = pq.ParquetWriter(path, schema)
+    writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+    return writer
+
+
+def accepted_episode_ids(episodes_path) -> np.ndarray:
+    """Ids of the episodes that passed episode QC in a ``<name>_episodes.parquet``."""
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(episodes_path, columns=['episode_id'], filters=[('passed', '=', True)])
+    return np.asarray(table.column('episode_id').to_numpy(), dtype=np.int64)
@@ -1,5 +1,193 @@
-"""Trajectory metric calculations."""
+"""Trajectory metric calculations.
 
-def evaluate_metrics(trajectory):
-    # TODO: Compute jerk, clearance, and tracking error statistics
-    return None
+Metrics are computed on columnar arrays: one flat array per quantity with an
+optional ``episode_id`` column, so a whole shard is scored in a handful of
+vectorized passes instead of a Python loop per episode or timestep.
+Finite differences never cross episode boundaries (one-sided at both ends).
+
+Example:
+    >>> metrics = evaluate_metrics({'timestamp': t, 'odom_pos': pos, 'ref_pos': ref}, esdf=esdf)
+    >>> metrics['episodes']['tracking_rms'], metrics['per_step']['clearance']
+"""
+
+from typing import Dict, Mapping, Optional
+
+import numpy as np
+
+# Phase 2 feasibility limits (docs/plan.md)
+MAX_VELOCITY = 30.0
+MAX_ACCELERATION = 10.0
+
+
+def _as_columns(trajectory) -> Dict[str, np.ndarray]:
+    """Concatenate a list of per-episode dicts into one columnar dict."""
+    if isinstance(trajectory, Mapping):
+        return {key: np.asarray(value) for key, value in trajectory.items()}
+    episodes = list(trajectory)
+    columns = {}
+    for key in episodes[0]:
+        if key == 'episode_id' or np.ndim(episodes[0][key]) == 0:
+            continue
+        columns[key] = np.concatenate([np.asarray(ep[key]) for ep in episodes])
+    # A scalar episode_id labels every row of its episode; the list position
+    # is only used when an episode carries no id
+    columns['episode_id'] = np.concatenate([
+        np.repeat(ep.get('episode_id', i), len(ep['odom_pos'])) if np.ndim(ep.get('episode_id', i)) == 0
+        else np.asarray(ep['episode_id'])
+        for i, ep in enumerate(episodes)])
+    return columns
+
+
+def _segment_gradient(values: np.ndarray, times: np.ndarray, first: np.ndarray, last: np.ndarray) -> np.ndarray:
+    """d(values)/dt per row, central inside episodes and one-sided at their ends.
+
+    Each row differences its neighbours ``prev``/``next``, which are clamped
+    to the row itself at episode boundaries; one gather covers every episode.
+
+    Args:
+        values: (T,) or (T, D) samples
+        times: (T,) timestamps
+        first: (T,) bool, row starts an episode
+        last: (T,) bool, row ends an episode
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rows = np.arange(values.shape[0])
+    prev = rows - ~first
+    nxt = rows + ~last
+    span = times[nxt] - times[prev]
+    scale = np.divide(1.0, span, out=np.zeros_like(span), where=span > 0)
+    return (values[nxt] - values[prev]) * scale.reshape((-1,) + (1,) * (values.ndim - 1))
+
+
+def _clearance(positions: np.ndarray, episode_index: np.ndarray, episode_keys: np.ndarray, esdf) -> np.ndarray:
+    """Trilinear ESDF clearance per row.
+
+    ``esdf`` is one map, a sequence with one map per episode, or a dict keyed
+    by episode id; rows sharing a map are looked up in a single batch.
+    """
+    if esdf is None:
+        return np.full(positions.shape[0], np.nan)
+    if hasattr(esdf, 'interpolate'):
+        return esdf.interpolate(positions)
+
+    maps = [esdf[key] for key in episode_keys.tolist()] if isinstance(esdf, Mapping) else list(esdf)
+    groups: Dict[int, int] = {}
+    group_of_episode = np.array([groups.setdefault(id(m), len(groups)) for m in maps])
+    distinct = list({id(m): m for m in maps}.values())
+
+    out = np.full(positions.shape[0], np.nan)
+    row_group = group_of_episode[episode_index]
+    for group, esdf_map in enumerate(distinct):
+        rows = row_group == group
+        if rows.any():
+            out[rows] = esdf_map.interpolate(positions[rows])
+    return out
+
+
+def evaluate_metrics(trajectory,
+                     esdf=None,
+                     max_vel: float = MAX_VELOCITY,
+                     max_acc: float = MAX_ACCELERATION,
+                     dt: Optional[float] = None) -> Dict[str, Dict[str, np.ndarray]]:
+    """Compute jerk, clearance, feasibility and tracking-error statistics.
+
+    Args:
+        trajectory: Columnar dict (or list of per-episode dicts) with
+            ``odom_pos`` (T, 3) and optionally ``timestamp`` (T,),
+            ``odom_vel`` (T, 3), ``ref_pos`` (T, 3) and ``episode_id`` (T,)
+            (rows of one episode contiguous and in time order)
+        esdf: Map exposing ``interpolate(points)`` (e.g. EsdfMap, or the
+            precomputed ground-truth map of the episode's scene from
+            ``src.sim.scene_esdf.load_scene_esdf``), a sequence with one map
+            per episode (in episode order), a dict keyed by episode id, or None
+        max_vel: Speed limit in m/s
+        max_acc: Acceleration limit in m/s²
+        dt: Sample period used when there is no ``timestamp`` column
+
+    Returns:
+        Dict with ``per_step`` arrays (T,) and ``episodes`` arrays (E,)
+    """
+    columns = _as_columns(trajectory)
+    pos = np.asarray(columns['odom_pos'], dtype=np.float64).reshape(-1, 3)
+    n = pos.shape[0]
+    if 'timestamp' in columns:
+        times = np.asarray(columns['timestamp'], dtype=np.float64).reshape(-1)
+    else:
+        times = np.arange(n) * (dt if dt is not None else 0.05)
+    episode_ids = np.asarray(columns.get('episode_id', np.zeros(n, dtype=np.int64))).reshape(-1)
+
+    # Episode boundaries (contiguous runs of equal episode_id)
+    first = np.ones(n, dtype=bool)
+    first[1:] = episode_ids[1:] != episode_ids[:-1]
+    last = np.ones(n, dtype=bool)
+    last[:-1] = first[1:]
+    starts = np.flatnonzero(first)
+    episode_index = np.cumsum(first) - 1
+    counts = np.diff(np.append(starts, n))
+
+    # Derivatives: velocity (measured if available), acceleration, jerk
+    if 'odom_vel' in columns:
+        vel = np.asarray(columns['odom_vel'], dtype=np.float64).reshape(-1, 3)
+    else:
+        vel = _segment_gradient(pos, times, first, last)
+    acc = _segment_gradient(vel, times, first, last)
+    jerk = _segment_gradient(acc, times, first, last)
+
+    speed = np.linalg.norm(vel, axis=1)
+    acc_norm = np.linalg.norm(acc, axis=1)
+    jerk_norm = np.linalg.norm(jerk, axis=1)
+    clearance = _clearance(pos, episode_index, episode_ids[starts], esdf)
+    if 'ref_pos' in columns:
+        tracking = np.linalg.norm(pos - np.asarray(columns['ref_pos'], dtype=np.float64).reshape(-1, 3), axis=1)
+    else:
+        tracking = np.full(n, np.nan)
+
+    vel_violation = speed > max_vel
+    acc_violation = acc_norm > max_acc
+
+    # Sample weights for time integrals (half intervals on each side)
+    step_dt = np.zeros(n)
+    gaps = np.diff(times) * ~last[:-1]
+    step_dt[:-1] += 0.5 * gaps
+    step_dt[1:] += 0.5 * gaps
+
+    def total(values):
+        return np.bincount(episode_index, weights=values, minlength=starts.size)
+
+    def reduce_max(values):
+        return np.maximum.reduceat(values, starts)
+
+    def reduce_min(values):
+        return np.minimum.reduceat(values, starts)
+
+    duration = times[np.flatnonzero(last)] - times[starts]
+    episodes = {
+        'episode_id': episode_ids[starts],
+        'num_steps': counts,
+        'duration_s': duration,
+        'path_length_m': total(np.append(np.linalg.norm(np.diff(pos, axis=0), axis=1) * ~last[:-1], 0.0)),
+        'max_speed': reduce_max(speed),
+        'mean_speed': total(speed) / counts,
+        'max_accel': reduce_max(acc_norm),
+        'max_jerk': reduce_max(jerk_norm),
+        'mean_jerk': total(jerk_norm) / counts,
+        'jerk_cost': total(jerk_norm ** 2 * step_dt),       # ∫|j|² dt
+        'vel_violation_frac': total(vel_violation.astype(np.float64)) / counts,
+        'acc_violation_frac': total(acc_violation.astype(np.float64)) / counts,
+        'feasible': total((vel_violation | acc_violation).astype(np.float64)) == 0,
+        'min_clearance': reduce_min(clearance),
+        'mean_clearance': total(clearance) / counts,
+        'tracking_rms': np.sqrt(total(tracking ** 2) / counts),
+        'tracking_max': reduce_max(tracking),
+    }
+    per_step = {
+        'episode_id': episode_ids,
+        'speed': speed,
+        'accel': acc_norm,
+        'jerk': jerk_norm,
+        'clearance': clearance,
+        'tracking_error': tracking,
+        'vel_violation': vel_violation,
+        'acc_violation': acc_violation,
+    }
+    return {'per_step': per_step, 'episodes': episodes}
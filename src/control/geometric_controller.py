@@ -1,5 +1,232 @@
-"""Geometric controller placeholder implementation."""
+"""Batched SE(3) geometric controller (Lee, Leok & McClamroch, 2010).
 
-def compute_control_commands(state, reference):
-    # TODO: Generate thrust and attitude commands with gain randomization
-    return None
+Every quantity is stacked over N drones, so one call produces commands for a
+whole batch of randomized vehicles (Phase 3: ±15% gains, ±10% mass/inertia).
+Gains and vehicle parameters are per-drone arrays; attitude gains are
+expressed as angular accelerations and scaled by each drone's inertia, so the
+same nominal gains stay well-behaved across perturbed vehicles.
+
+Conventions:
+    - World frame is z-up, quaternions are (w, x, y, z) as in Isaac Lab.
+    - Angular velocity is in the body frame (``imu_gyro``).
+    - Outputs are collective thrust (N), body torque (N·m) and the desired
+      attitude as both a rotation matrix and a quaternion.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from src.planning.mapping.depth_projection import quat_to_rotation_matrix
+from tools.profiling import profiled
+
+GRAVITY = 9.81
+
+
+@dataclass(frozen=True)
+class QuadrotorParams:
+    """Nominal vehicle parameters."""
+
+    mass: float = 1.0                                     # kg
+    inertia: Sequence[float] = (0.0075, 0.0075, 0.013)    # kg·m², diagonal
+    max_thrust_to_weight: float = 2.5
+
+
+@dataclass(frozen=True)
+class ControllerGains:
+    """Nominal per-axis gains (acceleration units, independent of mass/inertia)."""
+
+    position: Sequence[float] = (6.0, 6.0, 8.0)           # 1/s²
+    velocity: Sequence[float] = (4.0, 4.0, 5.0)           # 1/s
+    attitude: Sequence[float] = (120.0, 120.0, 30.0)      # 1/s²
+    angular_rate: Sequence[float] = (20.0, 20.0, 8.0)     # 1/s
+
+
+def rotation_matrix_to_quat(rot: np.ndarray) -> np.ndarray:
+    """Convert (..., 3, 3) rotation matrices to (..., 4) quaternions (w, x, y, z).
+
+    Uses the numerically stable branch per matrix (largest diagonal term).
+    """
+    rot = np.asarray(rot, dtype=np.float64)
+    m = rot.reshape(-1, 3, 3)
+    m00, m11, m22 = m[:, 0, 0], m[:, 1, 1], m[:, 2, 2]
+    candidates = np.stack([
+        np.stack([1 + m00 + m11 + m22, m[:, 2, 1] - m[:, 1, 2], m[:, 0, 2] - m[:, 2, 0], m[:, 1, 0] - m[:, 0, 1]], -1),
+        np.stack([m[:, 2, 1] - m[:, 1, 2], 1 + m00 - m11 - m22, m[:, 0, 1] + m[:, 1, 0], m[:, 0, 2] + m[:, 2, 0]], -1),
+        np.stack([m[:, 0, 2] - m[:, 2, 0], m[:, 0, 1] + m[:, 1, 0], 1 - m00 + m11 - m22, m[:, 1, 2] + m[:, 2, 1]], -1),
+        np.stack([m[:, 1, 0] - m[:, 0, 1], m[:, 0, 2] + m[:, 2, 0], m[:, 1, 2] + m[:, 2, 1], 1 - m00 - m11 + m22], -1),
+    ], axis=1)                                                 # (N, 4 branches, 4)
+    branch = np.argmax(np.stack([m00 + m11 + m22, m00, m11, m22], -1), axis=1)
+    quat = candidates[np.arange(m.shape[0]), branch]
+    quat /= np.linalg.norm(quat, axis=1, keepdims=True)
+    quat *= np.where(quat[:, :1] < 0, -1.0, 1.0)
+    return quat.reshape(rot.shape[:-2] + (4,))
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cross product of (N, 3) arrays (cheaper than np.cross for small N)."""
+    out = np.empty_like(a)
+    out[:, 0] = a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1]
+    out[:, 1] = a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2]
+    out[:, 2] = a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+    return out
+
+
+def _vee(skew: np.ndarray) -> np.ndarray:
+    """(N, 3, 3) skew-symmetric matrices to (N, 3) vectors."""
+    return np.stack([skew[:, 2, 1], skew[:, 0, 2], skew[:, 1, 0]], axis=-1)
+
+
+def _stack(values, num: int, width: Optional[int] = 3) -> np.ndarray:
+    """Broadcast a scalar/per-axis/per-drone value to (N, width) or (N,)."""
+    shape = (num,) if width is None else (num, width)
+    return np.array(np.broadcast_to(np.asarray(values, dtype=np.float64), shape))
+
+
+class GeometricController:
+    """SE(3) tracking controller over a batch of N drones.
+
+    Example:
+        >>> ctrl = GeometricController.randomized(256, rng=np.random.default_rng(0))
+        >>> cmd = ctrl.compute(state, reference)
+        >>> cmd['thrust'].shape, cmd['torque'].shape
+        ((256,), (256, 3))
+    """
+
+    def __init__(self, num_drones: int,
+                 params: Optional[QuadrotorParams] = None,
+                 gains: Optional[ControllerGains] = None,
+                 mass=None, inertia=None,
+                 kx=None, kv=None, kr=None, kw=None):
+        """Initialize the batch.
+
+        Args:
+            num_drones: Batch size N
+            params: Nominal vehicle parameters
+            gains: Nominal gains
+            mass: Optional per-drone mass (N,) overriding ``params``
+            inertia: Optional per-drone diagonal inertia (N, 3)
+            kx, kv, kr, kw: Optional per-drone gains (N, 3) overriding ``gains``
+        """
+        params = params or QuadrotorParams()
+        gains = gains or ControllerGains()
+        n = int(num_drones)
+        self.num_drones = n
+        self.params = params
+
+        self.mass = _stack(params.mass if mass is None else mass, n, None)
+        self.inertia = _stack(params.inertia if inertia is None else inertia, n)
+        self.kx = _stack(gains.position if kx is None else kx, n)
+        self.kv = _stack(gains.velocity if kv is None else kv, n)
+        self.kr = _stack(gains.attitude if kr is None else kr, n)
+        self.kw = _stack(gains.angular_rate if kw is None else kw, n)
+
+    @classmethod
+    def randomized(cls, num_drones: int, rng: Optional[np.random.Generator] = None,
+                   gain_scale: float = 0.15, mass_scale: float = 0.10, inertia_scale: float = 0.10,
+                   params: Optional[QuadrotorParams] = None,
+                   gains: Optional[ControllerGains] = None) -> 'GeometricController':
+        """Batch with gains and model parameters drawn uniformly around nominal.
+
+        Defaults follow Phase 3: ±15% gains, ±10% mass/inertia. Each gain
+        vector is scaled by one factor per drone and gain group.
+        """
+        rng = rng or np.random.default_rng()
+        params = params or QuadrotorParams()
+        gains = gains or ControllerGains()
+        n = int(num_drones)
+
+        def scale(value, spread, width=3):
+            factor = rng.uniform(1.0 - spread, 1.0 + spread, size=(n, 1) if width else n)
+            return _stack(value, n, width) * factor
+
+        return cls(n, params, gains,
+                   mass=scale(params.mass, mass_scale, None),
+                   inertia=scale(params.inertia, inertia_scale),
+                   kx=scale(gains.position, gain_scale), kv=scale(gains.velocity, gain_scale),
+                   kr=scale(gains.attitude, gain_scale), kw=scale(gains.angular_rate, gain_scale))
+
+    @profiled('controller.compute')
+    def compute(self, state: Dict, reference: Dict) -> Dict[str, np.ndarray]:
+        """Compute thrust/attitude commands for the whole batch.
+
+        Args:
+            state: Dict of (N, ...) arrays: ``odom_pos``, ``odom_vel``,
+                ``odom_quat`` and ``imu_gyro`` (``position``/``velocity``/
+                ``quat``/``angular_velocity`` are accepted too)
+            reference: Dict with ``position`` and optional ``velocity``,
+                ``acceleration`` (N, 3), ``yaw`` and ``yaw_rate`` (N,)
+
+        Returns:
+            Dict with ``thrust`` (N,), ``torque`` (N, 3), ``rot_des``
+            (N, 3, 3), ``quat_des`` (N, 4) and ``acc_des`` (N, 3)
+        """
+        n = self.num_drones
+        pos = np.asarray(state.get('odom_pos', state.get('position')), dtype=np.float64).reshape(n, 3)
+        vel = np.asarray(state.get('odom_vel', state.get('velocity')), dtype=np.float64).reshape(n, 3)
+        quat = state.get('odom_quat', state.get('quat'))
+        rot = quat_to_rotation_matrix(np.asarray(quat, dtype=np.float64).reshape(n, 4))
+        omega = state.get('imu_gyro', state.get('angular_velocity'))
+        omega = np.zeros((n, 3)) if omega is None else np.asarray(omega, dtype=np.float64).reshape(n, 3)
+
+        ref_pos = _stack(reference['position'], n)
+        ref_vel = _stack(reference.get('velocity', 0.0), n)
+        ref_acc = _stack(reference.get('acceleration', 0.0), n)
+        yaw = _stack(reference.get('yaw', 0.0), n, None)
+        yaw_rate = _stack(reference.get('yaw_rate', 0.0), n, None)
+
+        # Translational loop: desired acceleration including gravity compensation
+        acc_des = -self.kx * (pos - ref_pos) - self.kv * (vel - ref_vel) + ref_acc
+        acc_des[:, 2] += GRAVITY
+        acc_des[:, 2] = np.maximum(acc_des[:, 2], 0.1 * GRAVITY)  # never command inverted flight
+
+        # Desired attitude: b3 along the acceleration, heading from yaw
+        b3d = acc_des / np.linalg.norm(acc_des, axis=1, keepdims=True)
+        b1c = np.stack([np.cos(yaw), np.sin(yaw), np.zeros(n)], axis=1)
+        b2d = _cross(b3d, b1c)
+        b2d /= np.linalg.norm(b2d, axis=1, keepdims=True)
+        b1d = _cross(b2d, b3d)
+        rot_des = np.stack([b1d, b2d, b3d], axis=2)
+
+        max_thrust = self.params.max_thrust_to_weight * self.mass * GRAVITY
+        thrust = np.clip(self.mass * np.einsum('nd,nd->n', acc_des, rot[:, :, 2]), 0.0, max_thrust)
+
+        # Rotational loop on SO(3)
+        rd_t_r = np.einsum('nji,njk->nik', rot_des, rot)           # Rdᵀ R
+        e_r = 0.5 * _vee(rd_t_r - np.transpose(rd_t_r, (0, 2, 1)))
+        omega_des = np.zeros((n, 3))
+        omega_des[:, 2] = yaw_rate
+        e_w = omega - np.einsum('nji,njk,nk->ni', rot, rot_des, omega_des)  # ω - Rᵀ Rd ωd
+        torque = (self.inertia * (-self.kr * e_r - self.kw * e_w)
+                  + _cross(omega, self.inertia * omega))
+
+        return {
+            'thrust': thrust,
+            'torque': torque,
+            'rot_des': rot_des,
+            'quat_des': rotation_matrix_to_quat(rot_des),
+            'acc_des': acc_des,
+        }
+
+
+def compute_control_commands(state, reference, controller: Optional[GeometricController] = None) -> Dict[str, np.ndarray]:
+    """Generate thrust and attitude commands for one drone or a batch.
+
+    Args:
+        state: Observation dict (single drone (3,)/(4,) arrays or stacked (N, ...))
+        reference: Reference dict (see ``GeometricController.compute``)
+        controller: Batch controller carrying per-drone gains/parameters
+            (defaults to nominal gains for the inferred batch size)
+
+    Returns:
+        Command dict; single-drone inputs give unbatched outputs
+    """
+    pos = np.asarray(state.get('odom_pos', state.get('position')))
+    single = pos.ndim == 1
+    if controller is None:
+        controller = GeometricController(1 if single else pos.shape[0])
+    commands = controller.compute(state, reference)
+    if single:
+        commands = {key: value[0] for key, value in commands.items()}
+    return commands
@@ -0,0 +1 @@
+"""Episode dataset storage: shards, global index and readers."""
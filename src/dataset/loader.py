@@ -0,0 +1,266 @@
+"""Multi-process prefetching batch loader over the episode index.
+
+Subset selection (difficulty, scene families, QC pass, or any pyarrow
+filter) is pushed down to the ``episodes.parquet`` read, so excluded
+episodes never cost a shard read. Batch assembly (LZ4 decoding, K-frame
+window stacking) runs in worker processes that write straight into a ring
+of shared-memory batch slots; the consumer gets NumPy views of a finished
+slot while the workers fill the next ``prefetch`` ones.
+
+Example:
+    >>> loader = EpisodeLoader('data/dataset', batch_size=64, difficulty='hard',
+    ...                        scene_families=['forest', 'cave'], qc_passed=True)
+    >>> with loader:
+    ...     for batch in loader:            # views valid until the next batch
+    ...         train_step(batch['depth'], batch['action'])
+"""
+
+import json
+import multiprocessing as mp
+import time
+import traceback
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from src.dataset.reader import DEFAULT_COLUMNS, EpisodeDataset
+from src.dataset.shards import load_index
+
+
+def build_filters(difficulty=None, scene_families: Optional[Sequence[str]] = None,
+                  qc_passed: Optional[bool] = None, filters: Optional[List] = None) -> Optional[List]:
+    """Conjunctive pyarrow filter list for ``episodes.parquet``.
+
+    Args:
+        difficulty: One difficulty or a list of them
+        scene_families: Allowed scene families
+        qc_passed: Keep only episodes whose ``qc_passed`` equals this
+        filters: Extra ``(column, op, value)`` terms
+    """
+    terms = list(filters or [])
+    if difficulty is not None:
+        terms.append(('difficulty', 'in', [difficulty] if isinstance(difficulty, str) else list(difficulty)))
+    if scene_families is not None:
+        terms.append(('scene_family', 'in', list(scene_families)))
+    if qc_passed is not None:
+        terms.append(('qc_passed', '=', bool(qc_passed)))
+    return terms or None
+
+
+def _batch_columns(dataset: EpisodeDataset, shard_path: str) -> Dict[str, tuple]:
+    """(shape, dtype) of the batched columns present in one shard."""
+    with open(dataset.root / shard_path.replace('.bin', '.json'), 'r') as f:
+        columns = json.load(f)['columns']
+    return {name: (tuple(columns[name]['shape']), columns[name]['dtype'])
+            for name in ('timestamp',) + dataset.columns if name in columns}
+
+
+def _batch_layout(dataset: EpisodeDataset, batch_size: int) -> Dict[str, tuple]:
+    """(shape, dtype, byte offset) of every batch array inside one slot."""
+    fields = {'episode_id': ((), np.dtype(np.int64)), 't': ((), np.dtype(np.int64))}
+    if dataset.num_episodes:
+        columns = _batch_columns(dataset, dataset.shard_paths[0])
+        for path in dataset.shard_paths[1:]:
+            other = _batch_columns(dataset, path)
+            if other != columns:
+                raise ValueError(f"Shard '{path}' has batch columns {other}, but '{dataset.shard_paths[0]}' "
+                                 f"has {columns}; a loader needs one schema across its shards")
+        for name, (shape, dtype) in columns.items():
+            fields[name] = (((dataset.window,) + shape) if name == 'depth' else shape, np.dtype(dtype))
+    layout, offset = {}, 0
+    for name, (shape, dtype) in fields.items():
+        shape = (batch_size,) + shape
+        layout[name] = (shape, dtype, offset)
+        offset += -(-int(np.prod(shape)) * dtype.itemsize // 64) * 64
+    return layout
+
+
+def _slot_arrays(buffer, layout: Dict[str, tuple], rows: Optional[int] = None) -> Dict[str, np.ndarray]:
+    arrays = {}
+    for name, (shape, dtype, offset) in layout.items():
+        array = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        arrays[name] = array if rows is None else array[:rows]
+    return arrays
+
+
+def _fill(dataset: EpisodeDataset, indices: np.ndarray, arrays: Dict[str, np.ndarray]):
+    """Write the samples of ``indices`` into preallocated batch arrays."""
+    episodes, steps = dataset.locate(indices)
+    for position in np.argsort(episodes, kind='stable'):
+        sample = dataset.sample(int(episodes[position]), int(steps[position]))
+        for name, array in arrays.items():
+            if name in sample:
+                array[position] = sample[name]
+
+
+def _worker(root, filters, window, columns, cache_mb, layout, slot_names, tasks, results):
+    """Worker process: assemble batches into shared-memory slots."""
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    try:
+        dataset = EpisodeDataset(root, index=load_index(root, filters=filters), window=window,
+                                 columns=columns, cache_mb=cache_mb)
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            number, slot, indices = task
+            try:
+                _fill(dataset, indices, _slot_arrays(slots[slot].buf, layout, len(indices)))
+                results.put((number, slot, len(indices), None))
+            except Exception:
+                results.put((number, slot, len(indices), traceback.format_exc()))
+    finally:
+        for slot in slots:
+            slot.close()
+
+
+class EpisodeLoader:
+    """Shuffled batches of K-frame windows with filter pushdown and prefetching.
+
+    Batches are yielded in a deterministic order for a given ``seed`` and
+    epoch, independent of ``num_workers``. Arrays are views of a shared
+    slot and stay valid until the next batch is requested (copy to keep).
+    """
+
+    def __init__(self, root='data/dataset',
+                 batch_size: int = 64,
+                 window: int = 4,
+                 columns: Sequence[str] = DEFAULT_COLUMNS,
+                 difficulty=None,
+                 scene_families: Optional[Sequence[str]] = None,
+                 qc_passed: Optional[bool] = None,
+                 filters: Optional[List] = None,
+                 num_workers: int = 2,
+                 prefetch: int = 4,
+                 shuffle: bool = True,
+                 drop_last: bool = False,
+                 seed: int = 0,
+                 cache_mb: float = 256.0,
+                 start_method: Optional[str] = None):
+        """Initialize the loader (workers start on first iteration).
+
+        Args:
+            root: Dataset root
+            batch_size: Samples per batch
+            window: Depth frames per sample (K)
+            columns: Columns per sample (see ``EpisodeDataset``)
+            difficulty, scene_families, qc_passed, filters: Episode
+                predicates pushed down to the index read (``build_filters``)
+            num_workers: Worker processes (0 assembles batches in-process)
+            prefetch: Batches in flight (shared-memory slots)
+            shuffle: Random sample order per epoch
+            drop_last: Skip the final partial batch
+            seed: Base seed of the per-epoch permutation
+            cache_mb: Decoded-frame cache per worker
+            start_method: multiprocessing start method (platform default)
+        """
+        self.root = Path(root)
+        self.batch_size = int(batch_size)
+        self.filters = build_filters(difficulty, scene_families, qc_passed, filters)
+        self.num_workers = int(num_workers)
+        self.prefetch = max(1, int(prefetch))
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.cache_mb = cache_mb
+        self.start_method = start_method
+        self.epoch = 0
+
+        self.index = load_index(self.root, filters=self.filters)
+        self.dataset = EpisodeDataset(self.root, index=self.index, window=window,
+                                      columns=columns, cache_mb=cache_mb)
+        self.layout = _batch_layout(self.dataset, self.batch_size)
+        self.stats = {'batches': 0, 'wait_s': 0.0}
+
+        self._slots: List[shared_memory.SharedMemory] = []
+        self._workers: List = []
+        self._tasks = self._results = None
+        self._inflight = 0
+
+    def __len__(self) -> int:
+        full, rest = divmod(len(self.dataset), self.batch_size)
+        return full + (1 if rest and not self.drop_last else 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def batches(self, epoch: int) -> List[np.ndarray]:
+        """Sample indices of every batch of ``epoch``."""
+        order = np.arange(len(self.dataset))
+        if self.shuffle:
+            order = np.random.default_rng([self.seed, epoch]).permutation(order)
+        return [order[start:start + self.batch_size] for start in range(0, len(order), self.batch_size)
+                if not (self.drop_last and start + self.batch_size > len(order))]
+
+    def _start(self):
+        if self._workers or self.num_workers == 0:
+            return
+        size = max(64, max(int(np.prod(shape)) * dtype.itemsize + offset
+                           for shape, dtype, offset in self.layout.values()))
+        self._slots = [shared_memory.SharedMemory(create=True, size=size) for _ in range(self.prefetch)]
+        ctx = mp.get_context(self.start_method)
+        self._tasks, self._results = ctx.Queue(), ctx.Queue()
+        args = (str(self.root), self.filters, self.dataset.window, self.dataset.columns, self.cache_mb,
+                self.layout, [slot.name for slot in self._slots], self._tasks, self._results)
+        self._workers = [ctx.Process(target=_worker, args=args, daemon=True) for _ in range(self.num_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def __iter__(self) -> Iterator[Dict[str, np.ndarray]]:
+        batches = self.batches(self.epoch)
+        self.epoch += 1
+        if self.num_workers == 0:
+            for indices in batches:
+                arrays = {name: np.empty((len(indices),) + shape[1:], dtype)
+                          for name, (shape, dtype, _) in self.layout.items()}
+                _fill(self.dataset, indices, arrays)
+                self.stats['batches'] += 1
+                yield arrays
+            return
+
+        self._start()
+        # Batches still in flight from an epoch the consumer abandoned
+        while self._inflight:
+            self._results.get()
+            self._inflight -= 1
+        free = list(range(len(self._slots)))
+        submitted, ready = 0, {}
+        for number in range(len(batches)):
+            while free and submitted < len(batches):
+                self._tasks.put((submitted, free.pop(), batches[submitted]))
+                submitted += 1
+                self._inflight += 1
+            t0 = time.perf_counter()
+            while number not in ready:
+                done, slot, rows, error = self._results.get()
+                self._inflight -= 1
+                if error is not None:
+                    raise RuntimeError(f"Loader worker failed on batch {done}:\n{error}")
+                ready[done] = (slot, rows)
+            self.stats['wait_s'] += time.perf_counter() - t0
+            slot, rows = ready.pop(number)
+            self.stats['batches'] += 1
+            yield _slot_arrays(self._slots[slot].buf, self.layout, rows)
+            free.append(slot)
+
+    def close(self):
+        """Stop the workers and release the shared-memory slots."""
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+        for slot in self._slots:
+            try:
+                slot.close()
+            except BufferError:         # consumer still holds views of the last batch
+                pass
+            slot.unlink()
+        self._slots = []
@@ -0,0 +1,250 @@
+"""Memory-mapped random-access reader over episode shards.
+
+A sample is an (episode, t) pair: the K most recent depth frames ending at
+step t (20 Hz, so K = 4 spans 0.15 s) plus the odometry and action rows at t.
+The global index gives the byte range of every column block, so resolving a
+sample touches only the blocks it needs:
+
+    - raw shards (``compression='none'``): column blocks are ``np.frombuffer``
+      views of the memory-mapped shard and depth stacks are slices of them;
+      nothing is copied or read until the pages are touched.
+    - LZ4 shards: only the frames (about 1 MB of rows each, but at least
+      ``min_chunk_rows`` = 16 depth images at 640x480) covering the window
+      are decompressed, straight from the mapping; decoded frames are kept
+      in a byte-bounded LRU cache. A window inside one frame is a view of
+      it; a window straddling two frames (K - 1 of every ``chunk_rows``
+      windows) is copied. Only raw shards guarantee zero-copy windows.
+
+Example:
+    >>> dataset = EpisodeDataset('data/dataset', window=4)
+    >>> sample = dataset[12345]
+    >>> sample['depth'].shape          # (4, H, W), a view
+    >>> batch = dataset.sample_batch(rng.integers(len(dataset), size=64))
+"""
+
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Sequence
+
+import numpy as np
+
+from src.dataset.shards import load_index
+
+DEFAULT_COLUMNS = ('depth', 'odom_pos', 'odom_vel', 'odom_quat', 'action')
+
+
+class EpisodeDataset:
+    """Random access to K-frame depth windows plus per-step columns.
+
+    Sample ``i`` enumerates, episode by episode, every step t >= K - 1 (the
+    first full window). Columns missing from a shard are skipped.
+    """
+
+    def __init__(self, root='data/dataset',
+                 index=None,
+                 window: int = 4,
+                 columns: Sequence[str] = DEFAULT_COLUMNS,
+                 cache_mb: float = 512.0):
+        """Initialize the reader.
+
+        Args:
+            root: Dataset root containing ``episodes.parquet`` and ``shards/``
+            index: Optional pyarrow Table (e.g. a filtered ``load_index``)
+                restricting the episodes; defaults to the whole index
+            window: Depth frames per sample (K)
+            columns: Columns returned per sample; ``depth`` is windowed,
+                the others are returned at step t
+            cache_mb: Budget of the decompressed-column cache (LZ4 shards)
+        """
+        self.root = Path(root)
+        self.window = int(window)
+        self.columns = tuple(columns)
+        table = load_index(self.root) if index is None else index
+
+        needed = ['episode_id', 'shard', 'num_steps']
+        for column in ('timestamp',) + self.columns:
+            if f"{column}_offset" in table.column_names:
+                needed += [f"{column}_offset", f"{column}_nbytes"]
+        data = table.select(needed).to_pydict() if table.num_rows else {name: [] for name in needed}
+
+        self.episode_ids = np.asarray(data['episode_id'], dtype=np.int64)
+        self.num_steps = np.asarray(data['num_steps'], dtype=np.int64)
+        self.shard_paths = sorted(set(data['shard']))
+        shard_number = {path: i for i, path in enumerate(self.shard_paths)}
+        self.episode_shard = np.asarray([shard_number[path] for path in data['shard']], dtype=np.int64)
+        self.blocks = {
+            column: (np.asarray([-1 if v is None else v for v in data[f"{column}_offset"]], dtype=np.int64),
+                     np.asarray([0 if v is None else v for v in data[f"{column}_nbytes"]], dtype=np.int64))
+            for column in ('timestamp',) + self.columns if f"{column}_offset" in data
+        }
+
+        # Sample i -> (episode, t): cumulative count of full windows
+        samples = np.maximum(self.num_steps - self.window + 1, 0)
+        self._sample_start = np.concatenate([[0], np.cumsum(samples)])
+
+        self.cache_bytes = int(cache_mb * 1024 * 1024)
+        self._cache: 'OrderedDict[tuple, np.ndarray]' = OrderedDict()
+        self._cached_bytes = 0
+        self._maps: Dict[int, np.memmap] = {}
+        self._sidecars: Dict[int, Dict] = {}
+        self.stats = {'block_reads': 0, 'cache_hits': 0, 'decompressed_bytes': 0}
+
+    def __len__(self) -> int:
+        return int(self._sample_start[-1])
+
+    @property
+    def num_episodes(self) -> int:
+        return int(self.episode_ids.size)
+
+    # ------------------------------------------------------------------
+    # Block access
+    # ------------------------------------------------------------------
+
+    def _shard(self, shard: int, end: int):
+        """Read-only mapping of a shard, remapped if the file has grown past ``end``."""
+        mapping = self._maps.get(shard)
+        if mapping is None or mapping.size < end:
+            path = self.root / self.shard_paths[shard]
+            mapping = np.memmap(path, dtype=np.uint8, mode='r')
+            self._maps[shard] = mapping
+            with open(path.with_suffix('.json'), 'r') as f:
+                self._sidecars[shard] = json.load(f)
+        return mapping, self._sidecars[shard]
+
+    def _block(self, episode: int, column: str):
+        """Mapped bytes, dtype and (T, ...) shape of one column block."""
+        offsets, nbytes = self.blocks[column]
+        start, size = int(offsets[episode]), int(nbytes[episode])
+        if start < 0:
+            raise KeyError(f"Episode {self.episode_ids[episode]} has no '{column}' column")
+        mapping, sidecar = self._shard(int(self.episode_shard[episode]), start + size)
+        spec = sidecar['columns'][column]
+        shape = (int(self.num_steps[episode]),) + tuple(spec['shape'])
+        return mapping[start:start + size], np.dtype(spec['dtype']), shape, spec, sidecar['compression']
+
+    def _frame(self, episode: int, column: str, chunk: int) -> np.ndarray:
+        """Decompressed rows of one LZ4 frame (cached)."""
+        key = (episode, column, chunk)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return cached
+
+        import lz4.frame
+        block, dtype, shape, spec, _ = self._block(episode, column)
+        chunk_rows = spec['chunk_rows']
+        num_chunks = -(-shape[0] // chunk_rows)
+        sizes = np.frombuffer(block, dtype='<u8', count=num_chunks)
+        start = 8 * num_chunks + int(sizes[:chunk].sum())
+        rows = min(chunk_rows, shape[0] - chunk * chunk_rows)
+        array = np.frombuffer(lz4.frame.decompress(block[start:start + int(sizes[chunk])]),
+                              dtype=dtype).reshape((rows,) + shape[1:])
+        self.stats['block_reads'] += 1
+        self.stats['decompressed_bytes'] += array.nbytes
+
+        self._cache[key] = array
+        self._cached_bytes += array.nbytes
+        while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= evicted.nbytes
+        return array
+
+    def rows(self, episode: int, column: str, start: int, stop: int) -> np.ndarray:
+        """Rows ``start:stop`` of a column of the ``episode``-th indexed episode.
+
+        Raw shards return a view of the mapping. LZ4 shards decode only the
+        frames covering the rows and return a view of the cached frame (a
+        copy when the rows straddle two frames).
+        """
+        block, dtype, shape, spec, compression = self._block(episode, column)
+        if compression == 'none':
+            self.stats['block_reads'] += 1
+            return np.frombuffer(block, dtype=dtype, count=int(np.prod(shape))).reshape(shape)[start:stop]
+
+        chunk_rows = spec['chunk_rows']
+        first, last = start // chunk_rows, (max(stop, start + 1) - 1) // chunk_rows
+        frames = [self._frame(episode, column, chunk) for chunk in range(first, last + 1)]
+        values = frames[0] if len(frames) == 1 else np.concatenate(frames)
+        base = first * chunk_rows
+        return values[start - base:stop - base]
+
+    def column(self, episode: int, column: str) -> np.ndarray:
+        """Whole (T, ...) column of the ``episode``-th indexed episode."""
+        return self.rows(episode, column, 0, int(self.num_steps[episode]))
+
+    # ------------------------------------------------------------------
+    # Samples
+    # ------------------------------------------------------------------
+
+    def locate(self, index) -> tuple:
+        """Map sample indices to (episode, t) arrays (or ints for a scalar)."""
+        index = np.asarray(index, dtype=np.int64)
+        if np.any((index < 0) | (index >= len(self))):
+            raise IndexError(f"Sample index out of range for {len(self)} samples")
+        episode = np.searchsorted(self._sample_start, index, side='right') - 1
+        t = index - self._sample_start[episode] + self.window - 1
+        if index.ndim == 0:
+            return int(episode), int(t)
+        return episode, t
+
+    def sample(self, episode: int, t: int) -> Dict[str, np.ndarray]:
+        """Window ending at step ``t`` of the ``episode``-th indexed episode.
+
+        Returns:
+            Dict with ``depth`` (K, H, W) and every other requested column at
+            step t (views, not copies, except for LZ4 depth windows that
+            straddle two frames), plus ``episode_id``, ``t`` and ``timestamp``
+        """
+        if not self.window - 1 <= t < self.num_steps[episode]:
+            raise IndexError(f"t={t} outside [{self.window - 1}, {self.num_steps[episode]})")
+        sample = {'episode_id': int(self.episode_ids[episode]), 't': int(t)}
+        if 'timestamp' in self.blocks:
+            sample['timestamp'] = self.rows(episode, 'timestamp', t, t + 1)[0]
+        for column in self.columns:
+            if column not in self.blocks or self.blocks[column][0][episode] < 0:
+                continue
+            if column == 'depth':
+                sample[column] = self.rows(episode, column, t - self.window + 1, t + 1)
+            else:
+                sample[column] = self.rows(episode, column, t, t + 1)[0]
+        return sample
+
+    def __getitem__(self, index: int) -> Dict[str, np.ndarray]:
+        return self.sample(*self.locate(index))
+
+    def sample_batch(self, indices) -> Dict[str, np.ndarray]:
+        """Stack samples into (B, ...) arrays (one copy into the batch).
+
+        Indices are visited grouped by episode so each block is resolved
+        once per batch; rows keep the order of ``indices``.
+        """
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        episodes, steps = self.locate(indices)
+        batch = {}
+        for position in np.argsort(episodes, kind='stable'):
+            sample = self.sample(int(episodes[position]), int(steps[position]))
+            for key, value in sample.items():
+                if key not in batch:
+                    batch[key] = np.empty((indices.size,) + np.shape(value), dtype=np.asarray(value).dtype)
+                batch[key][position] = value
+        return batch
+
+    def close(self):
+        """Drop mappings and cached columns."""
+        self._maps.clear()
+        self._cache.clear()
+        self._cached_bytes = 0
+
+
+def open_dataset(root='data/dataset', window: int = 4, filters=None, **kwargs) -> EpisodeDataset:
+    """Open an EpisodeDataset over the episodes matching ``filters``.
+
+    Args:
+        root: Dataset root
+        window: Depth frames per sample (K)
+        filters: Optional pyarrow filters on ``episodes.parquet``
+            (e.g. ``[('difficulty', '=', 'hard'), ('qc_passed', '=', True)]``)
+    """
+    return EpisodeDataset(root, index=load_index(root, filters=filters), window=window, **kwargs)
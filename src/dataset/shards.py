@@ -0,0 +1,275 @@
+"""Episode shards and the global ``episodes.parquet`` index (Phase 4).
+
+Layout under the dataset root (default ``data/dataset``)::
+
+    episodes.parquet                    one row per episode (global index)
+    shards/<difficulty>/shard_00000.bin episode column blocks, back to back
+    shards/<difficulty>/shard_00000.json column schema and codec of the shard
+
+Every episode is a set of per-timestep columns (``timestamp``, ``depth``,
+``odom_pos``, ``odom_vel``, ``odom_quat``, ``action`` ...). Each column is
+stored as one block aligned to ``BLOCK_ALIGNMENT`` bytes, so a reader can
+fetch or memory-map a single column of a single episode. Raw blocks are the
+C-order array; LZ4 blocks are a uint64 table of frame sizes followed by one
+LZ4 frame per ``chunk_rows`` rows (about ``block_kb`` uncompressed, and never
+fewer than ``min_chunk_rows``), so a few depth frames can be decoded without
+inflating the whole episode. The index row carries the scene family, seed,
+difficulty, QC flags and, per column, ``<column>_offset``/``<column>_nbytes``
+inside ``shard``; nothing has to be scanned to locate an episode.
+
+Example:
+    >>> with ShardWriter('data/dataset') as writer:
+    ...     writer.write_episode(episode)     # dict of (T, ...) arrays + metadata
+    >>> index = load_index('data/dataset')
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+INDEX_FILE = 'episodes.parquet'
+BLOCK_ALIGNMENT = 64
+BLOCK_KB = 1024
+MIN_CHUNK_ROWS = 16
+METADATA_KEYS = ('episode_id', 'scene_family', 'seed', 'difficulty', 'qc')
+
+
+def load_index(root='data/dataset', columns: Optional[List[str]] = None, filters=None):
+    """Read ``episodes.parquet`` as a pyarrow Table.
+
+    Args:
+        root: Dataset root
+        columns: Optional column projection
+        filters: Optional pyarrow/DNF filters applied while reading
+
+    Returns:
+        pyarrow.Table (empty if no index exists yet)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(root) / INDEX_FILE
+    if not path.exists():
+        return pa.table({})
+    return pq.read_table(path, columns=columns, filters=filters)
+
+
+class _OpenShard:
+    """Shard file currently being appended to."""
+
+    def __init__(self, path: Path, schema: Dict):
+        self.path = path
+        self.schema = schema
+        self.handle = open(path, 'wb')
+        self.size = 0
+        self.episodes = 0
+
+    def append(self, block: bytes) -> int:
+        """Write an aligned block and return its offset."""
+        offset = self.size
+        self.handle.write(block)
+        pad = -len(block) % BLOCK_ALIGNMENT
+        if pad:
+            self.handle.write(b'\0' * pad)
+        self.size += len(block) + pad
+        return offset
+
+
+class ShardWriter:
+    """Streams finished episodes into size-bounded shards per difficulty.
+
+    One shard is open per difficulty; it is sealed once it holds
+    ``max_episodes`` episodes or ``max_shard_mb`` of data. The global index
+    is rewritten (atomically) whenever a shard is sealed and on
+    ``flush()``/``close()``. Opening a root that already has an index
+    appends to it: new shards are numbered after the existing ones.
+    """
+
+    def __init__(self, root='data/dataset',
+                 max_episodes: int = 200,
+                 max_shard_mb: float = 4096.0,
+                 compression: str = 'lz4',
+                 block_kb: int = BLOCK_KB,
+                 min_chunk_rows: int = MIN_CHUNK_ROWS):
+        """Initialize the writer.
+
+        Args:
+            root: Dataset root (shards go to ``root/shards/<difficulty>``)
+            max_episodes: Episodes per shard (Phase 4: 100-200)
+            max_shard_mb: Size bound of a shard file
+            compression: 'lz4' or 'none' (raw blocks can be memory-mapped
+                without decompression)
+            block_kb: Uncompressed size targeted by each LZ4 frame
+            min_chunk_rows: Lower bound on the rows of an LZ4 frame. A 640x480
+                float32 depth image alone exceeds ``block_kb``; keeping several
+                frames per chunk lets most K-frame windows be a view of one
+                decoded frame instead of a concatenation of K of them
+        """
+        if compression not in ('lz4', 'none'):
+            raise ValueError(f"Unsupported compression '{compression}'")
+        if compression == 'lz4':
+            import lz4.frame  # noqa: F401  (fail at construction, not mid-episode)
+        self.root = Path(root)
+        self.max_episodes = int(max_episodes)
+        self.max_shard_bytes = int(max_shard_mb * 1024 * 1024)
+        self.compression = compression
+        self.block_bytes = int(block_kb) * 1024
+        self.min_chunk_rows = max(1, int(min_chunk_rows))
+
+        existing = load_index(self.root)
+        self.rows: List[Dict] = existing.to_pylist() if existing.num_rows else []
+        self._next_episode_id = max((int(r['episode_id']) for r in self.rows), default=-1) + 1
+        self._next_shard = {difficulty: 0 for difficulty in DIFFICULTIES}
+        for row in self.rows:
+            difficulty, number = row['difficulty'], int(Path(row['shard']).stem.split('_')[1])
+            self._next_shard[difficulty] = max(self._next_shard[difficulty], number + 1)
+        self._open: Dict[str, _OpenShard] = {}
+        self.bytes_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def write_episode(self, episode: Dict) -> Dict:
+        """Append one finished episode to the shard of its difficulty.
+
+        Args:
+            episode: Dict with ``scene_family``, ``seed``, ``difficulty``,
+                optional ``episode_id`` (int, assigned if missing) and ``qc``
+                (dict of bool flags), plus per-timestep arrays sharing their
+                leading dimension T (at least ``timestamp``)
+
+        Returns:
+            The index row written for the episode
+        """
+        difficulty = episode['difficulty']
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty '{difficulty}' (expected one of {DIFFICULTIES})")
+        columns = {key: np.ascontiguousarray(value) for key, value in episode.items()
+                   if key not in METADATA_KEYS and isinstance(value, np.ndarray) and value.ndim >= 1}
+        if 'timestamp' not in columns:
+            raise ValueError("Episode needs a 'timestamp' column")
+        num_steps = columns['timestamp'].shape[0]
+        for key, value in columns.items():
+            if value.shape[0] != num_steps:
+                raise ValueError(f"Column '{key}' has {value.shape[0]} rows, expected {num_steps}")
+
+        schema = {key: {'dtype': value.dtype.str, 'shape': list(value.shape[1:]),
+                        'chunk_rows': max(self.min_chunk_rows, self.block_bytes // max(1, value[:1].nbytes))}
+                  for key, value in sorted(columns.items())}
+        shard = self._shard_for(difficulty, schema)
+
+        episode_id = int(episode.get('episode_id', self._next_episode_id))
+        self._next_episode_id = max(self._next_episode_id, episode_id + 1)
+        timestamps = columns['timestamp']
+        qc = {f"qc_{name}": bool(flag) for name, flag in sorted(episode.get('qc', {}).items())}
+        row = {
+            'episode_id': episode_id,
+            'scene_family': str(episode['scene_family']),
+            'seed': int(episode['seed']),
+            'difficulty': difficulty,
+            'num_steps': num_steps,
+            'duration_s': float(timestamps[-1] - timestamps[0]) if num_steps else 0.0,
+            'qc_passed': all(qc.values()),
+            **qc,
+            'shard': shard.path.relative_to(self.root).as_posix(),
+        }
+        start = shard.size
+        for key in schema:
+            block = self._encode(columns[key], schema[key]['chunk_rows'])
+            row[f"{key}_offset"] = shard.append(block)
+            row[f"{key}_nbytes"] = len(block)
+        row['offset'], row['nbytes'] = start, shard.size - start
+        shard.handle.flush()
+        shard.episodes += 1
+        self.bytes_written += row['nbytes']
+        self.rows.append(row)
+
+        if shard.episodes >= self.max_episodes or shard.size >= self.max_shard_bytes:
+            self._seal(difficulty)
+        return row
+
+    def _encode(self, column: np.ndarray, chunk_rows: int) -> bytes:
+        if self.compression == 'none':
+            return memoryview(column).cast('B')
+        import lz4.frame
+        frames = [lz4.frame.compress(memoryview(column[start:start + chunk_rows]).cast('B'))
+                  for start in range(0, column.shape[0], chunk_rows)]
+        table = np.array([len(frame) for frame in frames], dtype='<u8').tobytes()
+        return b''.join([table] + frames)
+
+    def _shard_for(self, difficulty: str, schema: Dict) -> _OpenShard:
+        """Open shard of ``difficulty``; a schema change starts a new shard."""
+        shard = self._open.get(difficulty)
+        if shard is not None and shard.schema != schema:
+            self._seal(difficulty)
+            shard = None
+        if shard is None:
+            directory = self.root / 'shards' / difficulty
+            directory.mkdir(parents=True, exist_ok=True)
+            number = self._next_shard[difficulty]
+            self._next_shard[difficulty] += 1
+            shard = _OpenShard(directory / f"shard_{number:05d}.bin", schema)
+            self._open[difficulty] = shard
+            self._write_sidecar(difficulty, shard)
+        return shard
+
+    def _seal(self, difficulty: str):
+        """Close the open shard of ``difficulty``, write its sidecar and the index."""
+        shard = self._open.pop(difficulty, None)
+        if shard is None:
+            return
+        shard.handle.close()
+        self._write_sidecar(difficulty, shard)
+        self.write_index()
+
+    def _write_sidecar(self, difficulty: str, shard: _OpenShard):
+        sidecar = {
+            'difficulty': difficulty,
+            'compression': self.compression,
+            'block_alignment': BLOCK_ALIGNMENT,
+            'num_episodes': shard.episodes,
+            'nbytes': shard.size,
+            'columns': shard.schema,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        with open(shard.path.with_suffix('.json'), 'w') as f:
+            json.dump(sidecar, f, indent=2)
+
+    def write_index(self):
+        """Rewrite ``episodes.parquet`` from all rows (temp file + rename)."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self.rows:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / INDEX_FILE
+        tmp = path.with_suffix('.parquet.tmp')
+        names = list(dict.fromkeys(key for row in self.rows for key in row))
+        table = pa.table({name: [row.get(name) for row in self.rows] for name in names})
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+
+    def flush(self):
+        """Make every written episode visible through the index."""
+        for shard in self._open.values():
+            shard.handle.flush()
+        self.write_index()
+
+    def close(self):
+        """Seal all open shards and write the final index."""
+        for difficulty in list(self._open):
+            self._seal(difficulty)
+        self.write_index()
@@ -0,0 +1,339 @@
+"""Uniform cubic B-spline trajectories and their gradient-based optimizer.
+
+The optimizer smooths the kinodynamic A* path (Fast-Planner style): cost
+terms are evaluated on all control points at once,
+
+    J = w_s * sum |Δ³Q|²                          (smoothness, jerk)
+      + w_d * sum max(0, d_safe - esdf(Q_i))²     (clearance)
+      + w_f * sum max(0, |V| - v_max)² + max(0, |A| - a_max)²   (feasibility)
+
+where V and A are the velocity/acceleration control points. The difference
+operators are precomputed as matrices per control-point count, so every
+cost and gradient is a handful of matrix products; there is no per-point
+Python loop. The first and last three control points are held fixed to keep
+the boundary states. A warm start from a previous solution lets the local
+replanner re-optimize within its 10 Hz budget.
+"""
+
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from tools.profiling import profiled
+
+
+# Uniform cubic B-spline basis: p(s) = [1, s, s², s³] @ M @ Q[i:i+4], s in [0, 1)
+CUBIC_BASIS = np.array([
+    [1.0, 4.0, 1.0, 0.0],
+    [-3.0, 0.0, 3.0, 0.0],
+    [3.0, -6.0, 3.0, 0.0],
+    [-1.0, 3.0, -3.0, 1.0],
+]) / 6.0
+
+# Control points pinned at each end (position, velocity and acceleration)
+FIXED_POINTS = 3
+
+
+@lru_cache(maxsize=64)
+def difference_matrices(num_points: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Forward-difference operators D1 (N-1, N), D2 (N-2, N) and D3 (N-3, N)."""
+    eye = np.eye(num_points)
+    d1 = np.diff(eye, 1, axis=0)
+    d2 = np.diff(eye, 2, axis=0)
+    d3 = np.diff(eye, 3, axis=0)
+    for m in (d1, d2, d3):
+        m.flags.writeable = False
+    return d1, d2, d3
+
+
+@lru_cache(maxsize=64)
+def _smoothness_hessian(num_points: int) -> np.ndarray:
+    """D3ᵀ D3, so that sum |Δ³Q|² = sum(Q * (H @ Q))."""
+    d3 = difference_matrices(num_points)[2]
+    hessian = d3.T @ d3
+    hessian.flags.writeable = False
+    return hessian
+
+
+@lru_cache(maxsize=64)
+def _position_rows(num_samples: int) -> np.ndarray:
+    """Rows mapping N = K + 2 control points to the K knot positions."""
+    rows = np.zeros((num_samples, num_samples + 2))
+    i = np.arange(num_samples)
+    rows[i[:, None], i[:, None] + np.arange(3)] = [1.0 / 6.0, 4.0 / 6.0, 1.0 / 6.0]
+    rows.flags.writeable = False
+    return rows
+
+
+@lru_cache(maxsize=64)
+def _boundary_rows(num_samples: int) -> np.ndarray:
+    """Unscaled start/end velocity and acceleration rows (see ``_boundary_scale``)."""
+    n = num_samples + 2
+    rows = np.zeros((4, n))
+    rows[0, 0:3] = rows[1, n - 3:n] = [-0.5, 0.0, 0.5]
+    rows[2, 0:3] = rows[3, n - 3:n] = [1.0, -2.0, 1.0]
+    rows.flags.writeable = False
+    return rows
+
+
+def _boundary_scale(dt: float) -> np.ndarray:
+    return np.array([1.0 / dt, 1.0 / dt, 1.0 / dt ** 2, 1.0 / dt ** 2])
+
+
+class UniformBspline:
+    """Uniform cubic B-spline with control points (N, 3) and knot span ``dt``."""
+
+    def __init__(self, control_points: np.ndarray, dt: float):
+        self.control_points = np.asarray(control_points, dtype=np.float64)
+        self.dt = float(dt)
+
+    @property
+    def num_segments(self) -> int:
+        return self.control_points.shape[0] - 3
+
+    @property
+    def total_time(self) -> float:
+        return self.num_segments * self.dt
+
+    @classmethod
+    def fit(cls, positions: np.ndarray, start_vel, start_acc, end_vel, end_acc, dt: float) -> 'UniformBspline':
+        """Least-squares fit through K positions sampled every ``dt``.
+
+        The boundary velocity/acceleration are imposed as extra rows, as in
+        Fast-Planner's parameterizeToBspline.
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        k = positions.shape[0]
+        rows = np.vstack([_position_rows(k), _boundary_rows(k) * _boundary_scale(dt)[:, None]])
+        rhs = np.vstack([positions, start_vel, end_vel, start_acc, end_acc])
+        control_points = np.linalg.lstsq(rows, rhs, rcond=None)[0]
+        return cls(control_points, dt)
+
+    @classmethod
+    def from_trajectory(cls, trajectory, control_point_spacing_m: float = 0.5,
+                        max_segments: int = 200) -> 'UniformBspline':
+        """Fit a spline to any trajectory exposing ``total_time`` and ``evaluate``.
+
+        The knot span is chosen so that consecutive control points are about
+        ``control_point_spacing_m`` apart along the path.
+        """
+        total = max(trajectory.total_time, 1e-6)
+        dense = trajectory.evaluate(np.linspace(0.0, total, 64))
+        length = float(np.linalg.norm(np.diff(dense, axis=0), axis=1).sum())
+        segments = int(np.clip(np.ceil(length / control_point_spacing_m), 1, max_segments))
+
+        times = np.linspace(0.0, total, segments + 1)
+        ends = np.array([0.0, total])
+        vel, acc = trajectory.evaluate(ends, 1), trajectory.evaluate(ends, 2)
+        return cls.fit(trajectory.evaluate(times), vel[0], acc[0], vel[1], acc[1], total / segments)
+
+    def derivative_points(self, order: int = 1) -> np.ndarray:
+        """Control points of the ``order``-th derivative spline."""
+        points = self.control_points
+        for _ in range(order):
+            points = np.diff(points, axis=0) / self.dt
+        return points
+
+    def evaluate(self, times, derivative: int = 0) -> np.ndarray:
+        """Position (or derivative up to 2) at absolute times, shape (T, 3)."""
+        times = np.clip(np.atleast_1d(np.asarray(times, dtype=np.float64)), 0.0, self.total_time)
+        seg = np.minimum((times / self.dt).astype(np.int64), self.num_segments - 1)
+        s = times / self.dt - seg
+
+        if derivative == 0:
+            powers = np.stack([np.ones_like(s), s, s ** 2, s ** 3], axis=1)
+        elif derivative == 1:
+            powers = np.stack([np.zeros_like(s), np.ones_like(s), 2 * s, 3 * s ** 2], axis=1) / self.dt
+        elif derivative == 2:
+            powers = np.stack([np.zeros_like(s), np.zeros_like(s), 2 * np.ones_like(s), 6 * s], axis=1) / self.dt ** 2
+        else:
+            raise ValueError(f"Unsupported derivative order: {derivative}")
+
+        weights = powers @ CUBIC_BASIS                            # (T, 4)
+        idx = seg[:, None] + np.arange(4)[None, :]
+        return np.einsum('tk,tkd->td', weights, self.control_points[idx])
+
+    def sample(self, dt: float = 0.05) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Times, positions and velocities sampled every ``dt`` (end included)."""
+        times = np.append(np.arange(0.0, self.total_time, dt), self.total_time)
+        return times, self.evaluate(times), self.evaluate(times, derivative=1)
+
+
+@dataclass(frozen=True)
+class BsplineOptimizerConfig:
+    """Cost weights and limits for B-spline optimization."""
+
+    smoothness_weight: float = 1.0
+    distance_weight: float = 10.0
+    feasibility_weight: float = 1.0
+    safety_distance_m: float = 0.5
+    control_point_spacing_m: float = 0.5
+    max_vel: float = 30.0
+    max_acc: float = 10.0
+    max_iterations: int = 100
+    lbfgs_memory: int = 8
+    gradient_tolerance: float = 1e-4
+    relative_tolerance: float = 1e-3
+
+
+@dataclass
+class OptimizationResult:
+    """Optimized spline plus solver statistics."""
+
+    bspline: UniformBspline
+    cost: float
+    iterations: int
+    evaluations: int
+    optimize_time_s: float
+    converged: bool
+
+
+class BsplineOptimizer:
+    """Smoothness/clearance/feasibility optimizer over B-spline control points.
+
+    Args:
+        config: Cost weights and limits
+        esdf: Map exposing ``interpolate(points, return_gradient=True)``
+            (e.g. EsdfMap); None disables the clearance term
+    """
+
+    def __init__(self, config: Optional[BsplineOptimizerConfig] = None, esdf=None):
+        self.config = config or BsplineOptimizerConfig()
+        self.esdf = esdf
+        self.last_solution: Optional[np.ndarray] = None
+
+    def cost_and_gradient(self, control_points: np.ndarray, dt: float) -> Tuple[float, np.ndarray]:
+        """Total cost and its gradient w.r.t. all (N, 3) control points."""
+        cfg = self.config
+        q = control_points
+        n = q.shape[0]
+        d1, d2, _ = difference_matrices(n)
+
+        # Smoothness: sum |Δ³Q|²
+        hq = _smoothness_hessian(n) @ q
+        cost = cfg.smoothness_weight * float(np.sum(q * hq))
+        grad = 2.0 * cfg.smoothness_weight * hq
+
+        # Clearance at every control point
+        if self.esdf is not None and cfg.distance_weight > 0:
+            dist, dist_grad = self.esdf.interpolate(q, return_gradient=True)
+            violation = np.maximum(cfg.safety_distance_m - dist, 0.0)
+            cost += cfg.distance_weight * float(np.sum(violation ** 2))
+            grad -= 2.0 * cfg.distance_weight * violation[:, None] * dist_grad
+
+        # Velocity and acceleration magnitude limits (the convex hull of the
+        # V/A control points bounds the norm of the curve's derivatives)
+        if cfg.feasibility_weight > 0:
+            for op, scale, limit in ((d1, 1.0 / dt, cfg.max_vel), (d2, 1.0 / dt ** 2, cfg.max_acc)):
+                values = (op @ q) * scale
+                norms = np.linalg.norm(values, axis=1)
+                excess = np.maximum(norms - limit, 0.0)
+                cost += cfg.feasibility_weight * float(np.sum(excess ** 2))
+                direction = values / np.maximum(norms, 1e-12)[:, None]
+                grad += cfg.feasibility_weight * scale * (op.T @ (2.0 * excess[:, None] * direction))
+
+        return cost, grad
+
+    @profiled('planner.optimize')
+    def optimize(self, bspline: UniformBspline, warm_start: Optional[np.ndarray] = None,
+                 deadline: Optional[float] = None) -> OptimizationResult:
+        """Optimize the free control points of ``bspline``.
+
+        Args:
+            bspline: Initial trajectory (its end control points stay fixed)
+            warm_start: Optional (N, 3) control points from a previous solution;
+                used for the free points when the shape matches
+            deadline: Optional ``time.perf_counter()`` value after which the
+                solver returns its best iterate
+
+        Returns:
+            OptimizationResult with the optimized spline
+        """
+        start_time = time.perf_counter()
+        q = bspline.control_points.copy()
+        n = q.shape[0]
+        free = slice(FIXED_POINTS, n - FIXED_POINTS)
+        if warm_start is not None and np.shape(warm_start) == q.shape:
+            q[free] = np.asarray(warm_start)[free]
+
+        if n <= 2 * FIXED_POINTS:
+            cost, _ = self.cost_and_gradient(q, bspline.dt)
+            return OptimizationResult(UniformBspline(q, bspline.dt), cost, 0, 1,
+                                      time.perf_counter() - start_time, True)
+
+        def fun(x):
+            q[free] = x.reshape(-1, 3)
+            c, g = self.cost_and_gradient(q, bspline.dt)
+            return c, g[free].reshape(-1)
+
+        x, cost, iterations, evaluations, converged = lbfgs(
+            fun, q[free].reshape(-1), self.config.max_iterations, self.config.lbfgs_memory,
+            self.config.gradient_tolerance, self.config.relative_tolerance, deadline)
+        q[free] = x.reshape(-1, 3)
+        self.last_solution = q.copy()
+        return OptimizationResult(UniformBspline(q, bspline.dt), cost, iterations, evaluations,
+                                  time.perf_counter() - start_time, converged)
+
+
+def lbfgs(fun: Callable[[np.ndarray], Tuple[float, np.ndarray]], x0: np.ndarray,
+          max_iterations: int = 100, memory: int = 8, gradient_tolerance: float = 1e-4,
+          relative_tolerance: float = 0.0, deadline: Optional[float] = None):
+    """Minimal L-BFGS with backtracking (Armijo) line search.
+
+    Stops when the gradient's max-norm drops below ``gradient_tolerance``, when
+    an iteration improves the cost by less than ``relative_tolerance`` of its
+    value, or when ``deadline`` (``time.perf_counter()``) has passed.
+
+    Returns:
+        (x, cost, iterations, evaluations, converged)
+    """
+    x = np.asarray(x0, dtype=np.float64).copy()
+    f, g = fun(x)
+    evaluations = 1
+    s_hist, y_hist = [], []
+
+    for iteration in range(max_iterations):
+        if np.linalg.norm(g, np.inf) < gradient_tolerance:
+            return x, f, iteration, evaluations, True
+        if deadline is not None and time.perf_counter() >= deadline:
+            return x, f, iteration, evaluations, False
+
+        # Two-loop recursion for the search direction
+        direction = -g
+        alphas = []
+        for s, y in zip(reversed(s_hist), reversed(y_hist)):
+            a = s.dot(direction) / y.dot(s)
+            alphas.append(a)
+            direction = direction - a * y
+        if y_hist:
+            direction *= s_hist[-1].dot(y_hist[-1]) / y_hist[-1].dot(y_hist[-1])
+        for (s, y), a in zip(zip(s_hist, y_hist), reversed(alphas)):
+            direction = direction + s * (a - y.dot(direction) / y.dot(s))
+        if direction.dot(g) >= 0:
+            direction, s_hist, y_hist = -g, [], []
+
+        step, slope = 1.0, direction.dot(g)
+        while True:
+            x_new = x + step * direction
+            f_new, g_new = fun(x_new)
+            evaluations += 1
+            if f_new <= f + 1e-4 * step * slope or step < 1e-10:
+                break
+            step *= 0.5
+
+        s, y = x_new - x, g_new - g
+        if s.dot(y) > 1e-12:
+            s_hist.append(s)
+            y_hist.append(y)
+            if len(s_hist) > memory:
+                s_hist.pop(0)
+                y_hist.pop(0)
+        improvement = f - f_new
+        x, f, g = x_new, f_new, g_new
+        if 0.0 <= improvement <= relative_tolerance * abs(f):
+            return x, f, iteration + 1, evaluations, True
+
+    return x, f, max_iterations, evaluations, False
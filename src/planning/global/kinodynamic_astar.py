@@ -0,0 +1,344 @@
+"""Kinodynamic A* over a precomputed motion-primitive lattice.
+
+The search state is (position, velocity) of a double integrator. Each
+expansion applies every primitive of a lattice of constant-acceleration
+segments (accelerations sampled within ``max_acc``, fixed durations) to the
+node at once with NumPy. Everything that does not depend on the parent state
+(per-primitive displacement offsets at the collision-check times, velocity
+deltas and control costs) is precomputed once per configuration and cached.
+
+Cost of a path is ``sum(|a|² * tau) + rho * T`` (control effort plus time, as
+in Fast-Planner). The heuristic is ``rho`` times a closed-form lower bound on
+the time to reach the goal: per axis, the bang-bang minimum time of a double
+integrator with bounded acceleration and velocity.
+"""
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tools.profiling import profiled
+
+
+@dataclass(frozen=True)
+class KinodynamicConfig:
+    """Search and feasibility parameters (hashable, used as the primitive cache key)."""
+
+    max_vel: float = 30.0                  # m/s (docs/plan.md Phase 2)
+    max_acc: float = 10.0                  # m/s² (docs/plan.md Phase 2)
+    accel_samples: int = 5                 # Acceleration levels per axis (odd keeps a = 0)
+    durations: Tuple[float, ...] = (0.8,)  # Primitive durations in seconds
+    rho: float = 20.0                      # Weight of time vs. control effort
+    heuristic_weight: float = 5.0          # >1 trades optimality for speed
+    safety_margin_m: float = 0.4           # Required ESDF clearance
+    check_resolution_m: float = 0.2        # Max spacing of collision-check samples
+    closed_set_resolution_m: float = 0.5   # Position bin for duplicate detection
+    velocity_bin_m_s: float = 2.0          # Velocity bin for duplicate detection
+    goal_tolerance_m: float = 0.5
+    shot_radius_m: float = 15.0            # Try analytic goal shots within this range
+    max_expansions: int = 20000
+
+
+@dataclass(frozen=True)
+class MotionPrimitives:
+    """Cached, state-independent part of the primitive lattice."""
+
+    accelerations: np.ndarray    # (M, 3)
+    durations: np.ndarray        # (M,)
+    check_times: np.ndarray      # (M, S) sample times along each primitive
+    accel_offsets: np.ndarray    # (M, S, 3) 0.5 * a * t² at the check times
+    velocity_deltas: np.ndarray  # (M, 3) a * tau
+    costs: np.ndarray            # (M,) (|a|² + rho) * tau
+
+
+@lru_cache(maxsize=8)
+def motion_primitives(config: KinodynamicConfig) -> MotionPrimitives:
+    """Build (once per config) the constant-acceleration primitive lattice."""
+    levels = np.linspace(-config.max_acc, config.max_acc, config.accel_samples)
+    grid = np.array(list(itertools.product(levels, repeat=3)))
+    grid = grid[np.linalg.norm(grid, axis=1) <= config.max_acc + 1e-9]
+
+    accelerations = np.repeat(grid, len(config.durations), axis=0)
+    durations = np.tile(np.asarray(config.durations, dtype=np.float64), len(grid))
+
+    # Enough samples that a primitive at max speed is checked every check_resolution_m
+    samples = int(np.ceil(config.max_vel * max(config.durations) / config.check_resolution_m))
+    fractions = np.linspace(0.0, 1.0, samples + 1)[1:]
+    check_times = durations[:, None] * fractions[None, :]
+
+    primitives = MotionPrimitives(
+        accelerations=accelerations,
+        durations=durations,
+        check_times=check_times,
+        accel_offsets=0.5 * accelerations[:, None, :] * check_times[..., None] ** 2,
+        velocity_deltas=accelerations * durations[:, None],
+        costs=(np.sum(accelerations ** 2, axis=1) + config.rho) * durations,
+    )
+    for array in (primitives.accelerations, primitives.durations, primitives.check_times,
+                  primitives.accel_offsets, primitives.velocity_deltas, primitives.costs):
+        array.flags.writeable = False
+    return primitives
+
+
+def min_time_lower_bound(p0: np.ndarray, v0: np.ndarray, p1: np.ndarray, v1: np.ndarray,
+                         max_vel: float, max_acc: float) -> np.ndarray:
+    """Closed-form time-optimal bound for reaching (p1, v1) from (p0, v0).
+
+    Solves the per-axis double integrator with ``|a| <= max_acc`` and
+    ``|v| <= max_vel`` in closed form (bang-bang, with a cruise phase when the
+    peak speed would exceed ``max_vel``) and returns the max over axes. Since
+    the 3D limits imply the per-axis ones this never overestimates.
+
+    Args:
+        p0, v0: (..., 3) start positions and velocities
+        p1, v1: (..., 3) or (3,) target positions and velocities
+
+    Returns:
+        (...,) lower bounds on the arrival time in seconds
+    """
+    a = max_acc
+    dp = p1 - p0
+    # Flip axes so that the goal lies in the positive direction
+    sign = np.where(dp >= 0, 1.0, -1.0)
+    dp, v0, v1 = dp * sign, v0 * sign, v1 * sign
+
+    # Accelerate (+a) to a peak speed, then decelerate (-a)
+    peak_sq = a * dp + 0.5 * (v0 ** 2 + v1 ** 2)
+    peak = np.sqrt(np.maximum(peak_sq, 0.0))
+    t_up_down = (peak - v0) / a + (peak - v1) / a
+
+    # Same profile when the peak is clipped by max_vel (cruise in between)
+    cruise_dist = dp - (2 * max_vel ** 2 - v0 ** 2 - v1 ** 2) / (2 * a)
+    t_cruise = (max_vel - v0) / a + (max_vel - v1) / a + cruise_dist / max_vel
+    t_pos = np.where(peak > max_vel, t_cruise, t_up_down)
+    valid_pos = peak >= np.maximum(v0, v1) - 1e-9
+
+    # Decelerate (-a) to a trough speed, then accelerate (+a) (overshoot case)
+    trough = -np.sqrt(np.maximum(-a * dp + 0.5 * (v0 ** 2 + v1 ** 2), 0.0))
+    t_neg = (v0 - trough) / a + (v1 - trough) / a
+
+    t_axis = np.where(valid_pos, t_pos, t_neg)
+    return np.max(np.maximum(t_axis, 0.0), axis=-1)
+
+
+@dataclass
+class KinodynamicPath:
+    """Piecewise cubic trajectory: segment i is ``sum_k coeffs[i][k] * t**k``."""
+
+    coeffs: List[np.ndarray] = field(default_factory=list)  # each (4, 3), ascending powers
+    durations: List[float] = field(default_factory=list)
+
+    @property
+    def total_time(self) -> float:
+        return float(np.sum(self.durations))
+
+    def append_constant_acc(self, p0, v0, acc, tau):
+        self.coeffs.append(np.stack([p0, v0, 0.5 * np.asarray(acc), np.zeros(3)]))
+        self.durations.append(float(tau))
+
+    def append_cubic(self, coeffs, tau):
+        self.coeffs.append(np.asarray(coeffs, dtype=np.float64))
+        self.durations.append(float(tau))
+
+    def evaluate(self, times, derivative: int = 0) -> np.ndarray:
+        """Position (or derivative) at the given absolute times, shape (N, 3)."""
+        times = np.clip(np.atleast_1d(np.asarray(times, dtype=np.float64)), 0.0, self.total_time)
+        starts = np.concatenate([[0.0], np.cumsum(self.durations)])
+        seg = np.clip(np.searchsorted(starts, times, side='right') - 1, 0, len(self.durations) - 1)
+        local = times - starts[seg]
+        coeffs = np.stack(self.coeffs)[seg]  # (N, 4, 3)
+
+        powers = np.arange(4)
+        factor = np.ones(4)
+        for k in range(derivative):
+            factor = factor * np.maximum(powers - k, 0)
+        exps = np.maximum(powers - derivative, 0)
+        basis = factor[None, :] * local[:, None] ** exps[None, :]
+        return np.einsum('nk,nkd->nd', basis, coeffs)
+
+    def sample(self, dt: float = 0.05) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Times, positions and velocities sampled every ``dt`` (end included)."""
+        times = np.append(np.arange(0.0, self.total_time, dt), self.total_time)
+        return times, self.evaluate(times), self.evaluate(times, derivative=1)
+
+
+@dataclass
+class SearchResult:
+    """Outcome and statistics of one kinodynamic search."""
+
+    success: bool
+    path: Optional[KinodynamicPath]
+    nodes_expanded: int
+    search_time_s: float
+    status: str = ''
+
+
+def _shot_coefficients(p0, v0, p1, v1, duration) -> np.ndarray:
+    """Cubic (ascending powers) matching position/velocity at both ends."""
+    t = duration
+    c2 = (3 * (p1 - p0) - (2 * v0 + v1) * t) / t ** 2
+    c3 = (2 * (p0 - p1) + (v0 + v1) * t) / t ** 3
+    return np.stack([p0, v0, c2, c3])
+
+
+class KinodynamicAStar:
+    """Heuristic-guided search over the cached primitive lattice.
+
+    Args:
+        config: Search parameters (primitives are shared between planners
+            with equal configs)
+        map_data: Object exposing ``query(points) -> distances`` (e.g. EsdfMap);
+            None searches in free space
+        bounds: Optional ((xmin, ymin, zmin), (xmax, ymax, zmax)) search box
+            (defaults to the map extent when the map exposes one)
+    """
+
+    def __init__(self, config: Optional[KinodynamicConfig] = None, map_data=None, bounds=None):
+        self.config = config or KinodynamicConfig()
+        self.primitives = motion_primitives(self.config)
+        self.map_data = map_data
+        if bounds is None and map_data is not None and hasattr(map_data, 'origin'):
+            lo = np.asarray(map_data.origin, dtype=np.float64)
+            bounds = (lo, lo + np.asarray(map_data.shape) * map_data.resolution)
+        self.bounds = None if bounds is None else (np.asarray(bounds[0], float), np.asarray(bounds[1], float))
+
+    def _is_free(self, points: np.ndarray) -> np.ndarray:
+        """Clearance and bounds check for (..., 3) points, reduced over the last sample axis."""
+        shape = points.shape[:-1]
+        flat = points.reshape(-1, 3)
+        ok = np.ones(flat.shape[0], dtype=bool)
+        if self.bounds is not None:
+            ok &= np.all((flat >= self.bounds[0]) & (flat <= self.bounds[1]), axis=1)
+        if self.map_data is not None:
+            ok[ok] = self.map_data.query(flat[ok]) >= self.config.safety_margin_m
+        return ok.reshape(shape)
+
+    def heuristic(self, positions, velocities, goal_pos, goal_vel) -> np.ndarray:
+        t_min = min_time_lower_bound(positions, velocities, goal_pos, goal_vel,
+                                     self.config.max_vel, self.config.max_acc)
+        return self.config.heuristic_weight * self.config.rho * t_min
+
+    def _try_shot(self, p0, v0, goal_pos, goal_vel) -> Optional[Tuple[np.ndarray, float]]:
+        """Analytic cubic to the goal, accepted if feasible and collision-free."""
+        cfg = self.config
+        t_min = float(min_time_lower_bound(p0, v0, goal_pos, goal_vel, cfg.max_vel, cfg.max_acc))
+        for duration in (max(t_min, 1e-3) * s for s in (1.0, 1.5, 2.0)):
+            coeffs = _shot_coefficients(p0, v0, goal_pos, goal_vel, duration)
+            n = max(2, int(np.ceil(np.linalg.norm(goal_pos - p0) / cfg.check_resolution_m)) + 1)
+            t = np.linspace(0.0, duration, n)[:, None]
+            vel = coeffs[1] + 2 * coeffs[2] * t + 3 * coeffs[3] * t ** 2
+            acc = 2 * coeffs[2] + 6 * coeffs[3] * t
+            if (np.max(np.linalg.norm(vel, axis=1)) > cfg.max_vel + 1e-6
+                    or np.max(np.linalg.norm(acc, axis=1)) > cfg.max_acc + 1e-6):
+                continue
+            pos = coeffs[0] + coeffs[1] * t + coeffs[2] * t ** 2 + coeffs[3] * t ** 3
+            if np.all(self._is_free(pos)):
+                return coeffs, duration
+        return None
+
+    def _state_keys(self, positions: np.ndarray, velocities: np.ndarray) -> List[int]:
+        """Pack discretized (position, velocity) bins of (N, 3) states into ints."""
+        cfg = self.config
+        pos_bins = np.floor(positions / cfg.closed_set_resolution_m).astype(np.int64) + (1 << 11)
+        vel_bins = np.floor(velocities / cfg.velocity_bin_m_s).astype(np.int64) + (1 << 5)
+        bins = np.concatenate([pos_bins, vel_bins], axis=-1).reshape(-1, 6)
+        shifts = np.array([42, 30, 18, 12, 6, 0], dtype=np.int64)
+        return np.bitwise_or.reduce(bins << shifts, axis=1).tolist()
+
+    def _check_columns(self, speed: float) -> np.ndarray:
+        """Check-time columns spaced at most ``check_resolution_m`` apart at this speed."""
+        cfg = self.config
+        total = self.primitives.check_times.shape[1]
+        tau = float(np.max(self.primitives.durations))
+        travel = speed * tau + 0.5 * cfg.max_acc * tau ** 2
+        needed = max(1, int(np.ceil(travel / cfg.check_resolution_m)))
+        stride = max(1, total // needed)
+        return np.arange(total - 1, -1, -stride)[::-1]
+
+    @profiled('planner.global_search')
+    def search(self, start_pos, start_vel, goal_pos, goal_vel=None) -> SearchResult:
+        """Search from (start_pos, start_vel) to goal_pos (optionally goal_vel)."""
+        start_time = time.perf_counter()
+        cfg, prims = self.config, self.primitives
+        start_pos = np.asarray(start_pos, dtype=np.float64)
+        start_vel = np.zeros(3) if start_vel is None else np.asarray(start_vel, dtype=np.float64)
+        goal_pos = np.asarray(goal_pos, dtype=np.float64)
+        goal_vel = np.zeros(3) if goal_vel is None else np.asarray(goal_vel, dtype=np.float64)
+
+        # Node storage: parallel lists indexed by node id
+        positions, velocities, parents, prim_ids = [start_pos], [start_vel], [-1], [-1]
+        node_keys = self._state_keys(start_pos[None], start_vel[None])
+        g_cost: Dict[int, float] = {node_keys[0]: 0.0}
+        h0 = float(self.heuristic(start_pos, start_vel, goal_pos, goal_vel))
+        open_heap = [(h0, 0.0, 0)]
+        closed = set()
+        expanded = 0
+
+        while open_heap and expanded < cfg.max_expansions:
+            _, g, node = heapq.heappop(open_heap)
+            if node_keys[node] in closed:
+                continue
+            closed.add(node_keys[node])
+            expanded += 1
+            p, v = positions[node], velocities[node]
+
+            dist_to_goal = np.linalg.norm(goal_pos - p)
+            if dist_to_goal <= cfg.goal_tolerance_m and np.linalg.norm(goal_vel - v) <= cfg.velocity_bin_m_s:
+                path = self._reconstruct(node, positions, velocities, parents, prim_ids)
+                return SearchResult(True, path, expanded, time.perf_counter() - start_time, 'reached')
+            if dist_to_goal <= cfg.shot_radius_m:
+                shot = self._try_shot(p, v, goal_pos, goal_vel)
+                if shot is not None:
+                    path = self._reconstruct(node, positions, velocities, parents, prim_ids)
+                    path.append_cubic(*shot)
+                    return SearchResult(True, path, expanded, time.perf_counter() - start_time, 'shot')
+
+            # Expand every primitive at once, checking only as densely as this speed needs
+            columns = self._check_columns(float(np.linalg.norm(v)))
+            t = prims.check_times[:, columns, None]
+            samples = p + v * t + prims.accel_offsets[:, columns]     # (M, S, 3)
+            end_vel = v + prims.velocity_deltas                        # (M, 3)
+            vel_ok = np.linalg.norm(end_vel, axis=1) <= cfg.max_vel
+            free = np.zeros(len(end_vel), dtype=bool)
+            free[vel_ok] = np.all(self._is_free(samples[vel_ok]), axis=1)
+            if not free.any():
+                continue
+
+            children = np.flatnonzero(free)
+            end_pos = samples[children, -1]
+            child_vel = end_vel[children]
+            child_g = g + prims.costs[children]
+            child_f = child_g + self.heuristic(end_pos, child_vel, goal_pos, goal_vel)
+            child_keys = self._state_keys(end_pos, child_vel)
+
+            for i, (child_key, m) in enumerate(zip(child_keys, children.tolist())):
+                if child_key in closed or g_cost.get(child_key, np.inf) <= child_g[i]:
+                    continue
+                g_cost[child_key] = child_g[i]
+                positions.append(end_pos[i])
+                velocities.append(child_vel[i])
+                parents.append(node)
+                prim_ids.append(m)
+                node_keys.append(child_key)
+                heapq.heappush(open_heap, (float(child_f[i]), float(child_g[i]), len(positions) - 1))
+
+        status = 'max_expansions' if expanded >= cfg.max_expansions else 'no_path'
+        return SearchResult(False, None, expanded, time.perf_counter() - start_time, status)
+
+    def _reconstruct(self, node, positions, velocities, parents, prim_ids) -> KinodynamicPath:
+        chain = []
+        while parents[node] >= 0:
+            chain.append(node)
+            node = parents[node]
+        path = KinodynamicPath()
+        for child in reversed(chain):
+            parent = parents[child]
+            m = prim_ids[child]
+            path.append_constant_acc(positions[parent], velocities[parent],
+                                     self.primitives.accelerations[m], self.primitives.durations[m])
+        return path
@@ -1,5 +1,80 @@
-"""Kinodynamic trajectory planning stubs."""
+"""Kinodynamic trajectory planning.
 
-def plan_trajectory(start_state, goal_state, map_data):
-    # TODO: Run kinodynamic search and smooth with B-spline optimization
-    return None
+Entry point of the global planner: kinodynamic A* over a motion-primitive
+lattice (see kinodynamic_astar.py) produces a dynamically feasible initial
+path between two states, which is then fitted with a uniform B-spline and
+smoothed against the ESDF (see bspline_optimizer.py).
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from .bspline_optimizer import BsplineOptimizer, BsplineOptimizerConfig, UniformBspline
+from .kinodynamic_astar import KinodynamicAStar, KinodynamicConfig, KinodynamicPath
+
+
+@dataclass
+class PlanResult:
+    """Planned trajectory plus search/optimization statistics."""
+
+    success: bool
+    trajectory: Optional[UniformBspline]
+    path: Optional[KinodynamicPath]
+    nodes_expanded: int
+    search_time_s: float
+    optimize_time_s: float = 0.0
+    status: str = ''
+
+
+def _as_state(state) -> Dict[str, np.ndarray]:
+    """Normalize a state given as a dict or an array to position/velocity arrays.
+
+    Accepts dicts with ``position``/``velocity`` or observation-style
+    ``odom_pos``/``odom_vel`` keys, or arrays of shape (3,) or (6,).
+    """
+    if isinstance(state, dict):
+        pos = state.get('position', state.get('odom_pos'))
+        vel = state.get('velocity', state.get('odom_vel'))
+    else:
+        arr = np.asarray(state, dtype=np.float64).reshape(-1)
+        pos, vel = arr[:3], (arr[3:6] if arr.size >= 6 else None)
+    return {
+        'position': np.asarray(pos, dtype=np.float64),
+        'velocity': np.zeros(3) if vel is None else np.asarray(vel, dtype=np.float64),
+    }
+
+
+def plan_trajectory(start_state, goal_state, map_data,
+                    config: Optional[KinodynamicConfig] = None,
+                    optimizer_config: Optional[BsplineOptimizerConfig] = None) -> PlanResult:
+    """Run kinodynamic search from start to goal and smooth the result.
+
+    Args:
+        start_state: Start state (dict or array, see ``_as_state``)
+        goal_state: Goal state (dict or array, see ``_as_state``)
+        map_data: ESDF exposing ``query(points)`` and ``interpolate(points,
+            return_gradient=True)`` (e.g. EsdfMap), or None
+        config: Search parameters (defaults to the Phase 2 limits)
+        optimizer_config: B-spline cost weights (limits default to the same
+            Phase 2 values)
+
+    Returns:
+        PlanResult with the B-spline trajectory, the raw search path and timings
+    """
+    start, goal = _as_state(start_state), _as_state(goal_state)
+    planner = KinodynamicAStar(config, map_data)
+    search = planner.search(start['position'], start['velocity'], goal['position'], goal['velocity'])
+    if not search.success:
+        return PlanResult(False, None, search.path, search.nodes_expanded, search.search_time_s,
+                          status=search.status)
+
+    t0 = time.perf_counter()
+    optimizer = BsplineOptimizer(optimizer_config or BsplineOptimizerConfig(
+        max_vel=planner.config.max_vel, max_acc=planner.config.max_acc), map_data)
+    initial = UniformBspline.from_trajectory(search.path, optimizer.config.control_point_spacing_m)
+    optimized = optimizer.optimize(initial)
+    return PlanResult(True, optimized.bspline, search.path, search.nodes_expanded,
+                      search.search_time_s, time.perf_counter() - t0, search.status)
@@ -1,5 +1,270 @@
-"""Local replanning loop stubs."""
+"""Local replanning loop.
 
-def refine_trajectory(nominal_path, feedback):
-    # TODO: Adjust trajectory at 10 Hz using latest state feedback
-    return None
+Refines the global B-spline at 10 Hz while the controller tracks it at 50 Hz.
+Each call gets a hard time budget (by default the 100 ms replan period) and
+is anytime: it returns the best feasible trajectory found when the budget
+runs out, falling back to the previous trajectory, so a slow replan can never
+stall control.
+
+Only the part of the trajectory near an ESDF change is re-optimized. The
+clearance of every control point is cached between calls; control points
+whose clearance changed (or dropped below the safety distance) define a
+window, and the unchanged prefix/suffix of the previous trajectory is reused
+as-is. The control points shaping the segment currently being flown are
+never modified.
+"""
+
+import importlib
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, Optional
+
+import numpy as np
+
+from tools.profiling import profiled
+
+# 'global' is a Python keyword, so the sibling subpackage is imported by name
+_bspline = importlib.import_module('..global.bspline_optimizer', __package__)
+BsplineOptimizer = _bspline.BsplineOptimizer
+BsplineOptimizerConfig = _bspline.BsplineOptimizerConfig
+UniformBspline = _bspline.UniformBspline
+FIXED_POINTS = _bspline.FIXED_POINTS
+
+PHASES = ('detect', 'optimize', 'validate', 'splice')
+
+
+@dataclass(frozen=True)
+class ReplannerConfig:
+    """Timing and window parameters of the local replanner."""
+
+    budget_s: float = 0.1                 # 10 Hz replan period
+    splice_reserve_s: float = 0.005       # kept back from the optimizer for validation/splicing
+    clearance_change_m: float = 0.05      # clearance change that marks a control point as affected
+    window_padding: int = 4               # extra free control points on each side of the change
+    collision_distance_m: float = 0.2     # minimum clearance of a feasible trajectory
+    validation_dt: float = 0.05
+    max_rounds: int = 4                   # distance-weight escalations per call
+    optimizer: BsplineOptimizerConfig = field(default_factory=BsplineOptimizerConfig)
+
+
+@dataclass
+class ReplanResult:
+    """Outcome of one replanning call."""
+
+    trajectory: UniformBspline
+    status: str                           # 'reused', 'optimized', 'fallback' or 'infeasible'
+    feasible: bool
+    deadline_missed: bool
+    timings: Dict[str, float]
+    window: Optional[tuple] = None        # (first, last) modified control point indices
+
+
+class LocalReplanner:
+    """Deadline-aware, window-local B-spline re-optimization.
+
+    Example:
+        >>> replanner = LocalReplanner(esdf)
+        >>> result = replanner.refine(plan.trajectory, {'t': 1.3})
+        >>> replanner.stats['deadline_misses']
+    """
+
+    def __init__(self, esdf=None, config: Optional[ReplannerConfig] = None):
+        """Initialize the replanner.
+
+        Args:
+            esdf: Map exposing ``interpolate(points, return_gradient=True)``
+                (e.g. EsdfMap); may also be passed per call via feedback
+            config: Replanner parameters
+        """
+        self.esdf = esdf
+        self.config = config or ReplannerConfig()
+        self.stats = {'calls': 0, 'deadline_misses': 0, 'reused': 0, 'optimized': 0,
+                      'fallback': 0, 'infeasible': 0}
+        self.phase_times = {phase: [] for phase in PHASES + ('total',)}
+
+        self._cached_points: Optional[np.ndarray] = None
+        self._cached_clearance: Optional[np.ndarray] = None
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _current_segment(self, trajectory: UniformBspline, feedback: Dict) -> int:
+        """Segment being flown, from ``feedback['t']`` or the nearest control point."""
+        if 't' in feedback:
+            return int(np.clip(feedback['t'] / trajectory.dt, 0, trajectory.num_segments - 1))
+        position = feedback.get('position', feedback.get('odom_pos'))
+        if position is None:
+            return 0
+        offsets = trajectory.control_points - np.asarray(position, dtype=np.float64)
+        nearest = int(np.argmin(np.einsum('nd,nd->n', offsets, offsets)))
+        return int(np.clip(nearest - 1, 0, trajectory.num_segments - 1))
+
+    def _affected(self, trajectory: UniformBspline, clearance: np.ndarray) -> np.ndarray:
+        """Boolean mask of control points near an ESDF change or in collision.
+
+        Without a cache for these control points (first call, or a new global
+        trajectory) every point closer than the safety distance counts.
+        """
+        cfg = self.config
+        cached = self._cached_points
+        if cached is None or cached.shape != trajectory.control_points.shape:
+            return clearance < cfg.optimizer.safety_distance_m
+        same = np.all(cached == trajectory.control_points, axis=1)
+        changed = np.abs(clearance - self._cached_clearance) > cfg.clearance_change_m
+        return (same & changed) | (clearance < cfg.collision_distance_m)
+
+    def _feasible(self, trajectory: UniformBspline, esdf, t_start: float, t_end: float) -> bool:
+        """Clearance and speed/acceleration-magnitude check of the trajectory between two times."""
+        cfg = self.config
+        times = np.append(np.arange(t_start, t_end, cfg.validation_dt), t_end)
+        if esdf is not None and esdf.interpolate(trajectory.evaluate(times)).min() < cfg.collision_distance_m:
+            return False
+        limits = cfg.optimizer
+        vel = np.linalg.norm(trajectory.evaluate(times, derivative=1), axis=1).max()
+        acc = np.linalg.norm(trajectory.evaluate(times, derivative=2), axis=1).max()
+        return bool(vel <= limits.max_vel * 1.05 and acc <= limits.max_acc * 1.05)
+
+    def _record(self, result: ReplanResult) -> ReplanResult:
+        self.stats['calls'] += 1
+        self.stats[result.status] += 1
+        self.stats['deadline_misses'] += int(result.deadline_missed)
+        for phase, value in result.timings.items():
+            self.phase_times[phase].append(value)
+        return result
+
+    def timing_summary(self) -> Dict[str, Dict[str, float]]:
+        """Median/p95/max per phase in milliseconds over all calls so far."""
+        summary = {}
+        for phase, values in self.phase_times.items():
+            if values:
+                v = np.asarray(values) * 1e3
+                summary[phase] = {'p50_ms': float(np.median(v)), 'p95_ms': float(np.percentile(v, 95)),
+                                  'max_ms': float(v.max())}
+        return summary
+
+    # ------------------------------------------------------------------
+    # Replanning
+    # ------------------------------------------------------------------
+
+    @profiled('planner.replan')
+    def refine(self, trajectory: UniformBspline, feedback: Optional[Dict] = None,
+               budget_s: Optional[float] = None) -> ReplanResult:
+        """Refine ``trajectory`` within a hard time budget.
+
+        Args:
+            trajectory: Trajectory currently being tracked
+            feedback: Dict with the tracking time ``t`` (seconds since the
+                trajectory start) and/or the current ``position``/``odom_pos``,
+                optionally an updated ``esdf``
+            budget_s: Time budget for this call (defaults to ``config.budget_s``)
+
+        Returns:
+            ReplanResult whose trajectory is the best feasible one found (the
+            input trajectory if nothing better was found in time)
+        """
+        start = time.perf_counter()
+        feedback = feedback or {}
+        cfg = self.config
+        budget = cfg.budget_s if budget_s is None else float(budget_s)
+        deadline = start + budget - min(cfg.splice_reserve_s, 0.25 * budget)
+        esdf = feedback.get('esdf', self.esdf)
+        timings = dict.fromkeys(PHASES, 0.0)
+
+        # Detect: which control points see a different map than last time
+        q = trajectory.control_points
+        n = q.shape[0]
+        segment = self._current_segment(trajectory, feedback)
+        clearance = esdf.interpolate(q) if esdf is not None else np.full(n, np.inf)
+        affected = self._affected(trajectory, clearance)
+        # Points shaping the current segment are committed
+        affected[:segment + 4] = False
+        t = time.perf_counter()
+        timings['detect'] = t - start
+
+        # The cache only advances once the change is resolved: after a
+        # fallback or a missed deadline the next call sees it again
+        if not affected.any():
+            self._cached_points, self._cached_clearance = q.copy(), clearance
+            timings['total'] = t - start
+            return self._record(ReplanResult(trajectory, 'reused', True, t - start > budget, timings))
+
+        hits = np.flatnonzero(affected)
+        first = max(int(hits[0]) - cfg.window_padding, segment + 1 + FIXED_POINTS)
+        last = min(int(hits[-1]) + cfg.window_padding, n - 1 - FIXED_POINTS)
+        lo, hi = first - FIXED_POINTS, last + FIXED_POINTS + 1
+        if last < first:
+            # The change is too close to the horizon end to leave any free
+            # control points; keep the trajectory if it is still feasible
+            ok = self._feasible(trajectory, esdf, segment * trajectory.dt, trajectory.total_time)
+            end = time.perf_counter()
+            timings['validate'] = end - t
+            timings['total'] = end - start
+            return self._record(ReplanResult(trajectory, 'fallback' if ok else 'infeasible', ok,
+                                             timings['total'] > budget, timings))
+
+        # Optimize the window; escalate the clearance weight while infeasible
+        window = UniformBspline(q[lo:hi], trajectory.dt)
+        t_lo, t_hi = lo * trajectory.dt, max(hi - 3, lo + 1) * trajectory.dt
+        best, status = None, 'infeasible'
+        opt_cfg = cfg.optimizer
+        for _ in range(cfg.max_rounds):
+            t0 = time.perf_counter()
+            if t0 >= deadline:
+                break
+            result = BsplineOptimizer(opt_cfg, esdf).optimize(window, deadline=deadline)
+            t1 = time.perf_counter()
+            timings['optimize'] += t1 - t0
+
+            candidate = np.array(q)
+            candidate[lo:hi] = result.bspline.control_points
+            candidate = UniformBspline(candidate, trajectory.dt)
+            ok = self._feasible(candidate, esdf, t_lo, t_hi)
+            timings['validate'] += time.perf_counter() - t1
+            window = result.bspline
+            if ok:
+                best, status = candidate, 'optimized'
+                if result.converged:
+                    break
+            elif best is not None:
+                break
+            else:
+                opt_cfg = replace(opt_cfg, distance_weight=opt_cfg.distance_weight * 4.0)
+
+        # Splice: otherwise keep the previous trajectory (flagged if it is no
+        # longer feasible, so the caller can trigger a global replan)
+        t0 = time.perf_counter()
+        if best is None:
+            best = trajectory
+            if self._feasible(trajectory, esdf, t_lo, t_hi):
+                status = 'fallback'
+        else:
+            self._cached_points = best.control_points.copy()
+            self._cached_clearance = esdf.interpolate(best.control_points) if esdf is not None else clearance
+        end = time.perf_counter()
+        timings['splice'] = end - t0
+        timings['total'] = end - start
+
+        return self._record(ReplanResult(best, status, status in ('optimized', 'fallback'),
+                                         timings['total'] > budget, timings, (first, last)))
+
+
+def refine_trajectory(nominal_path, feedback, replanner: Optional[LocalReplanner] = None) -> ReplanResult:
+    """Adjust the trajectory at 10 Hz using the latest state feedback.
+
+    Args:
+        nominal_path: Trajectory being tracked (UniformBspline, a PlanResult
+            with ``trajectory``, or any path exposing ``total_time``/``evaluate``)
+        feedback: See ``LocalReplanner.refine``; ``budget_s`` overrides the
+            time budget for this call
+        replanner: Persistent replanner (keeps the ESDF-change cache and the
+            timing statistics between calls); a fresh one is used if omitted
+
+    Returns:
+        ReplanResult with the refined trajectory, timings and deadline flag
+    """
+    trajectory = getattr(nominal_path, 'trajectory', nominal_path)
+    if not isinstance(trajectory, UniformBspline):
+        trajectory = UniformBspline.from_trajectory(trajectory)
+    replanner = replanner or LocalReplanner()
+    return replanner.refine(trajectory, feedback, feedback.get('budget_s') if feedback else None)
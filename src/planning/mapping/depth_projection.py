@@ -0,0 +1,193 @@
+"""Depth image back-projection with cached ray tables.
+
+Turns batches of ``distance_to_image_plane`` frames plus odometry poses into
+world-frame point clouds in a single vectorized pass. Per-pixel ray directions
+depend only on the camera intrinsics and resolution, so they are computed once
+per configuration and reused for every frame.
+
+Conventions:
+    - Quaternions are (w, x, y, z) as in Isaac Lab, body frame is x-forward,
+      y-left, z-up.
+    - The camera optical frame is x-right, y-down, z-forward (ROS convention,
+      matching the camera offset in IsaacSimEnvironment.setup_sensors).
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+# Optical (x right, y down, z forward) -> body (x forward, y left, z up).
+OPTICAL_TO_BODY = np.array([
+    [0.0, 0.0, 1.0],
+    [-1.0, 0.0, 0.0],
+    [0.0, -1.0, 0.0],
+], dtype=np.float64)
+
+
+@dataclass(frozen=True)
+class CameraIntrinsics:
+    """Pinhole depth camera parameters (hashable, used as the ray cache key)."""
+
+    width: int = 640
+    height: int = 480
+    hfov_deg: float = 90.0
+    vfov_deg: float = 60.0
+    min_depth_m: float = 0.1
+    max_depth_m: float = 30.0
+    mount_position: Tuple[float, float, float] = (0.1, 0.0, 0.0)
+
+    @classmethod
+    def from_sensor_config(cls, sensor_config: Dict) -> 'CameraIntrinsics':
+        """Build intrinsics from the full sensors.yaml dict or its depth_camera block."""
+        depth_cfg = sensor_config.get('depth_camera', sensor_config)
+        resolution = depth_cfg.get('resolution', {})
+        fov = depth_cfg.get('fov', {})
+        mount = depth_cfg.get('mount', {})
+        return cls(
+            width=int(resolution.get('width', 640)),
+            height=int(resolution.get('height', 480)),
+            hfov_deg=float(fov.get('horizontal_deg', 90.0)),
+            vfov_deg=float(fov.get('vertical_deg', 60.0)),
+            min_depth_m=float(depth_cfg.get('min_depth_m', 0.1)),
+            max_depth_m=float(depth_cfg.get('max_depth_m', 30.0)),
+            mount_position=tuple(float(v) for v in mount.get('position', [0.1, 0.0, 0.0])),
+        )
+
+    @property
+    def focal_lengths(self) -> Tuple[float, float]:
+        """(fx, fy) in pixels."""
+        fx = (self.width / 2.0) / np.tan(np.radians(self.hfov_deg) / 2.0)
+        fy = (self.height / 2.0) / np.tan(np.radians(self.vfov_deg) / 2.0)
+        return fx, fy
+
+
+def quat_to_rotation_matrix(quat) -> np.ndarray:
+    """Convert (w, x, y, z) quaternions of shape (..., 4) to rotation matrices (..., 3, 3)."""
+    q = np.asarray(quat, dtype=np.float64)
+    q = q / np.linalg.norm(q, axis=-1, keepdims=True)
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+
+    rot = np.empty(q.shape[:-1] + (3, 3), dtype=np.float64)
+    rot[..., 0, 0] = 1 - 2 * (y * y + z * z)
+    rot[..., 0, 1] = 2 * (x * y - w * z)
+    rot[..., 0, 2] = 2 * (x * z + w * y)
+    rot[..., 1, 0] = 2 * (x * y + w * z)
+    rot[..., 1, 1] = 1 - 2 * (x * x + z * z)
+    rot[..., 1, 2] = 2 * (y * z - w * x)
+    rot[..., 2, 0] = 2 * (x * z - w * y)
+    rot[..., 2, 1] = 2 * (y * z + w * x)
+    rot[..., 2, 2] = 1 - 2 * (x * x + y * y)
+    return rot
+
+
+@lru_cache(maxsize=16)
+def ray_table(intrinsics: CameraIntrinsics) -> np.ndarray:
+    """Per-pixel optical-frame rays scaled so that z == 1.
+
+    Multiplying by a ``distance_to_image_plane`` value gives the 3D point.
+    The returned array is cached and read-only.
+
+    Returns:
+        (H, W, 3) float32 array
+    """
+    fx, fy = intrinsics.focal_lengths
+    cx, cy = (intrinsics.width - 1) / 2.0, (intrinsics.height - 1) / 2.0
+
+    u = (np.arange(intrinsics.width, dtype=np.float32) - cx) / fx
+    v = (np.arange(intrinsics.height, dtype=np.float32) - cy) / fy
+    rays = np.empty((intrinsics.height, intrinsics.width, 3), dtype=np.float32)
+    rays[..., 0] = u[None, :]
+    rays[..., 1] = v[:, None]
+    rays[..., 2] = 1.0
+    rays.flags.writeable = False
+    return rays
+
+
+def camera_rays(width: int = 640, height: int = 480,
+                hfov_deg: float = 90.0, vfov_deg: float = 60.0) -> np.ndarray:
+    """Convenience wrapper around ``ray_table`` for bare resolution/FOV values."""
+    return ray_table(CameraIntrinsics(width=width, height=height, hfov_deg=hfov_deg, vfov_deg=vfov_deg))
+
+
+def to_numpy(data) -> np.ndarray:
+    """Return a NumPy view of array-likes, copying torch tensors to host if needed."""
+    if hasattr(data, 'detach'):
+        data = data.detach().cpu().numpy()
+    return np.asarray(data)
+
+
+def camera_poses(positions, quats, intrinsics: CameraIntrinsics) -> Tuple[np.ndarray, np.ndarray]:
+    """Optical-frame rotations (K, 3, 3) and origins (K, 3) for K body poses."""
+    rot_wb = quat_to_rotation_matrix(np.asarray(quats).reshape(-1, 4))
+    rot_wc = rot_wb @ OPTICAL_TO_BODY
+    origins = np.asarray(positions, dtype=np.float64).reshape(-1, 3) + rot_wb @ np.asarray(intrinsics.mount_position)
+    return rot_wc, origins
+
+
+def project_depth_batch(depth_frames, positions, quats,
+                        intrinsics: Optional[CameraIntrinsics] = None,
+                        stride: int = 1,
+                        voxel_size: Optional[float] = None,
+                        return_frame_index: bool = False):
+    """Back-project K depth frames into one world-frame point cloud.
+
+    Args:
+        depth_frames: (K, H, W) or (H, W) distance_to_image_plane frames
+            (a trailing channel axis of size 1 is accepted)
+        positions: (K, 3) body positions in world frame
+        quats: (K, 4) body orientations (w, x, y, z)
+        intrinsics: Camera parameters (defaults to the sensors.yaml defaults)
+        stride: Keep every ``stride``-th pixel in both image axes
+        voxel_size: If set, merge points into voxel centroids of this size
+        return_frame_index: Also return the source frame of each point
+            (ignored when voxel downsampling merges frames)
+
+    Returns:
+        (N, 3) float32 world points, plus an (N,) int array of frame indices
+        when ``return_frame_index`` is set
+    """
+    intrinsics = intrinsics or CameraIntrinsics()
+    depth = to_numpy(depth_frames).astype(np.float32, copy=False)
+    if depth.ndim == 4 and depth.shape[-1] == 1:
+        depth = depth[..., 0]
+    if depth.ndim == 2:
+        depth = depth[None]
+
+    depth = depth[:, ::stride, ::stride]
+    rays = ray_table(intrinsics)[::stride, ::stride]
+    rot_wc, origins = camera_poses(positions, quats, intrinsics)
+
+    # Rotate the shared ray table once per frame and scale by depth: (K, H, W, 3)
+    points = np.einsum('kij,hwj->khwi', rot_wc.astype(np.float32), rays, optimize=True)
+    with np.errstate(invalid='ignore'):
+        points *= depth[..., None]
+    points += origins.astype(np.float32)[:, None, None, :]
+
+    valid = np.isfinite(depth) & (depth >= intrinsics.min_depth_m) & (depth <= intrinsics.max_depth_m)
+    points = points[valid]
+
+    if voxel_size is not None:
+        return voxel_downsample(points, voxel_size)
+    if return_frame_index:
+        return points, np.nonzero(valid)[0]
+    return points
+
+
+def voxel_downsample(points: np.ndarray, voxel_size: float) -> np.ndarray:
+    """Replace all points falling in the same voxel by their centroid."""
+    points = np.asarray(points, dtype=np.float32)
+    if points.shape[0] == 0:
+        return points
+    keys = np.floor(points / voxel_size).astype(np.int64)
+    keys -= keys.min(axis=0)
+    extent = keys.max(axis=0) + 1
+    flat = (keys[:, 0] * extent[1] + keys[:, 1]) * extent[2] + keys[:, 2]
+    _, inverse, counts = np.unique(flat, return_inverse=True, return_counts=True)
+
+    centroids = np.empty((counts.size, 3), dtype=np.float32)
+    for axis in range(3):
+        centroids[:, axis] = np.bincount(inverse, weights=points[:, axis], minlength=counts.size) / counts
+    return centroids
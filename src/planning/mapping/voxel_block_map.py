@@ -0,0 +1,231 @@
+"""Sparse block-hashed voxel storage.
+
+Scenes can be up to 50x50x10 m (scenes_config.yaml), but most of that volume
+is free space the drone never observes. ``VoxelBlockMap`` allocates fixed-size
+dense blocks (e.g. 8³ voxels) on demand and keeps them in a contiguous pool;
+a hash table maps block coordinates to pool slots, so a voxel lookup is one
+dict probe plus an array index. Blocks far from the drone can be evicted to
+keep memory bounded by a sliding window.
+
+Example:
+    >>> store = VoxelBlockMap(resolution=0.1, block_size=8, default=0.0)
+    >>> store.set(points, values)
+    >>> store.get(points)
+    >>> store.evict_outside(center=drone_pos, half_extent_m=(15.0, 15.0, 5.0))
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Block coordinates are packed into one int64 key: 21 bits per axis, offset so
+# that negative coordinates stay positive (covers ±1M blocks per axis).
+_KEY_BITS = 21
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+_KEY_MASK = (1 << _KEY_BITS) - 1
+
+
+def pack_block_keys(block_coords: np.ndarray) -> np.ndarray:
+    """Pack (N, 3) integer block coordinates into (N,) int64 hash keys."""
+    c = np.asarray(block_coords, dtype=np.int64) + _KEY_OFFSET
+    return (c[:, 0] << (2 * _KEY_BITS)) | (c[:, 1] << _KEY_BITS) | c[:, 2]
+
+
+def unpack_block_keys(keys: np.ndarray) -> np.ndarray:
+    """Inverse of ``pack_block_keys``."""
+    keys = np.asarray(keys, dtype=np.int64)
+    coords = np.stack([
+        (keys >> (2 * _KEY_BITS)) & _KEY_MASK,
+        (keys >> _KEY_BITS) & _KEY_MASK,
+        keys & _KEY_MASK,
+    ], axis=-1)
+    return coords - _KEY_OFFSET
+
+
+class VoxelBlockMap:
+    """Hash map of dense voxel blocks allocated on demand."""
+
+    def __init__(self,
+                 resolution: float = 0.1,
+                 block_size: int = 8,
+                 default: float = 0.0,
+                 dtype=np.float32,
+                 initial_capacity: int = 256):
+        """Initialize an empty store.
+
+        Args:
+            resolution: Voxel edge length in metres
+            block_size: Voxels per block edge
+            default: Value reported for voxels in unallocated blocks and used
+                to initialise new blocks
+            dtype: Voxel value dtype
+            initial_capacity: Number of blocks preallocated in the pool
+        """
+        self.resolution = float(resolution)
+        self.block_size = int(block_size)
+        self.default = default
+        self.dtype = np.dtype(dtype)
+
+        self._voxels_per_block = self.block_size ** 3
+        self._pool = np.full((initial_capacity, self._voxels_per_block), default, dtype=self.dtype)
+        self._slots: Dict[int, int] = {}        # packed block key -> pool slot
+        self._keys = np.full(initial_capacity, -1, dtype=np.int64)  # pool slot -> key
+        self._free = list(range(initial_capacity - 1, -1, -1))
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    @property
+    def num_blocks(self) -> int:
+        """Number of allocated blocks."""
+        return len(self._slots)
+
+    @property
+    def block_size_m(self) -> float:
+        """Block edge length in metres."""
+        return self.block_size * self.resolution
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the block pool and its bookkeeping."""
+        return int(self._pool.nbytes + self._keys.nbytes)
+
+    def block_coords(self) -> np.ndarray:
+        """(num_blocks, 3) integer coordinates of allocated blocks."""
+        return unpack_block_keys(np.fromiter(self._slots.keys(), dtype=np.int64, count=len(self._slots)))
+
+    # ------------------------------------------------------------------
+    # Addressing
+    # ------------------------------------------------------------------
+
+    def _address(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Packed block keys and in-block flat offsets for (N, 3) world points."""
+        voxel = np.floor(np.asarray(points, dtype=np.float64).reshape(-1, 3) / self.resolution).astype(np.int64)
+        block = np.floor_divide(voxel, self.block_size)
+        local = voxel - block * self.block_size
+        b = self.block_size
+        offset = (local[:, 0] * b + local[:, 1]) * b + local[:, 2]
+        return pack_block_keys(block), offset
+
+    def _lookup_slots(self, keys: np.ndarray, allocate: bool) -> np.ndarray:
+        """Pool slot per key (-1 if missing and not allocating).
+
+        One dict probe per distinct block touched by the batch.
+        """
+        unique, inverse = np.unique(keys, return_inverse=True)
+        slots = np.empty(unique.size, dtype=np.int64)
+        get = self._slots.get
+        for i, key in enumerate(unique.tolist()):
+            slot = get(key, -1)
+            if slot < 0 and allocate:
+                slot = self._allocate(key)
+            slots[i] = slot
+        return slots[inverse.reshape(-1)]
+
+    def _allocate(self, key: int) -> int:
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self._slots[key] = slot
+        self._keys[slot] = key
+        return slot
+
+    def _grow(self):
+        """Double the pool capacity."""
+        old = self._pool.shape[0]
+        new = max(1, old) * 2
+        pool = np.full((new, self._voxels_per_block), self.default, dtype=self.dtype)
+        pool[:old] = self._pool
+        keys = np.full(new, -1, dtype=np.int64)
+        keys[:old] = self._keys
+        self._pool, self._keys = pool, keys
+        self._free.extend(range(new - 1, old - 1, -1))
+
+    # ------------------------------------------------------------------
+    # Voxel access
+    # ------------------------------------------------------------------
+
+    def get(self, points: np.ndarray) -> np.ndarray:
+        """Voxel values at (N, 3) world points (``default`` where unallocated)."""
+        keys, offset = self._address(points)
+        slot = self._lookup_slots(keys, allocate=False)
+        out = np.full(keys.shape[0], self.default, dtype=self.dtype)
+        hit = slot >= 0
+        out[hit] = self._pool[slot[hit], offset[hit]]
+        return out
+
+    def set(self, points: np.ndarray, values):
+        """Write values at (N, 3) world points, allocating blocks as needed."""
+        keys, offset = self._address(points)
+        slot = self._lookup_slots(keys, allocate=True)
+        self._pool[slot, offset] = values
+
+    def add(self, points: np.ndarray, delta, clip: Optional[Tuple[float, float]] = None):
+        """Accumulate ``delta`` at (N, 3) world points (repeated voxels add up).
+
+        Args:
+            points: (N, 3) world points
+            delta: Scalar or (N,) increments
+            clip: Optional (min, max) applied to the touched voxels afterwards
+                (e.g. log-odds clamping)
+        """
+        keys, offset = self._address(points)
+        slot = self._lookup_slots(keys, allocate=True)
+        flat = slot * self._voxels_per_block + offset
+        pool = self._pool.reshape(-1)
+        np.add.at(pool, flat, np.broadcast_to(np.asarray(delta, dtype=self.dtype), flat.shape))
+        if clip is not None:
+            pool[flat] = np.clip(pool[flat], clip[0], clip[1])
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        """Boolean mask of points whose block is allocated."""
+        keys, _ = self._address(points)
+        return self._lookup_slots(keys, allocate=False) >= 0
+
+    def get_block(self, block_coord: Sequence[int]) -> Optional[np.ndarray]:
+        """Writable (B, B, B) view of one block, or None if unallocated."""
+        key = int(pack_block_keys(np.asarray([block_coord]))[0])
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        b = self.block_size
+        return self._pool[slot].reshape(b, b, b)
+
+    # ------------------------------------------------------------------
+    # Sliding window
+    # ------------------------------------------------------------------
+
+    def evict_outside(self, center: Sequence[float], half_extent_m: Sequence[float]) -> int:
+        """Free every block lying entirely outside an axis-aligned window.
+
+        Args:
+            center: Window centre in world frame (typically the drone position)
+            half_extent_m: Window half size [x, y, z] in metres
+
+        Returns:
+            Number of evicted blocks
+        """
+        if not self._slots:
+            return 0
+        center = np.asarray(center, dtype=np.float64)
+        half = np.asarray(half_extent_m, dtype=np.float64)
+
+        keys = np.fromiter(self._slots.keys(), dtype=np.int64, count=len(self._slots))
+        lo = unpack_block_keys(keys) * self.block_size_m
+        hi = lo + self.block_size_m
+        outside = np.any((hi < center - half) | (lo > center + half), axis=1)
+
+        freed = [self._slots.pop(key) for key in keys[outside].tolist()]
+        if freed:
+            self._keys[freed] = -1
+            self._pool[freed] = self.default
+            self._free.extend(freed)
+        return len(freed)
+
+    def clear(self):
+        """Drop every block (capacity is kept)."""
+        self._slots.clear()
+        self._keys[:] = -1
+        self._pool[:] = self.default
+        self._free = list(range(self._pool.shape[0] - 1, -1, -1))
@@ -0,0 +1,325 @@
+"""Headless CPU quadrotor backend (NumPy rigid-body dynamics).
+
+Drop-in stand-in for ``IsaacSimEnvironment`` when Isaac Sim / CUDA are not
+available (CI, batch nodes, fast planner/controller iteration). It keeps the
+same ``reset()`` / ``step()`` / ``close()`` lifecycle and observation-dict
+keys, but simulates N independent quadrotors at once:
+
+    - Rigid-body dynamics with diagonal inertia, semi-implicit Euler with
+      physics sub-steps and exact quaternion exponential integration.
+    - First-order motor lag (τ = 0.02 s) on the collective thrust and body
+      torques (the wrench the geometric controller commands).
+    - Wind from Phase 3: per-episode mean 0–5 m/s in a random horizontal
+      direction plus an Ornstein-Uhlenbeck gust, acting through linear drag
+      on the air-relative velocity.
+    - Per-episode mass/inertia perturbation (±10%).
+
+Observations are stacked (N, ...) arrays; there is no depth rendering (pass a
+map with ``query(points)``, e.g. EsdfMap, to get collision flags).
+
+Example:
+    >>> env = CpuQuadrotorEnvironment(num_envs=256)
+    >>> obs = env.reset(seed=0)
+    >>> cmd = controller.compute(obs, reference)
+    >>> obs = env.step(cmd)
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.control.geometric_controller import GRAVITY, QuadrotorParams
+from src.planning.mapping.depth_projection import quat_to_rotation_matrix
+from src.sim.imu_decimation import ImuDecimator
+from src.sim.sensor_noise import SensorNoise
+from src.sim.sensor_validation import SensorValidator
+
+
+@dataclass(frozen=True)
+class CpuSimConfig:
+    """Physics and disturbance parameters of the CPU backend."""
+
+    physics_dt: float = 0.01                  # isaac_lab_env.yaml physics_dt (100 Hz)
+    substeps: int = 2
+    motor_time_constant_s: float = 0.02
+    drag_coefficient: float = 0.3             # N·s/m, linear in air-relative velocity
+    wind_speed_range: Tuple[float, float] = (0.0, 5.0)
+    wind_gust_std: float = 0.5                # m/s, stationary std of the gust process
+    wind_gust_time_constant_s: float = 2.0
+    mass_scale: float = 0.10
+    inertia_scale: float = 0.10
+    spawn_low: Sequence[float] = (-2.0, -2.0, 1.0)
+    spawn_high: Sequence[float] = (2.0, 2.0, 3.0)
+
+
+def _quat_multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Hamilton product of (N, 4) quaternions (w, x, y, z)."""
+    aw, ax, ay, az = a.T
+    bw, bx, by, bz = b.T
+    return np.stack([
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ], axis=1)
+
+
+class CpuQuadrotorEnvironment:
+    """Vectorized NumPy quadrotor simulator with the IsaacSimEnvironment contract."""
+
+    def __init__(self, num_envs: int = 1,
+                 config: Optional[CpuSimConfig] = None,
+                 params: Optional[QuadrotorParams] = None,
+                 map_data=None,
+                 sensor_noise: Optional[SensorNoise] = None,
+                 imu_decimator: Optional[ImuDecimator] = None,
+                 sensor_validator: Optional[SensorValidator] = None):
+        """Initialize the backend.
+
+        Args:
+            num_envs: Number of simulated drones N
+            config: Physics/disturbance parameters
+            params: Nominal vehicle parameters (shared with the controller)
+            map_data: Optional map exposing ``query(points)`` used for
+                collision flags (distance <= 0 counts as a collision)
+            sensor_noise: Optional noise models applied to the IMU/odometry
+                observations (e.g. ``SensorNoise.from_config(sensor_config, num_envs)``)
+            imu_decimator: Optional IMU decimation stage fed once per step
+                (input rate must match ``1 / physics_dt``)
+            sensor_validator: Optional validity flags attached to every observation
+        """
+        self.num_envs = int(num_envs)
+        self.config = config or CpuSimConfig()
+        self.params = params or QuadrotorParams()
+        self.map_data = map_data
+        self.sensor_noise = sensor_noise
+        self.imu_decimator = imu_decimator
+        self.sensor_validator = sensor_validator
+
+        n = self.num_envs
+        self.step_count = 0
+        self.position = np.zeros((n, 3))
+        self.velocity = np.zeros((n, 3))
+        self.quat = np.tile([1.0, 0.0, 0.0, 0.0], (n, 1))
+        self.angular_velocity = np.zeros((n, 3))
+        self.acceleration = np.zeros((n, 3))
+        self.wrench = np.zeros((n, 4))                 # actual [thrust, tx, ty, tz] after motor lag
+
+        self.mass = np.full(n, float(self.params.mass))
+        self.inertia = np.tile(np.asarray(self.params.inertia, dtype=np.float64), (n, 1))
+        self.wind_mean = np.zeros((n, 3))
+        self.wind_gust = np.zeros((n, 3))
+        self.collided = np.zeros(n, dtype=bool)
+
+        self.scene_family = None
+        self.scene_seed = None
+        self.rng = np.random.default_rng()
+
+    # ------------------------------------------------------------------
+    # Lifecycle (same contract as IsaacSimEnvironment)
+    # ------------------------------------------------------------------
+
+    def load_scene(self, scene_family: str, seed: int, map_data=None):
+        """Record the scene identity (and optionally its collision map)."""
+        self.scene_family = scene_family
+        self.scene_seed = seed
+        if map_data is not None:
+            self.map_data = map_data
+        return f"{scene_family}_seed{seed}"
+
+    def reset(self, scene_family: Optional[str] = None, seed: Optional[int] = None,
+              env_ids: Optional[np.ndarray] = None, seeds: Optional[Sequence[int]] = None,
+              positions: Optional[np.ndarray] = None) -> Dict:
+        """Reset all (or only ``env_ids``) environments.
+
+        Spawn pose (yaw only), mass/inertia perturbation and wind are drawn
+        per environment.
+
+        Args:
+            scene_family: Optional new scene family
+            seed: Optional seed (re-seeds the backend RNG)
+            env_ids: Optional indices of environments to reset
+            seeds: Optional per-environment seeds (one per reset environment):
+                each environment's initial conditions then depend only on its
+                own seed, whatever the batch layout. A full reset with
+                ``seeds`` also re-seeds the gust process from them.
+            positions: Optional (k, 3) spawn positions replacing the random
+                draw (e.g. a planned start point)
+
+        Returns:
+            Observation dictionary
+        """
+        if scene_family is not None and seed is not None:
+            self.load_scene(scene_family, seed)
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+
+        ids = np.arange(self.num_envs) if env_ids is None else np.asarray(env_ids, dtype=np.int64)
+        k = ids.size
+        if env_ids is None:
+            self.step_count = 0
+        if seeds is not None:
+            seeds = [int(s) for s in np.asarray(seeds, dtype=np.int64).reshape(-1)]
+            if len(seeds) != k:
+                raise ValueError(f"Expected {k} seeds, got {len(seeds)}")
+            if env_ids is None and seed is None:
+                self.rng = np.random.default_rng(seeds)
+            draws = [self._draw_episode(np.random.default_rng(s), 1) for s in seeds]
+            draw = {key: np.concatenate([d[key] for d in draws]) for key in draws[0]}
+        else:
+            draw = self._draw_episode(self.rng, k)
+
+        self.position[ids] = draw['position'] if positions is None else np.asarray(positions).reshape(k, 3)
+        self.velocity[ids] = 0.0
+        yaw = draw['yaw']
+        self.quat[ids] = np.stack([np.cos(yaw / 2), np.zeros(k), np.zeros(k), np.sin(yaw / 2)], axis=1)
+        self.angular_velocity[ids] = 0.0
+        self.acceleration[ids] = 0.0
+
+        self.mass[ids] = self.params.mass * draw['mass_scale']
+        self.inertia[ids] = np.asarray(self.params.inertia) * draw['inertia_scale']
+        self.wrench[ids] = 0.0
+        self.wrench[ids, 0] = self.mass[ids] * GRAVITY   # start at hover thrust
+
+        speed, heading = draw['wind_speed'], draw['wind_heading']
+        self.wind_mean[ids] = np.stack([speed * np.cos(heading), speed * np.sin(heading), np.zeros(k)], axis=1)
+        self.wind_gust[ids] = draw['wind_gust']
+        self.collided[ids] = False
+        if self.sensor_noise is not None:
+            self.sensor_noise.reset(env_ids)
+        if self.imu_decimator is not None:
+            self.imu_decimator.reset(env_ids)
+        if self.sensor_validator is not None:
+            self.sensor_validator.reset(env_ids)
+
+        return self._get_observations()
+
+    def step(self, action=None) -> Dict:
+        """Advance the simulation by one ``physics_dt``.
+
+        Args:
+            action: Command dict with ``thrust`` (N,) and ``torque`` (N, 3)
+                (e.g. GeometricController output), an (N, 4) array of
+                [thrust, tx, ty, tz], or None to hold hover thrust
+
+        Returns:
+            Observation dictionary
+        """
+        cfg = self.config
+        command = self._command_wrench(action)
+        h = cfg.physics_dt / cfg.substeps
+        lag = 1.0 - np.exp(-h / cfg.motor_time_constant_s)
+        gust_decay = np.exp(-h / cfg.wind_gust_time_constant_s)
+        gust_noise = cfg.wind_gust_std * np.sqrt(1.0 - gust_decay ** 2)
+        gravity = np.array([0.0, 0.0, -GRAVITY])
+
+        for _ in range(cfg.substeps):
+            self.wrench += (command - self.wrench) * lag
+            self.wind_gust = self.wind_gust * gust_decay + gust_noise * self.rng.normal(size=self.wind_gust.shape)
+
+            rot = quat_to_rotation_matrix(self.quat)
+            air = self.wind_mean + self.wind_gust - self.velocity
+            force = rot[:, :, 2] * self.wrench[:, :1] + cfg.drag_coefficient * air
+            self.acceleration = force / self.mass[:, None] + gravity
+
+            omega = self.angular_velocity
+            gyroscopic = np.cross(omega, self.inertia * omega)
+            self.angular_velocity = omega + h * (self.wrench[:, 1:] - gyroscopic) / self.inertia
+
+            self.velocity = self.velocity + h * self.acceleration
+            self.position = self.position + h * self.velocity
+            self._integrate_attitude(h)
+
+            # Ground contact: stop at z = 0
+            grounded = self.position[:, 2] < 0.0
+            if grounded.any():
+                self.position[grounded, 2] = 0.0
+                self.velocity[grounded, :2] = 0.0
+                self.velocity[grounded, 2] = np.maximum(self.velocity[grounded, 2], 0.0)
+                self.collided |= grounded
+
+        self.step_count += 1
+        if self.map_data is not None:
+            self.collided |= self.map_data.query(self.position) <= 0.0
+        return self._get_observations()
+
+    @property
+    def time(self) -> float:
+        """Simulation time in seconds (step count times ``physics_dt``)."""
+        return self.step_count * self.config.physics_dt
+
+    def close(self):
+        """Nothing to shut down; kept for interface parity."""
+
+    # ------------------------------------------------------------------
+    # Helper Methods
+    # ------------------------------------------------------------------
+
+    def _draw_episode(self, rng: np.random.Generator, k: int) -> Dict[str, np.ndarray]:
+        """Per-episode random draws (spawn, perturbation, wind) for ``k`` environments."""
+        cfg = self.config
+        return {
+            'position': rng.uniform(cfg.spawn_low, cfg.spawn_high, size=(k, 3)),
+            'yaw': rng.uniform(-np.pi, np.pi, size=k),
+            'mass_scale': rng.uniform(1 - cfg.mass_scale, 1 + cfg.mass_scale, size=k),
+            'inertia_scale': rng.uniform(1 - cfg.inertia_scale, 1 + cfg.inertia_scale, size=(k, 1)),
+            'wind_speed': rng.uniform(*cfg.wind_speed_range, size=k),
+            'wind_heading': rng.uniform(-np.pi, np.pi, size=k),
+            'wind_gust': rng.normal(0.0, cfg.wind_gust_std, size=(k, 3)),
+        }
+
+    def _command_wrench(self, action) -> np.ndarray:
+        """Normalize an action to an (N, 4) [thrust, torque] array."""
+        n = self.num_envs
+        if action is None:
+            command = np.zeros((n, 4))
+            command[:, 0] = self.mass * GRAVITY
+            return command
+        if isinstance(action, dict):
+            return np.concatenate([np.asarray(action['thrust'], dtype=np.float64).reshape(n, 1),
+                                   np.asarray(action['torque'], dtype=np.float64).reshape(n, 3)], axis=1)
+        return np.asarray(action, dtype=np.float64).reshape(n, 4)
+
+    def _integrate_attitude(self, h: float):
+        """Exact quaternion update for a constant body rate over ``h``."""
+        omega = self.angular_velocity
+        rate = np.linalg.norm(omega, axis=1)
+        half = 0.5 * rate * h
+        # sin(half)/rate, with its limit h/2 at zero rate
+        scale = np.where(rate > 1e-9, np.sin(half) / np.maximum(rate, 1e-9), 0.5 * h)
+        delta = np.concatenate([np.cos(half)[:, None], omega * scale[:, None]], axis=1)
+        quat = _quat_multiply(self.quat, delta)
+        self.quat = quat / np.linalg.norm(quat, axis=1, keepdims=True)
+
+    def _get_observations(self) -> Dict:
+        """Observation dictionary with the IsaacSimEnvironment keys, stacked over N.
+
+        Returns:
+            Dictionary containing:
+                - timestamp: Simulation time
+                - imu_accel: Specific force in body frame (N, 3)
+                - imu_gyro: Body angular velocity (N, 3)
+                - odom_pos: Position (N, 3)
+                - odom_vel: Linear velocity (N, 3)
+                - odom_quat: Orientation quaternion (N, 4)
+                - collided: Ground/map contact since the last reset (N,)
+        """
+        rot = quat_to_rotation_matrix(self.quat)
+        specific_force = self.acceleration - np.array([0.0, 0.0, -GRAVITY])
+        obs = {
+            'timestamp': self.time,
+            'imu_accel': np.einsum('nji,nj->ni', rot, specific_force),
+            'imu_gyro': self.angular_velocity.copy(),
+            'odom_pos': self.position.copy(),
+            'odom_vel': self.velocity.copy(),
+            'odom_quat': self.quat.copy(),
+            'collided': self.collided.copy(),
+        }
+        if self.sensor_noise is not None:
+            obs = self.sensor_noise.apply(obs, self.config.physics_dt)
+        if self.imu_decimator is not None:
+            obs = self.imu_decimator.apply(obs)
+        if self.sensor_validator is not None:
+            obs = self.sensor_validator.apply(obs)
+        return obs
@@ -0,0 +1,443 @@
+"""Buffered, compressed binary sensor logger.
+
+``log(obs)`` is called from ``IsaacSimEnvironment.step()`` and must never
+wait on the disk. Each sensor (depth, IMU, odometry) owns a preallocated ring
+of column arrays split into fixed-size chunks; ``log()`` only copies the
+latest sample into the current chunk. Full chunks (or partially filled ones,
+every ``flush_interval_s``) are handed to a background writer thread that
+compresses them with LZ4 and appends them to one binary file per sensor.
+
+If the writer falls so far behind that the next chunk is still queued, the
+sample is dropped and counted instead of blocking the simulation.
+
+On-disk layout (per sensor, under ``<base_path>/<sensor>/``):
+
+    <session>.bin   sequence of records: CHUNK_HEADER + payload, where the
+                    payload is every column of the chunk back to back
+                    (C order, schema order), LZ4-frame compressed
+    <session>.json  schema (column names, shapes, dtypes), codec, sensor
+                    config and simulation parameters
+
+Example:
+    >>> logger = SensorDataLogger.from_config(sensor_config)
+    >>> logger.log(obs)          # every step; rate-limited per sensor
+    >>> logger.close()           # drain queue, close files
+    >>> columns = read_sensor_log('data/raw/runtime/sensors/imu/session.bin')
+"""
+
+import json
+import queue
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from src.planning.mapping.depth_projection import to_numpy
+
+# magic, codec, rows, raw payload bytes, stored payload bytes
+CHUNK_HEADER = struct.Struct('<4sHIQQ')
+CHUNK_MAGIC = b'RLG1'
+CODECS = {'none': 0, 'lz4': 1}
+
+# Share of buffer_size_mb given to each sensor's ring
+BUFFER_SHARE = {'depth': 0.90, 'imu': 0.05, 'odom': 0.05}
+NUM_CHUNKS = 4
+
+
+def sensor_fields(depth_shape: Tuple[int, int] = (480, 640)) -> Dict[str, Dict[str, Tuple[tuple, np.dtype]]]:
+    """Observation keys logged per sensor with their per-sample shape and dtype."""
+    return {
+        'depth': {'depth': (tuple(depth_shape), np.dtype(np.float32))},
+        'imu': {'imu_accel': ((3,), np.dtype(np.float32)),
+                'imu_gyro': ((3,), np.dtype(np.float32))},
+        'odom': {'odom_pos': ((3,), np.dtype(np.float64)),
+                 'odom_vel': ((3,), np.dtype(np.float64)),
+                 'odom_quat': ((4,), np.dtype(np.float64))},
+    }
+
+
+def _config_path(value: str) -> Path:
+    """Path from a config string written with Windows separators."""
+    return Path(str(value).replace('\\', '/'))
+
+
+class _SensorRing:
+    """Preallocated column ring for one sensor, split into ``num_chunks`` chunks.
+
+    ``free[c]`` is False while chunk ``c`` is queued for (or being) written;
+    only the writer thread sets it back to True.
+    """
+
+    def __init__(self, name: str, fields: Dict, capacity_bytes: int, num_chunks: int = NUM_CHUNKS):
+        row_bytes = 8 + sum(int(np.prod(shape)) * dtype.itemsize for shape, dtype in fields.values())
+        self.name = name
+        self.chunk_rows = max(1, int(capacity_bytes) // (row_bytes * num_chunks))
+        capacity = self.chunk_rows * num_chunks
+        self.columns = {'timestamp': np.zeros(capacity, dtype=np.float64)}
+        for key, (shape, dtype) in fields.items():
+            self.columns[key] = np.zeros((capacity,) + shape, dtype=dtype)
+        self.num_chunks = num_chunks
+        self.free = [True] * num_chunks
+        self.chunk = 0          # chunk being filled
+        self.fill = 0           # rows filled in it
+        self.next_time = -np.inf
+        self.last_time = -np.inf
+
+    def schema(self):
+        return [{'name': key, 'shape': list(col.shape[1:]), 'dtype': col.dtype.str}
+                for key, col in self.columns.items()]
+
+    def chunk_slice(self, chunk: int, rows: int) -> slice:
+        start = chunk * self.chunk_rows
+        return slice(start, start + rows)
+
+
+class SensorDataLogger:
+    """Per-sensor ring buffers drained by a background compression thread.
+
+    Counters (read at any time, e.g. via ``stats()``): ``frames_logged``,
+    ``dropped_frames`` and ``invalid_frames`` per sensor, ``bytes_written`` (on disk, including
+    headers), ``raw_bytes`` (uncompressed payload), ``chunks_written`` and
+    ``flush_latencies_s`` (time from a chunk being sealed until it is on disk).
+    """
+
+    def __init__(self, base_path='data/raw/runtime/sensors',
+                 buffer_size_mb: float = 100.0,
+                 flush_interval_s: float = 5.0,
+                 compression: str = 'lz4',
+                 depth_shape: Tuple[int, int] = (480, 640),
+                 log_rates_hz: Optional[Dict[str, float]] = None,
+                 sensor_paths: Optional[Dict[str, Path]] = None,
+                 session: Optional[str] = None,
+                 metadata: Optional[Dict] = None,
+                 env_index: int = 0):
+        """Initialize the logger and start its writer thread.
+
+        Args:
+            base_path: Root directory; each sensor writes to ``base_path/<sensor>``
+            buffer_size_mb: Total ring-buffer memory across sensors
+            flush_interval_s: Partially filled chunks are written at least this often
+            compression: 'lz4' or 'none'
+            depth_shape: (H, W) of the depth image
+            log_rates_hz: Logging rate per sensor (default 20 Hz each);
+                faster observations are decimated by timestamp
+            sensor_paths: Optional per-sensor directories overriding ``base_path``
+            session: File stem shared by all sensors (default: start time)
+            metadata: Extra JSON-serializable data stored in every sidecar
+                (sensor config, simulation parameters)
+            env_index: Environment logged from batched (N, ...) observations
+        """
+        if compression not in CODECS:
+            raise ValueError(f"Unsupported compression '{compression}' (expected one of {sorted(CODECS)})")
+        if compression == 'lz4':
+            try:
+                import lz4.frame  # noqa: F401
+            except ImportError:
+                print("[SensorDataLogger] ⚠ lz4 not installed, writing uncompressed chunks")
+                compression = 'none'
+
+        self.base_path = Path(base_path)
+        self.flush_interval_s = float(flush_interval_s)
+        self.compression = compression
+        self.session = session or time.strftime('session_%Y%m%d_%H%M%S')
+        self.metadata = metadata or {}
+        self.env_index = int(env_index)
+
+        fields = sensor_fields(depth_shape)
+        budget = float(buffer_size_mb) * 1024 * 1024
+        rates = {name: 20.0 for name in fields}
+        rates.update(log_rates_hz or {})
+        self.log_rates_hz = rates
+        self.paths = {name: Path((sensor_paths or {}).get(name, self.base_path / name)) for name in fields}
+        self.rings = {name: _SensorRing(name, fields[name], budget * BUFFER_SHARE[name]) for name in fields}
+
+        self.frames_logged = dict.fromkeys(fields, 0)
+        self.dropped_frames = dict.fromkeys(fields, 0)
+        self.invalid_frames = dict.fromkeys(fields, 0)
+        self.bytes_written = 0
+        self.raw_bytes = 0
+        self.chunks_written = 0
+        self.flush_latencies_s = []
+        self.error: Optional[BaseException] = None
+
+        self._last_seal = time.monotonic()
+        self._files = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='SensorDataLogger', daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def from_config(cls, sensor_config: Dict, simulation_params: Optional[Dict] = None,
+                    **overrides) -> 'SensorDataLogger':
+        """Build a logger from the parsed ``config/env/sensors.yaml``.
+
+        Uses the ``logging`` section (base path, buffer size, flush interval,
+        default compression) and each sensor's ``log_path``/``log_rate_hz``.
+        """
+        log_cfg = sensor_config.get('logging', {})
+        depth_cfg = sensor_config.get('depth_camera', {})
+        sections = {'depth': depth_cfg, 'imu': sensor_config.get('imu', {}),
+                    'odom': sensor_config.get('odometry', {})}
+
+        resolution = depth_cfg.get('resolution', {})
+        rates, paths = {}, {}
+        for name, section in sections.items():
+            rates[name] = float(section.get('log_rate_hz', section.get('update_rate_hz', 20)))
+            if 'log_path' in section:
+                paths[name] = _config_path(section['log_path'])
+
+        metadata = {}
+        if log_cfg.get('include_sensor_config', True):
+            metadata['sensor_config'] = {name: section for name, section in sections.items()}
+        if log_cfg.get('include_simulation_params', True) and simulation_params:
+            metadata['simulation'] = simulation_params
+
+        kwargs = dict(
+            base_path=_config_path(log_cfg.get('base_path', 'data/raw/runtime/sensors')),
+            buffer_size_mb=log_cfg.get('buffer_size_mb', 100.0),
+            flush_interval_s=log_cfg.get('flush_interval_s', 5.0),
+            compression=depth_cfg.get('compression', log_cfg.get('default_compression', 'lz4')),
+            depth_shape=(resolution.get('height', 480), resolution.get('width', 640)),
+            log_rates_hz=rates,
+            sensor_paths=paths,
+            metadata=metadata,
+        )
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    # ------------------------------------------------------------------
+    # Producer side (simulation thread)
+    # ------------------------------------------------------------------
+
+    def log(self, obs: Dict):
+        """Append one observation to the sensor rings (never blocks on I/O).
+
+        Each sensor is sampled at its logging rate from the observation
+        ``timestamp``; a timestamp going backwards (reset) restarts the rate
+        gate. Sensors whose keys are missing from ``obs`` are skipped. A
+        ``<sensor>_fresh`` flag (e.g. ``imu_fresh`` from the IMU decimator)
+        replaces the rate gate: the sensor is logged exactly when it is set.
+        Samples whose ``<sensor>_valid`` flag (SensorValidator) is False are
+        counted in ``invalid_frames`` and not logged.
+        """
+        if self._closed:
+            return
+        timestamp = float(to_numpy(obs.get('timestamp', 0.0)).reshape(-1)[0])
+
+        for name, ring in self.rings.items():
+            keys = [key for key in ring.columns if key != 'timestamp']
+            if any(obs.get(key) is None for key in keys):
+                continue
+            fresh = obs.get(f"{name}_fresh")
+            if fresh is not None:
+                if not bool(to_numpy(fresh).reshape(-1)[0]):
+                    continue
+            else:
+                if timestamp < ring.last_time:
+                    ring.next_time = -np.inf
+                if timestamp < ring.next_time - 1e-6:
+                    continue
+                period = 1.0 / self.log_rates_hz[name]
+                # Stay on the rate grid unless a whole period was skipped
+                ring.next_time = (ring.next_time if timestamp - ring.next_time < period else timestamp) + period
+            ring.last_time = timestamp
+            valid = obs.get(f"{name}_valid")
+            if valid is not None:
+                valid = to_numpy(valid).reshape(-1)
+                if not bool(valid[self.env_index if valid.size > 1 else 0]):
+                    self.invalid_frames[name] += 1
+                    continue
+
+            if not ring.free[ring.chunk]:
+                self.dropped_frames[name] += 1
+                continue
+            row = ring.chunk * ring.chunk_rows + ring.fill
+            ring.columns['timestamp'][row] = timestamp
+            for key in keys:
+                column = ring.columns[key]
+                value = to_numpy(obs[key])
+                if value.size != column[0].size:
+                    value = value.reshape((-1,) + column.shape[1:])[self.env_index]
+                column[row] = value.reshape(column.shape[1:])
+            ring.fill += 1
+            self.frames_logged[name] += 1
+            if ring.fill == ring.chunk_rows:
+                self._seal(ring)
+
+        if time.monotonic() - self._last_seal >= self.flush_interval_s:
+            self._seal_all()
+
+    def _seal(self, ring: _SensorRing):
+        """Queue the current chunk of ``ring`` for writing and move to the next one."""
+        if ring.fill == 0:
+            return
+        ring.free[ring.chunk] = False
+        self._queue.put((ring, ring.chunk, ring.fill, time.perf_counter()))
+        ring.chunk = (ring.chunk + 1) % ring.num_chunks
+        ring.fill = 0
+
+    def _seal_all(self):
+        for ring in self.rings.values():
+            self._seal(ring)
+        self._last_seal = time.monotonic()
+
+    def flush(self):
+        """Write every buffered sample to disk and wait until it is there."""
+        if self._closed:
+            return
+        self._seal_all()
+        self._queue.join()
+        for handle in self._files.values():
+            handle.flush()
+        if self.error is not None:
+            raise RuntimeError(f"Sensor log writer failed: {self.error}") from self.error
+
+    def close(self):
+        """Flush, stop the writer thread and close the log files."""
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            self._queue.put(None)
+            self._writer.join()
+            for handle in self._files.values():
+                handle.close()
+            self._files.clear()
+
+    # ------------------------------------------------------------------
+    # Writer side (background thread)
+    # ------------------------------------------------------------------
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                ring, chunk, rows, sealed_at = item
+                try:
+                    if self.error is None:
+                        self._write_chunk(ring, chunk, rows)
+                        self.flush_latencies_s.append(time.perf_counter() - sealed_at)
+                except Exception as e:  # keep draining so flush() never hangs
+                    self.error = e
+                    print(f"[SensorDataLogger] ⚠ Warning: Could not write {ring.name} chunk: {e}")
+                finally:
+                    ring.free[chunk] = True
+            finally:
+                self._queue.task_done()
+
+    def _file(self, ring: _SensorRing):
+        """Open (on first use) the sensor's log file and write its sidecar."""
+        handle = self._files.get(ring.name)
+        if handle is None:
+            directory = self.paths[ring.name]
+            directory.mkdir(parents=True, exist_ok=True)
+            sidecar = {
+                'sensor': ring.name,
+                'session': self.session,
+                'format': 'binary',
+                'compression': self.compression,
+                'chunk_rows': ring.chunk_rows,
+                'log_rate_hz': self.log_rates_hz[ring.name],
+                'columns': ring.schema(),
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            }
+            sidecar.update(self.metadata)
+            with open(directory / f"{self.session}.json", 'w') as f:
+                json.dump(sidecar, f, indent=2, default=str)
+            handle = open(directory / f"{self.session}.bin", 'ab')
+            self._files[ring.name] = handle
+        return handle
+
+    def _write_chunk(self, ring: _SensorRing, chunk: int, rows: int):
+        rows_slice = ring.chunk_slice(chunk, rows)
+        views = [memoryview(column[rows_slice]).cast('B') for column in ring.columns.values()]
+        raw_size = sum(view.nbytes for view in views)
+
+        if self.compression == 'lz4':
+            import lz4.frame
+            compressor = lz4.frame.LZ4FrameCompressor()
+            parts = [compressor.begin(source_size=raw_size)]
+            parts.extend(compressor.compress(view) for view in views)
+            parts.append(compressor.flush())
+        else:
+            parts = views
+        stored = sum(len(part) for part in parts)
+
+        handle = self._file(ring)
+        handle.write(CHUNK_HEADER.pack(CHUNK_MAGIC, CODECS[self.compression], rows, raw_size, stored))
+        for part in parts:
+            handle.write(part)
+
+        self.bytes_written += CHUNK_HEADER.size + stored
+        self.raw_bytes += raw_size
+        self.chunks_written += 1
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict:
+        """Counter snapshot with flush latency p50/max in milliseconds."""
+        latencies = np.asarray(self.flush_latencies_s) * 1e3
+        return {
+            'frames_logged': dict(self.frames_logged),
+            'dropped_frames': dict(self.dropped_frames),
+            'invalid_frames': dict(self.invalid_frames),
+            'chunks_written': self.chunks_written,
+            'bytes_written': self.bytes_written,
+            'raw_bytes': self.raw_bytes,
+            'compression_ratio': self.raw_bytes / self.bytes_written if self.bytes_written else 0.0,
+            'flush_latency_p50_ms': float(np.median(latencies)) if latencies.size else 0.0,
+            'flush_latency_max_ms': float(latencies.max()) if latencies.size else 0.0,
+            'queued_chunks': self._queue.qsize(),
+        }
+
+
+def iter_sensor_log(path) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield the columns of each chunk of a ``.bin`` sensor log.
+
+    Args:
+        path: Log file; its ``.json`` sidecar must sit next to it
+    """
+    path = Path(path)
+    with open(path.with_suffix('.json'), 'r') as f:
+        schema = json.load(f)['columns']
+    columns = [(c['name'], tuple(c['shape']), np.dtype(c['dtype'])) for c in schema]
+
+    with open(path, 'rb') as f:
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if len(header) < CHUNK_HEADER.size:
+                return
+            magic, codec, rows, raw_size, stored = CHUNK_HEADER.unpack(header)
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"Corrupt sensor log {path}: bad chunk magic {magic!r}")
+            payload = f.read(stored)
+            if codec == CODECS['lz4']:
+                import lz4.frame
+                payload = lz4.frame.decompress(payload)
+            if len(payload) != raw_size:
+                raise ValueError(f"Corrupt sensor log {path}: truncated chunk")
+
+            chunk, offset = {}, 0
+            for name, shape, dtype in columns:
+                count = rows * int(np.prod(shape))
+                chunk[name] = np.frombuffer(payload, dtype=dtype, count=count, offset=offset).reshape((rows,) + shape)
+                offset += count * dtype.itemsize
+            yield chunk
+
+
+def read_sensor_log(path) -> Dict[str, np.ndarray]:
+    """Read a whole sensor log into one array per column."""
+    chunks = list(iter_sensor_log(path))
+    if not chunks:
+        return {}
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
@@ -11,6 +11,10 @@ import yaml
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
+from tools.profiling import StageProfiler, configure_profiler, get_profiler
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
 
 class IsaacSimEnvironment:
     """Main simulation environment wrapper for Isaac Sim.
@@ -60,9 +64,23 @@ class IsaacSimEnvironment:
         self.current_scene = None      # Current scene USD path
         self.scene_family = None       # Current scene family
         self.scene_seed = None         # Current scene seed
+        self.scene_cache = None        # SceneCache of generated scene layers
+        self.scene_configs = {}        # Loaded scenes_config.yaml
+        self.scene_description = None  # Procedural description of the current scene
+        self.esdf_cache = None         # SceneCache of ground-truth ESDF maps
+        self.scene_esdf = None         # Memory-mapped ground-truth ESDF of the current scene
 
         # Logging
         self.data_logger = None        # Data logger instance
+        self.sensor_noise = None       # SensorNoise models (setup_sensors)
+        self.imu_decimator = None      # ImuDecimator 100 Hz -> 20 Hz (setup_sensors)
+        self.synchronizer = None       # SensorSynchronizer depth-anchored frames (setup_sensors)
+        self.sensor_validator = None   # SensorValidator validity flags (setup_sensors)
+
+        # Instrumentation: per-stage step() timings (simulation.profiling, or UAV_PROFILE=1).
+        # An enabled profiler becomes process-wide so planner/controller stages land in the same dump.
+        profiler = StageProfiler.from_config(self.config.get('simulation', {}).get('profiling'), name='isaac_step')
+        self.profiler = configure_profiler(profiler) if profiler.enabled else get_profiler()
 
         print(f"[IsaacSimEnvironment] Initialized with config: {config_path}")
         print(f"[IsaacSimEnvironment] Headless mode: {headless}")
@@ -149,6 +167,39 @@ class IsaacSimEnvironment:
             self.sensor_config = yaml.safe_load(f)
         print(f"[IsaacSimEnvironment]   ✓ Loaded sensor config from {sensor_config_path}")
 
+        # Data logger: ring buffers in step(), compression/disk I/O on a
+        # background thread (see src/sim/data_logger.py)
+        if self.sensor_config.get('logging', {}).get('enabled', False) and self.data_logger is None:
+            from src.sim.data_logger import SensorDataLogger
+            self.data_logger = SensorDataLogger.from_config(
+                self.sensor_config, simulation_params=self.config.get('simulation'))
+            print(f"[IsaacSimEnvironment]   ✓ Data logger writing to {self.data_logger.base_path}")
+
+        # Stateful noise models (depth dropouts/jitter, IMU bias walk, odometry)
+        from src.sim.sensor_noise import SensorNoise
+        self.sensor_noise = SensorNoise.from_config(self.sensor_config)
+        print(f"[IsaacSimEnvironment]   ✓ Sensor noise: depth={self.sensor_noise.depth is not None}, "
+              f"imu={self.sensor_noise.imu is not None}, odom={self.sensor_noise.odometry is not None}")
+
+        # IMU pre-integration from update_rate_hz down to log_rate_hz
+        from src.sim.imu_decimation import ImuDecimator
+        self.imu_decimator = ImuDecimator.from_config(self.sensor_config)
+        print(f"[IsaacSimEnvironment]   ✓ IMU decimation: 1/{self.imu_decimator.factor} "
+              f"({1.0 / (self.imu_decimator.dt * self.imu_decimator.factor):.0f} Hz delta-v/delta-angle)")
+
+        # Validity flags from the validation block (dropped before logging/sync)
+        from src.sim.sensor_validation import SensorValidator
+        self.sensor_validator = SensorValidator.from_config(self.sensor_config)
+        if self.sensor_validator is not None:
+            print(f"[IsaacSimEnvironment]   ✓ Sensor validation: depth invalid <= "
+                  f"{self.sensor_validator.thresholds.max_invalid_pixels_frac:.0%}, IMU/odometry limits")
+
+        # Timestamp synchronization (synchronization block of sensors.yaml)
+        from src.sim.sensor_sync import SensorSynchronizer
+        self.synchronizer = SensorSynchronizer.from_config(self.sensor_config)
+        print(f"[IsaacSimEnvironment]   ✓ Sensor sync: max {self.synchronizer.max_time_diff_s * 1000:.0f} ms "
+              f"between depth, IMU and odometry")
+
         # Import sensor modules (after SimulationApp is created)
         from isaaclab.sensors.camera import Camera, CameraCfg
         from isaaclab.sensors import Imu, ImuCfg
@@ -411,52 +462,79 @@ class IsaacSimEnvironment:
     def load_scene(self, scene_family: str, seed: int, from_cache: bool = True):
         """Load or generate a scene.
 
+        Scene content lives under ``/World/Scene``. On a cache hit the cached
+        layer is referenced there (a file open); on a miss the scene is
+        generated, exported to the cache and then referenced the same way.
+        Cache keys include a hash of the family's config (see
+        ``src/sim/scene_cache.py``), and the cache is trimmed LRU-first to
+        its disk budget.
+
         Args:
             scene_family: Scene family (office, warehouse, forest, etc.)
             seed: Random seed for scene generation
-            from_cache: Load from USD cache if available
+            from_cache: Reuse a cached layer if available
 
-        Note: For Phase 1, we create a simple ground plane. Procedural scene
-        generation will be added in a separate scene generation module.
+        The procedural description (``self.scene_description``) is rebuilt on
+        every load; it is deterministic and cheap, and the cached layer only
+        saves the USD authoring.
         """
         import json
         import time
-        import isaaclab.sim as sim_utils
+        from pxr import Sdf
+        from src.sim.scene_cache import SceneCache, load_scene_configs
+        from src.sim.scene_esdf import load_scene_esdf
+        from src.sim.scene_generator import generate_scene
 
         print(f"[IsaacSimEnvironment] Loading scene: {scene_family} (seed={seed})...")
 
         self.scene_family = scene_family
         self.scene_seed = seed
 
-        # Check cache for existing USD scene
-        cache_dir = Path("data/raw/scenes/cache")
-        cache_dir.mkdir(parents=True, exist_ok=True)
-        cache_path = cache_dir / f"{scene_family}_seed{seed}.usd"
-
-        if from_cache and cache_path.exists():
+        if self.scene_cache is None:
+            self.scene_configs = load_scene_configs(PROJECT_ROOT / "config/env/scenes_config.yaml")
+            budget_mb = self.scene_configs.get('global', {}).get('scene_cache_budget_mb', 20480)
+            cache_dir = PROJECT_ROOT / "data/raw/scenes/cache"
+            self.scene_cache = SceneCache(cache_dir, budget_mb=budget_mb)
+            self.esdf_cache = SceneCache(cache_dir / "esdf", budget_mb=budget_mb, extension='.npy')
+        family_config = self.scene_configs.get('scene_families', {}).get(scene_family, {})
+        extra = {'replicator': self.scene_configs.get('replicator', {})}
+        self.scene_description = generate_scene(scene_family, seed, family_config)
+
+        # Replace the previous scene
+        scene_path = "/World/Scene"
+        if self.stage.GetPrimAtPath(scene_path):
+            self.stage.RemovePrim(scene_path)
+
+        cache_path = self.scene_cache.lookup(scene_family, seed, family_config, extra) if from_cache else None
+        cache_hit = cache_path is not None
+        if cache_hit:
             print(f"[IsaacSimEnvironment]   Loading from cache: {cache_path}")
-            # TODO: Load USD from cache
-            # self.stage.GetRootLayer().ImportFromString(cache_path.read_text())
-            print(f"[IsaacSimEnvironment]   ⚠ Cache loading not yet implemented")
-
-        # For Phase 1, create a simple scene with ground plane and basic lighting
-        print(f"[IsaacSimEnvironment]   Creating basic scene (Phase 1)...")
-
-        # Add ground plane
-        ground_cfg = sim_utils.GroundPlaneCfg(
-            size=(100.0, 100.0),
-            color=(0.5, 0.5, 0.5),
-        )
-        ground_cfg.func("/World/GroundPlane", ground_cfg)
-        print(f"[IsaacSimEnvironment]     ✓ Ground plane created")
-
-        # Add lighting
-        light_cfg = sim_utils.DomeLightCfg(
-            intensity=3000.0,
-            color=(0.75, 0.75, 0.75),
+        else:
+            self._generate_scene(scene_path, self.scene_description)
+
+            # Export the generated subtree as a standalone layer
+            def export(path: Path):
+                layer = Sdf.Layer.CreateNew(str(path))
+                Sdf.CopySpec(self.stage.GetRootLayer(), scene_path, layer, "/Scene")
+                layer.defaultPrim = "Scene"
+                layer.Save()
+
+            cache_path = self.scene_cache.store(scene_family, seed, family_config, export, extra)
+            self.stage.RemovePrim(scene_path)
+            print(f"[IsaacSimEnvironment]   ✓ Scene cached: {cache_path}")
+
+        scene_prim = self.stage.DefinePrim(scene_path, "Xform")
+        scene_prim.GetReferences().AddReference(str(cache_path.resolve()))
+        print(f"[IsaacSimEnvironment]     ✓ Scene layer referenced at {scene_path}")
+
+        # Ground-truth ESDF (precomputed offline or built once, then memory-mapped)
+        global_config = self.scene_configs.get('global', {})
+        self.scene_esdf = load_scene_esdf(
+            self.esdf_cache, scene_family, seed, family_config, scene=self.scene_description,
+            resolution=global_config.get('scene_esdf_resolution', 0.2),
+            truncation_m=global_config.get('scene_esdf_truncation_m', 2.0),
         )
-        light_cfg.func("/World/DomeLight", light_cfg)
-        print(f"[IsaacSimEnvironment]     ✓ Dome light created")
+        print(f"[IsaacSimEnvironment]     ✓ Ground-truth ESDF mapped: {self.scene_esdf.shape} voxels")
 
         # Log scene information
         runtime_dir = Path("data/raw/runtime")
@@ -468,7 +546,9 @@ class IsaacSimEnvironment:
             "scene_family": scene_family,
             "seed": seed,
             "from_cache": from_cache,
-            "cache_available": cache_path.exists(),
+            "cache_hit": cache_hit,
+            "usd_path": str(cache_path),
+            "description_hash": self.scene_description['description_hash'],
         }
 
         with open(scenes_log, 'a') as f:
@@ -477,9 +557,53 @@ class IsaacSimEnvironment:
         print(f"[IsaacSimEnvironment]   ✓ Scene logged to {scenes_log}")
         print(f"[IsaacSimEnvironment] ✓ Scene loaded successfully")
 
-        self.current_scene = str(cache_path) if from_cache else "basic_scene"
+        self.current_scene = str(cache_path)
         return self.current_scene
 
+    def _generate_scene(self, scene_path: str, description: Dict):
+        """Generate scene content under ``scene_path`` (cache miss).
+
+        Ground plane and lighting plus one collision primitive per entry of
+        the procedural description (``scene_generator.generate_scene``).
+        """
+        import math
+        import isaaclab.sim as sim_utils
+
+        print(f"[IsaacSimEnvironment]   Generating procedural scene...")
+
+        # Add ground plane
+        ground_cfg = sim_utils.GroundPlaneCfg(
+            size=(100.0, 100.0),
+            color=(0.5, 0.5, 0.5),
+        )
+        ground_cfg.func(f"{scene_path}/GroundPlane", ground_cfg)
+        print(f"[IsaacSimEnvironment]     ✓ Ground plane created")
+
+        # Add lighting
+        light_cfg = sim_utils.DomeLightCfg(
+            intensity=3000.0,
+            color=(0.75, 0.75, 0.75),
+        )
+        light_cfg.func(f"{scene_path}/DomeLight", light_cfg)
+        print(f"[IsaacSimEnvironment]     ✓ Dome light created")
+
+        # Obstacles from the backend-neutral description
+        prims = description['primitives']
+        collision = sim_utils.CollisionPropertiesCfg()
+        for i, (kind, shape) in enumerate(zip(prims['kind'], prims['shape'])):
+            width, depth, height = (float(v) for v in prims['size'][i])
+            if shape == 'cylinder':
+                cfg = sim_utils.CylinderCfg(radius=width / 2, height=height, axis="Z",
+                                            collision_props=collision)
+            else:
+                cfg = sim_utils.CuboidCfg(size=(width, depth, height), collision_props=collision)
+            half_yaw = 0.5 * float(prims['yaw'][i])
+            cfg.func(f"{scene_path}/Obstacles/{kind}_{i:04d}", cfg,
+                     translation=tuple(float(v) for v in prims['center'][i]),
+                     orientation=(math.cos(half_yaw), 0.0, 0.0, math.sin(half_yaw)))
+        print(f"[IsaacSimEnvironment]     ✓ {len(prims['kind'])} obstacles placed "
+              f"(description {description['description_hash']})")
+
     def reset(self, scene_family: Optional[str] = None, seed: Optional[int] = None):
         """Reset simulation environment.
 
@@ -535,6 +659,14 @@ class IsaacSimEnvironment:
                     sensor.update(dt=0.0)
                 except:
                     pass
+        if self.sensor_noise is not None:
+            self.sensor_noise.reset()
+        if self.imu_decimator is not None:
+            self.imu_decimator.reset()
+        if self.synchronizer is not None:
+            self.synchronizer.reset()
+        if self.sensor_validator is not None:
+            self.sensor_validator.reset()
         print("[IsaacSimEnvironment]   ✓ Sensor buffers cleared")
 
         # Get initial observation
@@ -547,52 +679,71 @@ class IsaacSimEnvironment:
         """Step simulation forward by one timestep.
 
         Returns:
-            obs: Dictionary containing sensor observations
+            obs: Dictionary containing sensor observations, plus
+                ``synced_frames`` (list of timestamp-aligned depth/IMU/odometry
+                frames completed this step) when the synchronizer is set up
         """
-        # Step physics simulation forward
-        if self.world is not None:
-            self.world.step(render=True)
-
-        # Get physics timestep
-        dt = self.world.get_physics_dt() if self.world else 0.01
-
-        # Update all sensors
-        for sensor_name, sensor in self.sensors.items():
-            if hasattr(sensor, 'update') and callable(sensor.update):
-                try:
-                    sensor.update(dt=dt)
-                except Exception as e:
-                    # Silently handle sensor update errors (some sensors may not need updates)
-                    pass
-
-        # Collect sensor observations
-        obs = self._get_sensor_observations()
-
-        # Note: ROS 2 publishing happens automatically via OmniGraph
-        # The Isaac Sim native bridge publishes sensor data each tick
-        # No manual message publishing needed in step()
-
-        # Log data (if logger is configured)
-        if self.data_logger is not None:
-            try:
-                self.data_logger.log(obs)
-            except:
-                pass
+        profiler = self.profiler
+        with profiler.stage('step.total'):
+            # Step physics simulation forward
+            with profiler.stage('step.physics'):
+                if self.world is not None:
+                    self.world.step(render=True)
+
+            # Get physics timestep
+            dt = self.world.get_physics_dt() if self.world else 0.01
+
+            # Update all sensors
+            with profiler.stage('step.sensor_update'):
+                for sensor_name, sensor in self.sensors.items():
+                    if hasattr(sensor, 'update') and callable(sensor.update):
+                        try:
+                            sensor.update(dt=dt)
+                        except Exception:
+                            # Silently handle sensor update errors (some sensors may not need updates),
+                            # but keep a count in the profile
+                            profiler.error('step.sensor_update')
+
+            # Collect sensor observations
+            with profiler.stage('step.observations'):
+                obs = self._get_sensor_observations()
+            if self.synchronizer is not None:
+                with profiler.stage('step.sync'):
+                    obs['synced_frames'] = self.synchronizer.push_obs(obs)
+
+            # Note: ROS 2 publishing happens automatically via OmniGraph
+            # The Isaac Sim native bridge publishes sensor data each tick
+            # No manual message publishing needed in step()
+
+            # Log data (if logger is configured)
+            if self.data_logger is not None:
+                with profiler.stage('step.logging'):
+                    try:
+                        self.data_logger.log(obs)
+                    except Exception:
+                        profiler.error('step.logging')
 
+        profiler.maybe_dump()
         return obs
 
     def close(self):
         """Shutdown simulation environment gracefully."""
         print("[IsaacSimEnvironment] Closing environment...")
 
-        # Flush data logger buffers
+        # Flush data logger buffers and stop its writer thread
         if self.data_logger is not None:
             try:
-                self.data_logger.flush()
-                print("[IsaacSimEnvironment]   ✓ Data logger flushed")
+                self.data_logger.close()
+                print(f"[IsaacSimEnvironment]   ✓ Data logger flushed: {self.data_logger.stats()}")
             except Exception as e:
                 print(f"[IsaacSimEnvironment]   ⚠ Warning: Could not flush logger: {e}")
 
+        # Final step() timing profile
+        profile_path = self.profiler.dump()
+        if profile_path is not None:
+            print(f"[IsaacSimEnvironment]   ✓ Step profile written to {profile_path}")
+            print(self.profiler.format_table())
+
         # Shutdown ROS 2 bridge
         if self.ros2_bridge is not None:
             try:
@@ -631,8 +782,14 @@ class IsaacSimEnvironment:
             Dictionary containing:
                 - timestamp: Simulation time
                 - depth: Depth image (H, W) if depth camera enabled
-                - imu_accel: Linear acceleration (3,) if IMU enabled
-                - imu_gyro: Angular velocity (3,) if IMU enabled
+                - imu_accel: Linear acceleration (3,) if IMU enabled, averaged
+                  over the last decimation window
+                - imu_gyro: Angular velocity (3,) if IMU enabled, ditto
+                - imu_delta_v / imu_delta_angle: Pre-integrated window (3,)
+                - imu_fresh: True on steps that completed a window
+                - depth_invalid_frac / depth_valid / imu_valid / odom_valid /
+                  sensors_valid: validity flags (SensorValidator), computed
+                  on the device holding the data (depth noise runs there too)
                 - odom_pos: Position (3,) if odometry enabled
                 - odom_vel: Linear velocity (3,) if odometry enabled
                 - odom_quat: Orientation quaternion (4,) if odometry enabled
@@ -681,30 +838,29 @@ class IsaacSimEnvironment:
                     except (AttributeError, IndexError) as e:
                         print(f"[IsaacSimEnvironment] Warning: Could not read odometry: {e}")
 
+        with self.profiler.stage('step.sensor_noise'):
+            obs = self._add_sensor_noise(obs)
+        if self.imu_decimator is not None:
+            with self.profiler.stage('step.imu_decimation'):
+                obs = self.imu_decimator.apply(obs)
+        if self.sensor_validator is not None:
+            with self.profiler.stage('step.sensor_validation'):
+                obs = self.sensor_validator.apply(obs)
         return obs
 
-    def _add_sensor_noise(self, data, noise_config: Dict):
-        """Add physics-based noise to sensor data.
+    def _add_sensor_noise(self, obs: Dict) -> Dict:
+        """Apply the configured noise models to an observation.
 
         Args:
-            data: Sensor data tensor
-            noise_config: Noise configuration from sensors.yaml
+            obs: Observation dictionary from the sensors
 
         Returns:
-            Noisy sensor data
+            Observation with noisy ``depth``, ``imu_*`` and ``odom_*`` arrays
         """
-        import torch
-
-        if not noise_config.get('enabled', False):
-            return data
-
-        # Add Gaussian noise
-        if 'std' in noise_config or 'noise_std' in noise_config:
-            std = noise_config.get('std', noise_config.get('noise_std', 0.0))
-            noise = torch.randn_like(data) * std
-            data = data + noise
-
-        return data
+        if self.sensor_noise is None:
+            return obs
+        dt = self.world.get_physics_dt() if self.world is not None else 0.01
+        return self.sensor_noise.apply(obs, dt)
 
 
 def bootstrap_environment(settings: Dict) -> IsaacSimEnvironment:
@@ -0,0 +1,377 @@
+"""Expert-episode jobs and a bounded process pool to run them (Phase 2-4).
+
+An episode job is one (scene family, seed, difficulty) triple. ``run_episode``
+generates the scene description, maps its ground-truth ESDF (cached when a
+cache directory is given), plans start -> goal with the global planner and
+flies the plan in closed loop on the CPU backend with the geometric
+controller, returning the recorded episode (columns for ``ShardWriter``) and
+one row of trajectory metrics.
+
+``EpisodeScheduler`` runs jobs on ``workers`` processes with a hard
+per-episode timeout (a worker that overruns is terminated and replaced) and
+an append-only ``checkpoint.jsonl``: ids committed there are skipped on the
+next run, so a crashed sweep resumes where it stopped. Results are yielded as
+they finish; the caller persists them and then ``commit``s their ids.
+
+Example:
+    >>> jobs = expand_jobs(scene_configs['scene_families'], seeds=range(42, 92))
+    >>> scheduler = EpisodeScheduler(run_episode, (EpisodeConfig(),), workers=16,
+    ...                              checkpoint_path='data/dataset/checkpoint.jsonl')
+    >>> for result in scheduler.run(jobs):
+    ...     writer.write_episode(result.episode)
+    ...     scheduler.commit([result])
+"""
+
+import json
+import multiprocessing as mp
+import os
+import time
+import traceback
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from src.analysis.trajectory_metrics import evaluate_metrics
+from src.control.geometric_controller import GRAVITY, GeometricController
+from src.sim.cpu_backend import CpuQuadrotorEnvironment, CpuSimConfig
+from src.sim.scene_cache import SceneCache
+from src.sim.scene_esdf import load_scene_esdf, scene_esdf
+from src.sim.scene_generator import generate_scene
+
+CHECKPOINT_FILE = 'checkpoint.jsonl'
+# Outcomes that are final once persisted; 'error'/'timeout' stay pending and rerun on resume
+COMMITTED_STATUSES = ('ok', 'plan_failed', 'invalid_scene')
+GOAL_TOLERANCE_M = 1.0
+
+
+@dataclass(frozen=True)
+class EpisodeJob:
+    """One episode to collect."""
+
+    scene_family: str
+    seed: int
+    difficulty: str
+
+    @property
+    def job_id(self) -> str:
+        return f"{self.scene_family}_seed{self.seed}"
+
+
+@dataclass(frozen=True)
+class EpisodeConfig:
+    """Per-episode simulation, control and recording parameters."""
+
+    scene_families: Optional[Dict] = None     # scenes_config.yaml ``scene_families``
+    esdf_cache_dir: Optional[str] = None      # ground-truth ESDF cache (None: build in memory)
+    esdf_resolution: float = 0.2
+    esdf_truncation_m: float = 2.0
+    control_rate_hz: float = 50.0
+    record_rate_hz: float = 20.0
+    settle_s: float = 2.0                     # hover time at the goal after the plan ends
+    max_duration_s: float = 120.0
+    sim: CpuSimConfig = CpuSimConfig()
+
+
+@dataclass
+class EpisodeResult:
+    """Outcome of one job as seen by the scheduler."""
+
+    job: EpisodeJob
+    status: str                               # 'ok', 'plan_failed', 'invalid_scene', 'error' or 'timeout'
+    episode: Optional[Dict] = None            # ShardWriter episode (status 'ok')
+    metrics: Optional[Dict] = None            # metrics row (always present except error/timeout)
+    per_step: Optional[Dict] = None           # per-step metric columns (status 'ok')
+    error: Optional[str] = None
+    elapsed_s: float = 0.0
+    attempts: int = 1
+
+
+def expand_jobs(scene_families: Dict, families: Optional[Sequence[str]] = None,
+                seeds: Iterable[int] = range(42, 92),
+                difficulties: Optional[Sequence[str]] = None) -> List[EpisodeJob]:
+    """Cross product of enabled scene families and seeds, filtered by difficulty.
+
+    Args:
+        scene_families: ``scene_families`` section of scenes_config.yaml
+        families: Families to include (default: every enabled one)
+        seeds: Scene seeds per family
+        difficulties: Keep only families with one of these difficulties
+    """
+    names = families or [name for name, cfg in scene_families.items() if cfg.get('enabled', True)]
+    seeds = list(seeds)
+    jobs = []
+    for name in names:
+        difficulty = scene_families[name].get('difficulty', 'medium')
+        if difficulties and difficulty not in difficulties:
+            continue
+        jobs.extend(EpisodeJob(name, int(seed), difficulty) for seed in seeds)
+    return jobs
+
+
+# ----------------------------------------------------------------------
+# One episode
+# ----------------------------------------------------------------------
+
+def run_episode(job: EpisodeJob, config: EpisodeConfig) -> EpisodeResult:
+    """Plan and fly one episode (runs inside a scheduler worker).
+
+    Returns:
+        EpisodeResult with the recorded columns (``timestamp``, ``odom_*``,
+        ``imu_*``, ``action`` [thrust, torque], ``ref_pos``) and a metrics
+        row (``evaluate_metrics`` episode statistics plus job/QC fields)
+        and the per-step metric columns with their ``timestamp``
+    """
+    import importlib
+    trajectory_planner = importlib.import_module('src.planning.global.trajectory_planner')
+
+    t0 = time.perf_counter()
+    family_config = (config.scene_families or {}).get(job.scene_family, {})
+    scene = generate_scene(job.scene_family, job.seed, family_config)
+    row = {'job_id': job.job_id, 'scene_family': job.scene_family, 'seed': job.seed,
+           'difficulty': job.difficulty, 'description_hash': scene['description_hash']}
+    if not scene['navigable']:
+        return EpisodeResult(job, 'invalid_scene', metrics={**row, 'status': 'invalid_scene'})
+
+    if config.esdf_cache_dir:
+        cache = SceneCache(config.esdf_cache_dir, extension='.npy')
+        esdf = load_scene_esdf(cache, job.scene_family, job.seed, family_config, scene=scene,
+                               resolution=config.esdf_resolution, truncation_m=config.esdf_truncation_m)
+    else:
+        esdf = scene_esdf(scene, config.esdf_resolution, config.esdf_truncation_m)
+
+    start, goal = np.asarray(scene['start']), np.asarray(scene['goal'])
+    plan = trajectory_planner.plan_trajectory({'position': start}, {'position': goal}, esdf)
+    row.update(plan_status=plan.status, nodes_expanded=int(plan.nodes_expanded),
+               search_time_s=float(plan.search_time_s), optimize_time_s=float(plan.optimize_time_s))
+    if not plan.success:
+        return EpisodeResult(job, 'plan_failed', metrics={**row, 'status': 'plan_failed'},
+                             elapsed_s=time.perf_counter() - t0)
+
+    episode = _fly(plan.trajectory, start, goal, job.seed, esdf, config)
+    metrics = evaluate_metrics(episode, esdf=esdf)
+    row.update({key: value[0].item() for key, value in metrics['episodes'].items() if key != 'episode_id'})
+    per_step = {'timestamp': episode['timestamp'],
+                **{key: value for key, value in metrics['per_step'].items() if key != 'episode_id'}}
+    final_error = float(np.linalg.norm(episode['odom_pos'][-1] - goal))
+    qc = {'collision_free': not bool(episode.pop('collided')), 'feasible': bool(row['feasible']),
+          'reached_goal': final_error <= GOAL_TOLERANCE_M}
+    row.update(status='ok', goal_error_m=final_error, plan_duration_s=float(plan.trajectory.total_time),
+               **{f"qc_{name}": flag for name, flag in qc.items()})
+    episode.update(scene_family=job.scene_family, seed=job.seed, difficulty=job.difficulty, qc=qc)
+    return EpisodeResult(job, 'ok', episode=episode, metrics=row, per_step=per_step,
+                         elapsed_s=time.perf_counter() - t0)
+
+
+def _fly(trajectory, start: np.ndarray, goal: np.ndarray, seed: int, esdf, config: EpisodeConfig) -> Dict:
+    """Track ``trajectory`` on the CPU backend and record at ``record_rate_hz``."""
+    sim = config.sim
+    env = CpuQuadrotorEnvironment(num_envs=1, config=sim, map_data=esdf)
+    controller = GeometricController(num_drones=1)
+    obs = env.reset(seeds=[seed], positions=start[None])
+    control_every = max(1, int(round(1.0 / (config.control_rate_hz * sim.physics_dt))))
+    record_every = max(1, int(round(1.0 / (config.record_rate_hz * sim.physics_dt))))
+    duration = min(trajectory.total_time + config.settle_s, config.max_duration_s)
+
+    columns = {key: [] for key in ('timestamp', 'odom_pos', 'odom_vel', 'odom_quat',
+                                   'imu_accel', 'imu_gyro', 'action', 'ref_pos')}
+    command = {'thrust': np.full(1, env.mass[0] * GRAVITY), 'torque': np.zeros((1, 3))}
+    ref_pos = start[None]
+    for step in range(int(round(duration / sim.physics_dt))):
+        t = step * sim.physics_dt
+        if step % control_every == 0:
+            if t < trajectory.total_time:
+                ref = [trajectory.evaluate(np.array([t]), derivative=d) for d in range(3)]
+                reference = {'position': ref[0], 'velocity': ref[1], 'acceleration': ref[2]}
+            else:
+                reference = {'position': goal[None]}
+            ref_pos = reference['position']
+            command = controller.compute(obs, reference)
+        if step % record_every == 0:
+            for key in ('timestamp', 'odom_pos', 'odom_vel', 'odom_quat', 'imu_accel', 'imu_gyro'):
+                columns[key].append(np.asarray(obs[key]).reshape(-1) if key != 'timestamp' else obs[key])
+            columns['action'].append(np.concatenate([command['thrust'], command['torque'][0]]))
+            columns['ref_pos'].append(np.asarray(ref_pos).reshape(3))
+        obs = env.step(command)
+        if obs['collided'][0]:
+            break
+
+    episode = {key: np.asarray(values, dtype=np.float64) for key, values in columns.items()}
+    episode['imu_accel'] = episode['imu_accel'].astype(np.float32)
+    episode['imu_gyro'] = episode['imu_gyro'].astype(np.float32)
+    episode['action'] = episode['action'].astype(np.float32)
+    episode['collided'] = bool(obs['collided'][0])
+    return episode
+
+
+# ----------------------------------------------------------------------
+# Scheduler
+# ----------------------------------------------------------------------
+
+def _worker(fn: Callable, args: tuple, conn):
+    """Worker process: run jobs received over ``conn`` one at a time."""
+    try:
+        while True:
+            job = conn.recv()
+            if job is None:
+                return
+            try:
+                conn.send((None, fn(job, *args)))
+            except Exception:
+                conn.send((traceback.format_exc(), None))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        conn.close()
+
+
+class _Slot:
+    """One worker process and the job it is running."""
+
+    def __init__(self, ctx, fn: Callable, args: tuple):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker, args=(fn, args, child), daemon=True)
+        self.process.start()
+        child.close()
+        self.job: Optional[EpisodeJob] = None
+        self.started = 0.0
+        self.attempt = 0
+
+    def stop(self, kill: bool = False):
+        if kill:
+            self.process.terminate()
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(timeout=5.0)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class EpisodeScheduler:
+    """Bounded process pool with per-job timeouts and a resumable checkpoint."""
+
+    def __init__(self, fn: Callable = run_episode, args: tuple = (),
+                 workers: Optional[int] = None,
+                 timeout_s: float = 600.0,
+                 max_retries: int = 0,
+                 checkpoint_path=None,
+                 start_method: Optional[str] = None):
+        """Initialize the scheduler (processes start in ``run``).
+
+        Args:
+            fn: Picklable ``fn(job, *args) -> EpisodeResult``
+            args: Extra arguments sent to ``fn`` (e.g. ``(EpisodeConfig(...),)``)
+            workers: Worker processes (default: CPU count)
+            timeout_s: Wall-clock limit per attempt; the worker is killed and replaced
+            max_retries: Re-runs of a job after an error or timeout
+            checkpoint_path: ``checkpoint.jsonl`` of committed job ids (None: no resume)
+            start_method: multiprocessing start method (platform default)
+        """
+        self.fn = fn
+        self.args = tuple(args)
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.timeout_s = float(timeout_s)
+        self.max_retries = int(max_retries)
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path is not None else None
+        self.start_method = start_method
+        self.stats = {'submitted': 0, 'skipped': 0, 'timeouts': 0, 'errors': 0, 'retries': 0}
+
+    def completed_ids(self) -> set:
+        """Job ids committed to the checkpoint by earlier runs."""
+        done = set()
+        if self.checkpoint_path is not None and self.checkpoint_path.exists():
+            with open(self.checkpoint_path, 'r') as f:
+                for line in f:
+                    try:
+                        done.add(json.loads(line)['job_id'])
+                    except (ValueError, KeyError):
+                        continue              # torn last line of a crashed run
+        return done
+
+    def commit(self, results: Iterable[EpisodeResult]):
+        """Append finished jobs to the checkpoint (call after persisting them).
+
+        Only results with a status in ``COMMITTED_STATUSES`` are committed;
+        failed and timed-out jobs are left for the next run to retry.
+        """
+        if self.checkpoint_path is None:
+            return
+        results = [result for result in results if result.status in COMMITTED_STATUSES]
+        if not results:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.checkpoint_path, 'a') as f:
+            for result in results:
+                f.write(json.dumps({'job_id': result.job.job_id, 'status': result.status,
+                                    'elapsed_s': round(result.elapsed_s, 3)}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def run(self, jobs: Sequence[EpisodeJob]) -> Iterator[EpisodeResult]:
+        """Run every job not yet in the checkpoint; yields results in completion order."""
+        done = self.completed_ids()
+        pending = [job for job in jobs if job.job_id not in done]
+        self.stats['skipped'] += len(jobs) - len(pending)
+        pending.reverse()                                  # pop() from the end keeps job order
+        attempts: Dict[str, int] = {}
+        if not pending:
+            return
+
+        ctx = mp.get_context(self.start_method)
+        slots = [_Slot(ctx, self.fn, self.args) for _ in range(min(self.workers, len(pending)))]
+        try:
+            while pending or any(slot.job is not None for slot in slots):
+                for slot in slots:
+                    if slot.job is None and pending:
+                        job = pending.pop()
+                        attempts[job.job_id] = attempts.get(job.job_id, 0) + 1
+                        slot.job, slot.started = job, time.monotonic()
+                        slot.conn.send(job)
+                        self.stats['submitted'] += 1
+
+                busy = [slot for slot in slots if slot.job is not None]
+                deadline = min(slot.started for slot in busy) + self.timeout_s
+                ready = wait([slot.conn for slot in busy], timeout=max(0.0, deadline - time.monotonic()))
+                now = time.monotonic()
+                for i, slot in enumerate(slots):
+                    if slot.job is None:
+                        continue
+                    job, elapsed = slot.job, now - slot.started
+                    if slot.conn in ready:
+                        try:
+                            error, result = slot.conn.recv()
+                        except (EOFError, OSError):
+                            error, result = 'worker process died', None
+                        if result is None and error == 'worker process died':
+                            slot.stop(kill=True)
+                            slots[i] = slot = _Slot(ctx, self.fn, self.args)
+                        slot.job = None
+                        if error is None:
+                            result.attempts = attempts[job.job_id]
+                            yield result
+                            continue
+                        self.stats['errors'] += 1
+                        failure = EpisodeResult(job, 'error', error=error, elapsed_s=elapsed)
+                    elif elapsed >= self.timeout_s:
+                        slot.stop(kill=True)
+                        slots[i] = _Slot(ctx, self.fn, self.args)
+                        self.stats['timeouts'] += 1
+                        failure = EpisodeResult(job, 'timeout', elapsed_s=elapsed,
+                                                error=f"exceeded {self.timeout_s:.0f} s")
+                    else:
+                        continue
+                    if attempts[job.job_id] <= self.max_retries:
+                        self.stats['retries'] += 1
+                        pending.append(job)
+                    else:
+                        failure.attempts = attempts[job.job_id]
+                        yield failure
+        finally:
+            for slot in slots:
+                slot.stop(kill=slot.job is not None)
@@ -0,0 +1,163 @@
+"""On-disk cache of generated scene layers with LRU eviction.
+
+Cache entries are keyed by scene family, seed and a content hash of
+everything that shapes the generated scene (the family's section of
+``scenes_config.yaml``, the global replicator settings and
+``GENERATOR_VERSION``), so editing a family's config never serves a stale
+layer. A JSON manifest next to the files records size and last use; when
+the cache exceeds its disk budget the least recently used entries are
+deleted.
+
+The cache only manages files: ``IsaacSimEnvironment.load_scene`` exports a
+freshly generated stage into the path handed out by ``store()`` and
+references cached layers on a hit.
+
+Example:
+    >>> cache = SceneCache('data/raw/scenes/cache', budget_mb=20480)
+    >>> path = cache.lookup('forest', 7, family_config)
+    >>> if path is None:
+    ...     path = cache.store('forest', 7, family_config, lambda p: layer.Export(str(p)))
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import yaml
+
+# Bump when the scene generator changes output for an unchanged config
+GENERATOR_VERSION = 2
+MANIFEST_FILE = 'cache_index.json'
+
+
+def config_hash(family_config: Dict, extra: Optional[Dict] = None) -> str:
+    """Short content hash of a family config (canonical JSON, sorted keys)."""
+    payload = {'family': family_config, 'extra': extra or {}, 'generator_version': GENERATOR_VERSION}
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def load_scene_configs(path='config/env/scenes_config.yaml') -> Dict:
+    """Parsed ``scenes_config.yaml``.
+
+    A missing file raises ``FileNotFoundError`` rather than returning an
+    empty config, so scenes are never generated (and cached) from defaults
+    by accident.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Scene config not found: {path}")
+    with open(path, 'r') as f:
+        return yaml.safe_load(f) or {}
+
+
+class SceneCache:
+    """File cache of scene layers bounded by a disk budget."""
+
+    def __init__(self, cache_dir='data/raw/scenes/cache', budget_mb: float = 20480.0,
+                 extension: str = '.usd'):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the layers and the manifest
+            budget_mb: Total size above which LRU entries are evicted
+            extension: File extension of cached layers
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.extension = extension
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self.entries = self._load_manifest()
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        """Manifest entries whose files still exist (rebuilt from the directory if lost)."""
+        path = self.cache_dir / MANIFEST_FILE
+        entries = {}
+        if path.exists():
+            try:
+                with open(path, 'r') as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+        for file in self.cache_dir.glob(f"*{self.extension}"):
+            if file.stem not in entries and not file.stem.endswith('.tmp'):
+                stat = file.stat()
+                entries[file.stem] = {'size': stat.st_size, 'last_used': stat.st_mtime}
+        return {key: entry for key, entry in entries.items()
+                if (self.cache_dir / f"{key}{self.extension}").exists()}
+
+    def _save_manifest(self):
+        path = self.cache_dir / MANIFEST_FILE
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def key(self, scene_family: str, seed: int, family_config: Optional[Dict] = None,
+            extra: Optional[Dict] = None) -> str:
+        """Cache key ``{family}_seed{seed}_{config hash}``."""
+        return f"{scene_family}_seed{seed}_{config_hash(family_config or {}, extra)}"
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.extension}"
+
+    def lookup(self, scene_family: str, seed: int, family_config: Optional[Dict] = None,
+               extra: Optional[Dict] = None) -> Optional[Path]:
+        """Path of the cached layer (marking it most recently used), or None."""
+        key = self.key(scene_family, seed, family_config, extra)
+        path = self.path(key)
+        if key in self.entries and path.exists():
+            self.entries[key]['last_used'] = time.time()
+            self._save_manifest()
+            self.stats['hits'] += 1
+            return path
+        self.entries.pop(key, None)
+        self.stats['misses'] += 1
+        return None
+
+    def store(self, scene_family: str, seed: int, family_config: Optional[Dict],
+              write: Callable[[Path], None], extra: Optional[Dict] = None) -> Path:
+        """Write a new entry through ``write(tmp_path)`` and evict down to budget.
+
+        The file is written to a temporary name and renamed into place, so a
+        crash mid-export never leaves a truncated layer behind.
+        """
+        key = self.key(scene_family, seed, family_config, extra)
+        path = self.path(key)
+        tmp = path.with_name(f"{key}.tmp{self.extension}")
+        write(tmp)
+        os.replace(tmp, path)
+        self.entries[key] = {'size': path.stat().st_size, 'last_used': time.time(),
+                             'scene_family': scene_family, 'seed': int(seed)}
+        self.stats['stores'] += 1
+        self.evict(keep=key)
+        return path
+
+    def size_bytes(self) -> int:
+        return sum(entry['size'] for entry in self.entries.values())
+
+    def evict(self, keep: Optional[str] = None):
+        """Delete least recently used entries until the cache fits its budget."""
+        total = self.size_bytes()
+        for key in sorted(self.entries, key=lambda k: self.entries[k]['last_used']):
+            if total <= self.budget_bytes:
+                break
+            if key == keep:
+                continue
+            for file in self.cache_dir.glob(f"{key}.*"):    # layer plus any sidecars
+                file.unlink(missing_ok=True)
+            total -= self.entries.pop(key)['size']
+            self.stats['evictions'] += 1
+        self._save_manifest()
@@ -0,0 +1,420 @@
+"""Deterministic procedural scene descriptions (Phase 1, 10 families).
+
+``generate_scene(family, seed, family_config)`` turns a family section of
+``scenes_config.yaml`` and a seed into a backend-neutral description:
+
+    - ``size`` [x, y, z] in metres; the scene spans x/y in [-size/2, size/2]
+      and z in [0, size_z] (the EsdfMap default origin convention)
+    - ``primitives``: columnar obstacle table with ``kind`` (asset type),
+      ``shape`` ('box' or 'cylinder'), ``center`` (N, 3), ``size`` (N, 3)
+      full extents (a cylinder's diameter in x/y), ``yaw`` (N,) and ``mesh``
+      (asset reference for renderers, '' for pure primitives)
+    - ``start``/``goal`` collision-free navigation endpoints, ``navigable``
+      (endpoints found) and ``free_fraction`` (checked against
+      ``generation.validation.min_free_space_percent`` by the batch script)
+
+Randomness comes from one PCG64 stream seeded by (family, seed) and every
+number is rounded to 1 mm, so the same inputs give byte-identical JSON on
+any machine with the same NumPy; ``description_hash`` lets a batch check that.
+Renderers (Isaac USD prims) and the ESDF rasterizer consume the same table.
+
+Example:
+    >>> scene = generate_scene('forest', 42, configs['scene_families']['forest'])
+    >>> scene['primitives']['center'].shape
+"""
+
+import hashlib
+import json
+import zlib
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.sim.scene_cache import GENERATOR_VERSION, config_hash
+
+# Asset type -> (shape, min [w, d, h], max [w, d, h], placement)
+# placement: 'floor' stands on z = 0, 'ceiling' hangs from the ceiling,
+# 'column' spans floor to ceiling
+ASSET_TEMPLATES = {
+    # office
+    'desk': ('box', (1.2, 0.6, 0.75), (1.8, 0.9, 0.75), 'floor'),
+    'chair': ('box', (0.5, 0.5, 0.9), (0.6, 0.6, 1.1), 'floor'),
+    'partition': ('box', (1.2, 0.05, 1.2), (2.4, 0.08, 1.8), 'floor'),
+    'plant': ('cylinder', (0.4, 0.4, 0.6), (0.8, 0.8, 1.8), 'floor'),
+    # warehouse
+    'shelf_unit': ('box', (2.0, 0.8, 2.5), (6.0, 1.2, 5.0), 'floor'),
+    'pallet': ('box', (1.0, 1.2, 0.15), (1.2, 1.2, 1.5), 'floor'),
+    'forklift': ('box', (2.5, 1.2, 2.2), (3.0, 1.3, 2.4), 'floor'),
+    'crate': ('box', (0.5, 0.5, 0.5), (1.5, 1.5, 1.5), 'floor'),
+    # forest / jungle
+    'tree': ('cylinder', (0.3, 0.3, 3.0), (0.8, 0.8, 12.0), 'floor'),
+    'bush': ('cylinder', (0.8, 0.8, 0.5), (2.0, 2.0, 1.5), 'floor'),
+    'rock': ('box', (0.5, 0.5, 0.3), (2.0, 2.0, 1.5), 'floor'),
+    'fallen_log': ('box', (3.0, 0.4, 0.4), (8.0, 0.8, 0.8), 'floor'),
+    'jungle_tree': ('cylinder', (0.4, 0.4, 5.0), (1.2, 1.2, 15.0), 'floor'),
+    'vine': ('cylinder', (0.05, 0.05, 2.0), (0.15, 0.15, 8.0), 'ceiling'),
+    'fern': ('cylinder', (0.5, 0.5, 0.3), (1.5, 1.5, 1.2), 'floor'),
+    'bamboo_cluster': ('cylinder', (1.0, 1.0, 4.0), (2.5, 2.5, 10.0), 'floor'),
+    # urban
+    'building': ('box', (5.0, 5.0, 5.0), (15.0, 15.0, 30.0), 'floor'),
+    'street_lamp': ('cylinder', (0.2, 0.2, 4.0), (0.3, 0.3, 8.0), 'floor'),
+    'vehicle': ('box', (4.0, 1.8, 1.4), (6.0, 2.5, 3.0), 'floor'),
+    'billboard': ('box', (4.0, 0.3, 6.0), (10.0, 0.5, 12.0), 'floor'),
+    # cave / mine
+    'stalactite': ('cylinder', (0.2, 0.2, 0.5), (0.8, 0.8, 3.0), 'ceiling'),
+    'stalagmite': ('cylinder', (0.2, 0.2, 0.5), (0.8, 0.8, 3.0), 'floor'),
+    'rock_column': ('cylinder', (0.8, 0.8, 1.0), (2.5, 2.5, 1.0), 'column'),
+    'boulder': ('box', (0.8, 0.8, 0.6), (3.0, 3.0, 2.5), 'floor'),
+    'support_beam': ('box', (0.3, 0.3, 1.0), (0.4, 0.4, 1.0), 'column'),
+    'mine_cart': ('box', (1.5, 1.0, 1.2), (2.0, 1.2, 1.5), 'floor'),
+    'rail_track': ('box', (6.0, 1.2, 0.2), (15.0, 1.2, 0.2), 'floor'),
+    'mining_equipment': ('box', (1.0, 1.0, 1.0), (3.0, 2.0, 2.5), 'floor'),
+    # maze
+    'wall_segment': ('box', (2.0, 0.2, 2.0), (4.0, 0.2, 4.0), 'floor'),
+    'corner_obstacle': ('box', (0.4, 0.4, 1.0), (1.0, 1.0, 2.0), 'floor'),
+    # shipyard
+    'shipping_container': ('box', (6.1, 2.44, 2.59), (12.2, 2.44, 2.59), 'floor'),
+    'crane': ('box', (3.0, 3.0, 15.0), (5.0, 5.0, 25.0), 'floor'),
+    'ship_hull': ('box', (20.0, 6.0, 6.0), (35.0, 10.0, 12.0), 'floor'),
+    'scaffolding': ('box', (2.0, 2.0, 4.0), (6.0, 3.0, 12.0), 'floor'),
+    # ruins
+    'collapsed_wall': ('box', (2.0, 0.4, 1.0), (6.0, 0.8, 4.0), 'floor'),
+    'pillar_fragment': ('cylinder', (0.5, 0.5, 1.0), (1.0, 1.0, 5.0), 'floor'),
+    'rubble_pile': ('box', (1.0, 1.0, 0.5), (3.0, 3.0, 1.5), 'floor'),
+    'intact_archway': ('box', (3.0, 0.8, 3.5), (5.0, 1.2, 6.0), 'floor'),
+}
+DEFAULT_TEMPLATE = ('box', (0.5, 0.5, 0.5), (2.0, 2.0, 2.0), 'floor')
+
+# Families bounded by walls and a ceiling
+ENCLOSED_FAMILIES = ('office', 'warehouse', 'cave', 'maze', 'mine')
+
+# Clearance kept around start/goal and navigation altitude
+ENDPOINT_CLEARANCE_M = 0.5
+NAVIGATION_ALTITUDE_M = 1.5
+
+
+def _rng(scene_family: str, seed: int) -> np.random.Generator:
+    """PCG64 stream for (family, seed); crc32 keeps the family part stable across runs."""
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence([zlib.crc32(scene_family.encode()), int(seed)])))
+
+
+def _uniform(rng: np.random.Generator, value, default=0.0) -> float:
+    """Draw from a [lo, hi] range; scalars and None pass through."""
+    if value is None:
+        return float(default)
+    if np.ndim(value) == 0:
+        return float(value)
+    return float(rng.uniform(value[0], value[1]))
+
+
+class _Primitives:
+    """Column builder for the primitive table."""
+
+    def __init__(self):
+        self.kind: List[str] = []
+        self.shape: List[str] = []
+        self.center: List[Tuple[float, float, float]] = []
+        self.size: List[Tuple[float, float, float]] = []
+        self.yaw: List[float] = []
+        self.mesh: List[str] = []
+
+    def add(self, kind, shape, center, size, yaw=0.0, mesh=''):
+        self.kind.append(kind)
+        self.shape.append(shape)
+        self.center.append(tuple(center))
+        self.size.append(tuple(size))
+        self.yaw.append(float(yaw))
+        self.mesh.append(mesh)
+
+    def table(self) -> Dict:
+        def rounded(values, width):
+            return np.round(np.asarray(values, dtype=np.float64).reshape(-1, width), 3)
+        return {
+            'kind': list(self.kind),
+            'shape': list(self.shape),
+            'center': rounded(self.center, 3),
+            'size': rounded(self.size, 3),
+            'yaw': rounded(self.yaw, 1).reshape(-1),
+            'mesh': list(self.mesh),
+        }
+
+
+def _add_enclosure(prims: _Primitives, size: np.ndarray, thickness: float = 0.2):
+    """Perimeter walls and a ceiling slab just outside the scene volume."""
+    sx, sy, sz = size
+    t = thickness
+    for sign in (-1.0, 1.0):
+        prims.add('structure', 'box', (sign * (sx + t) / 2, 0.0, sz / 2), (t, sy + 2 * t, sz))
+        prims.add('structure', 'box', (0.0, sign * (sy + t) / 2, sz / 2), (sx, t, sz))
+    prims.add('structure', 'box', (0.0, 0.0, sz + t / 2), (sx + 2 * t, sy + 2 * t, t))
+
+
+def _add_maze(prims: _Primitives, rng, size: np.ndarray, asset: Dict, dimensions: Dict,
+              topology: Dict):
+    """Recursive-backtracker maze of wall segments over the floor plan.
+
+    Dead ends are opened into loops with probability ``1 - dead_end_probability``.
+    """
+    thickness = float(asset.get('thickness', 0.2))
+    height = _uniform(rng, dimensions.get('wall_height'), 3.0)
+    cells = np.maximum((size[:2] // 3.0).astype(int), 2)           # ~3 m corridors
+    cell = size[:2] / cells
+    nx, ny = int(cells[0]), int(cells[1])
+
+    # Walls between (i, j)-(i+1, j) are east walls, (i, j)-(i, j+1) north walls
+    east = np.ones((nx - 1, ny), dtype=bool)
+    north = np.ones((nx, ny - 1), dtype=bool)
+    visited = np.zeros((nx, ny), dtype=bool)
+    stack = [(0, 0)]
+    visited[0, 0] = True
+    while stack:
+        i, j = stack[-1]
+        options = [(i + di, j + dj) for di, dj in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if 0 <= i + di < nx and 0 <= j + dj < ny and not visited[i + di, j + dj]]
+        if not options:
+            stack.pop()
+            continue
+        ni, nj = options[int(rng.integers(len(options)))]
+        if ni != i:
+            east[min(i, ni), j] = False
+        else:
+            north[i, min(j, nj)] = False
+        visited[ni, nj] = True
+        stack.append((ni, nj))
+
+    keep_dead_ends = float(topology.get('dead_end_probability', 1.0))
+    for i in range(nx):
+        for j in range(ny):
+            walls = [(east, (i - 1, j)) if i > 0 else None, (east, (i, j)) if i < nx - 1 else None,
+                     (north, (i, j - 1)) if j > 0 else None, (north, (i, j)) if j < ny - 1 else None]
+            closed = [w for w in walls if w is not None and w[0][w[1]]]
+            if len(closed) == 3 and rng.random() > keep_dead_ends:
+                grid, index = closed[int(rng.integers(len(closed)))]
+                grid[index] = False
+
+    origin = -size[:2] / 2
+    for i, j in zip(*np.nonzero(east)):
+        x = origin[0] + (i + 1) * cell[0]
+        y = origin[1] + (j + 0.5) * cell[1]
+        prims.add('wall_segment', 'box', (x, y, height / 2), (thickness, cell[1] + thickness, height))
+    for i, j in zip(*np.nonzero(north)):
+        x = origin[0] + (i + 0.5) * cell[0]
+        y = origin[1] + (j + 1) * cell[1]
+        prims.add('wall_segment', 'box', (x, y, height / 2), (cell[0] + thickness, thickness, height))
+
+
+def _add_grid(prims: _Primitives, rng, size: np.ndarray, kind: str, asset: Dict, count: int):
+    """Rows of aisle-separated units (e.g. warehouse shelving)."""
+    shape, lo, hi, _ = ASSET_TEMPLATES.get(kind, DEFAULT_TEMPLATE)
+    length = rng.uniform(lo[0], hi[0])
+    depth = rng.uniform(lo[1], hi[1])
+    height = min(rng.uniform(lo[2], hi[2]), size[2] - 0.5)
+    aisle = _uniform(rng, asset.get('aisle_width'), 2.0)
+    rows = max(1, int((size[1] - 2 * aisle) // (depth + aisle)))
+    per_row = max(1, int((size[0] - 2 * aisle) // (length + 0.5)))
+    y0 = -size[1] / 2 + aisle + depth / 2
+    x0 = -size[0] / 2 + aisle + length / 2
+    placed = 0
+    for row in range(rows):
+        for column in range(per_row):
+            if placed >= count:
+                return
+            prims.add(kind, shape, (x0 + column * (length + 0.5), y0 + row * (depth + aisle), height / 2),
+                      (length, depth, height), mesh=f"assets/{kind}.usd")
+            placed += 1
+
+
+def _scatter(prims: _Primitives, rng, size: np.ndarray, kind: str, asset: Dict, count: int,
+             dimensions: Dict):
+    """Uniformly placed, yaw-randomized instances of one asset type."""
+    shape, lo, hi, placement = ASSET_TEMPLATES.get(kind, DEFAULT_TEMPLATE)
+    lo, hi = np.array(lo, dtype=np.float64), np.array(hi, dtype=np.float64)
+    if 'height_range' in asset:
+        lo[2], hi[2] = asset['height_range']
+    if 'footprint_range' in asset:
+        (lo[0], lo[1]), (hi[0], hi[1]) = asset['footprint_range']
+    if kind == 'building' and 'building_height_range' in dimensions:
+        lo[2], hi[2] = dimensions['building_height_range']
+
+    extents = rng.uniform(lo, hi, size=(count, 3))
+    if shape == 'cylinder':
+        extents[:, 1] = extents[:, 0]
+    extents[:, 2] = np.minimum(extents[:, 2], size[2])
+    if placement == 'column':
+        extents[:, 2] = size[2]
+    margin = np.minimum(extents[:, :2].max(axis=1, keepdims=True) / 2, size[:2] / 2 - 0.01)
+    xy = rng.uniform(-size[:2] / 2 + margin, size[:2] / 2 - margin)
+    yaw = rng.uniform(-np.pi, np.pi, size=count) if shape == 'box' else np.zeros(count)
+    stacks = rng.integers(asset['stack_height_range'][0], asset['stack_height_range'][1] + 1, size=count) \
+        if asset.get('stacking') else np.ones(count, dtype=int)
+    species = asset.get('species')
+    labels = rng.integers(len(species), size=count) if species else None
+
+    for n in range(count):
+        w, d, h = extents[n]
+        z = size[2] - h / 2 if placement == 'ceiling' else h / 2
+        mesh = f"assets/{kind}_{species[labels[n]]}.usd" if species else f"assets/{kind}.usd"
+        for level in range(int(stacks[n])):
+            if z + level * h + h / 2 > size[2]:
+                break
+            prims.add(kind, shape, (xy[n, 0], xy[n, 1], z + level * h), (w, d, h), yaw[n], mesh)
+
+
+def _aabb(table: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """Axis-aligned bounds (N, 3) of the primitives (yaw-aware for boxes)."""
+    center, size, yaw = table['center'], table['size'], table['yaw']
+    c, s = np.abs(np.cos(yaw)), np.abs(np.sin(yaw))
+    half = size / 2
+    hx = c * half[:, 0] + s * half[:, 1]
+    hy = s * half[:, 0] + c * half[:, 1]
+    extent = np.stack([hx, hy, half[:, 2]], axis=1)
+    return center - extent, center + extent
+
+
+def is_free(table: Dict, points: np.ndarray, clearance: float = 0.0) -> np.ndarray:
+    """(M,) bool: points farther than ``clearance`` from every primitive's bounding box."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if not table['kind']:
+        return np.ones(points.shape[0], dtype=bool)
+    lo, hi = _aabb(table)
+    inside = np.all((points[:, None] > lo - clearance) & (points[:, None] < hi + clearance), axis=2)
+    return ~inside.any(axis=1)
+
+
+def _endpoints(rng, table: Dict, size: np.ndarray, navigation: Dict, tries: int = 1024):
+    """Collision-free start and goal at navigation altitude.
+
+    Candidate pairs are drawn over the whole floor plan and the first pair
+    separated by at least ``min_path_length`` (capped at 60% of the usable
+    diagonal) is kept.
+    """
+    altitude = _uniform(rng, navigation.get('altitude_range'), NAVIGATION_ALTITUDE_M)
+    altitude = min(altitude, size[2] - ENDPOINT_CLEARANCE_M)
+    margin = ENDPOINT_CLEARANCE_M + 0.5
+    lo, hi = -size[:2] / 2 + margin, size[:2] / 2 - margin
+    min_length = min(float(navigation.get('min_path_length', 0.0)), 0.6 * float(np.hypot(*(hi - lo))))
+
+    starts = np.column_stack([rng.uniform(lo, hi, (tries, 2)), np.full(tries, altitude)])
+    goals = np.column_stack([rng.uniform(lo, hi, (tries, 2)), np.full(tries, altitude)])
+    ok = (is_free(table, starts, ENDPOINT_CLEARANCE_M) & is_free(table, goals, ENDPOINT_CLEARANCE_M)
+          & (np.linalg.norm(goals - starts, axis=1) >= min_length))
+    pick = int(np.argmax(ok))
+    return np.round(starts[pick], 3), np.round(goals[pick], 3), bool(ok[pick])
+
+
+def free_fraction(table: Dict, size: np.ndarray, spacing: float = 1.0) -> float:
+    """Fraction of a ``spacing`` lattice over the scene volume outside every primitive."""
+    axes = [np.arange(spacing / 2, extent, spacing) - (extent / 2 if i < 2 else 0.0)
+            for i, extent in enumerate(size)]
+    points = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+    return float(is_free(table, points).mean()) if points.size else 1.0
+
+
+def description_hash(scene: Dict) -> str:
+    """Hash of the canonical JSON of a scene description."""
+    return hashlib.sha256(scene_to_json(scene).encode('utf-8')).hexdigest()[:16]
+
+
+def scene_to_json(scene: Dict) -> str:
+    """Canonical JSON (sorted keys, arrays as lists)."""
+    def plain(value):
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, dict):
+            return {k: plain(v) for k, v in value.items()}
+        return value
+    return json.dumps(plain({k: v for k, v in scene.items() if k != 'description_hash'}), sort_keys=True)
+
+
+def scene_from_json(text: str) -> Dict:
+    """Inverse of ``scene_to_json`` (primitive columns back to arrays)."""
+    scene = json.loads(text)
+    prims = scene['primitives']
+    prims['center'] = np.asarray(prims['center'], dtype=np.float64).reshape(-1, 3)
+    prims['size'] = np.asarray(prims['size'], dtype=np.float64).reshape(-1, 3)
+    prims['yaw'] = np.asarray(prims['yaw'], dtype=np.float64).reshape(-1)
+    for key in ('size', 'start', 'goal'):
+        scene[key] = np.asarray(scene[key], dtype=np.float64)
+    return scene
+
+
+def generate_scene(scene_family: str, seed: int, family_config: Optional[Dict] = None) -> Dict:
+    """Build the scene description for (family, seed).
+
+    Args:
+        scene_family: Family name (key of ``scene_families``)
+        seed: Scene seed
+        family_config: The family's section of ``scenes_config.yaml``
+
+    Returns:
+        Scene description dict (see module docstring)
+    """
+    config = family_config or {}
+    rng = _rng(scene_family, seed)
+    dimensions = config.get('dimensions', {})
+
+    (lo, hi) = dimensions.get('size_range', [[10, 10, 3], [50, 50, 10]])
+    size = rng.uniform(lo, hi)
+    for key in ('ceiling_height', 'canopy_height'):
+        if key in dimensions:
+            size[2] = _uniform(rng, dimensions[key])
+    size = np.round(size, 3)
+
+    prims = _Primitives()
+    if scene_family in ENCLOSED_FAMILIES:
+        _add_enclosure(prims, size)
+    topology = config.get('randomization', {}).get('topology', {})
+    for asset in config.get('assets', []):
+        kind = asset.get('type', 'obstacle')
+        count = int(rng.integers(asset['count_range'][0], asset['count_range'][1] + 1)) \
+            if 'count_range' in asset else 1
+        if kind == 'wall_segment' and topology.get('maze_algorithm'):
+            _add_maze(prims, rng, size, asset, dimensions, topology)
+        elif asset.get('arrangement') == 'grid':
+            _add_grid(prims, rng, size, kind, asset, count)
+        else:
+            _scatter(prims, rng, size, kind, asset, count, dimensions)
+
+    table = prims.table()
+    start, goal, navigable = _endpoints(rng, table, size, config.get('navigation', {}))
+    scene = {
+        'scene_family': scene_family,
+        'seed': int(seed),
+        'difficulty': config.get('difficulty', 'medium'),
+        'generator_version': GENERATOR_VERSION,
+        'config_hash': config_hash(config),
+        'size': size,
+        'primitives': table,
+        'start': start,
+        'goal': goal,
+        'navigable': navigable,
+        'free_fraction': round(free_fraction(table, size), 4),
+    }
+    scene['description_hash'] = description_hash(scene)
+    return scene
+
+
+def _generate_one(task) -> Dict:
+    scene_family, seed, family_config = task
+    return generate_scene(scene_family, seed, family_config)
+
+
+def generate_scenes(tasks: Sequence[Tuple[str, int, Dict]], workers: Optional[int] = None,
+                    chunksize: int = 4) -> Iterator[Dict]:
+    """Generate many scenes across a process pool.
+
+    Each scene depends only on its own (family, seed, config), so results
+    are identical for any worker count; they are yielded in task order.
+
+    Args:
+        tasks: (scene_family, seed, family_config) triples
+        workers: Pool size (None = CPU count, 0 or 1 = in-process)
+        chunksize: Tasks handed to a worker at a time
+    """
+    tasks = list(tasks)
+    if workers is not None and workers <= 1:
+        yield from map(_generate_one, tasks)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_generate_one, tasks, chunksize=chunksize)
@@ -0,0 +1,329 @@
+"""Stateful, batched sensor noise models (``sensors.yaml`` noise sections).
+
+Every model works on whole (N, ...) arrays, draws its noise into buffers
+allocated once, and keeps its state (IMU biases) between steps:
+
+    - DepthNoise: Gaussian range noise (``depth_noise_std_m``), lateral
+      pixel jitter (``lateral_noise_std_px``, each pixel reads a neighbour
+      offset by a rounded Gaussian) and dropouts
+      (``missing_data_probability``, set to NaN as in ROS REP 117).
+      Every frame draws fresh, independent noise fields straight into
+      buffers preallocated for the batch (``Generator(..., out=...)``), so
+      no frame's noise or dropout mask repeats another's and a step
+      allocates nothing beyond its output array. Torch tensors (Isaac Sim
+      camera output) are perturbed on their own device with a
+      ``torch.Generator`` seeded from ``rng``; frames never leave it.
+    - ImuNoise: white noise from ``noise_density`` (σ = density·√rate), a
+      turn-on bias per reset (``bias_std``) and a bias random walk
+      (``random_walk``·√dt per step), for accelerometer and gyroscope.
+    - OdometryNoise: per-channel white noise on position, velocity and
+      orientation (a small random rotation applied to the quaternion).
+
+``SensorNoise.from_config`` builds the enabled models and applies them to an
+observation dict with the ``IsaacSimEnvironment`` keys.
+
+Example:
+    >>> noise = SensorNoise.from_config(sensor_config, num_envs=16, seed=0)
+    >>> obs = noise.apply(env.step(cmd), dt=0.01)
+    >>> noise.reset(env_ids=done)           # redraw turn-on biases
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.planning.mapping.depth_projection import to_numpy
+
+# Lateral jitter offsets are clamped to this many pixels
+MAX_LATERAL_PX = 2
+
+
+def _quat_multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Hamilton product of (..., 4) quaternions (w, x, y, z)."""
+    aw, ax, ay, az = np.moveaxis(a, -1, 0)
+    bw, bx, by, bz = np.moveaxis(b, -1, 0)
+    return np.stack([
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ], axis=-1)
+
+
+class DepthNoise:
+    """Range noise, lateral jitter and dropouts on (..., H, W) depth frames."""
+
+    def __init__(self, noise_config: Dict, shape: Tuple[int, int], batch: Optional[int] = None,
+                 min_depth_m: float = 0.1, max_depth_m: float = 30.0,
+                 rng: Optional[np.random.Generator] = None):
+        """Initialize the model and its noise buffers.
+
+        Args:
+            noise_config: ``depth_camera.noise`` section of sensors.yaml
+            shape: Frame shape (H, W)
+            batch: Frames per call (environments); allocated on the first
+                call when None
+            min_depth_m, max_depth_m: Valid range; other readings are untouched
+            rng: Random generator
+        """
+        self.std = float(noise_config.get('depth_noise_std_m', 0.0))
+        self.lateral_std = float(noise_config.get('lateral_noise_std_px', 0.0))
+        self.missing_probability = float(noise_config.get('missing_data_probability', 0.0))
+        self.min_depth_m = float(min_depth_m)
+        self.max_depth_m = float(max_depth_m)
+        self.rng = rng or np.random.default_rng()
+        self.shape = tuple(int(n) for n in shape)
+        self.batch = None
+        self._generators = {}          # torch.Generator per device, seeded from rng
+        if batch is not None:
+            self._allocate(int(batch))
+
+    def _allocate(self, batch: int):
+        """Preallocate output, padding and noise buffers for ``batch`` frames."""
+        h, w = self.shape
+        r = MAX_LATERAL_PX
+        self.batch = batch
+        size = batch * h * w
+        self._scratch = np.empty(size, dtype=np.float32)
+        self._draw = np.empty(size, dtype=np.float32)
+        self._missing = np.empty(size, dtype=bool)
+
+        # Lateral jitter: flat (dy, dx) offsets into a replicate-padded frame
+        self._padded = np.empty((batch, h + 2 * r, w + 2 * r), dtype=np.float32)
+        self._pw = w + 2 * r
+        rows = (np.arange(batch)[:, None, None] * (h + 2 * r) + np.arange(h)[None, :, None] + r) * self._pw
+        self._base = (rows + np.arange(w)[None, None, :] + r).reshape(-1).astype(np.intp)
+        self._index = np.empty(size, dtype=np.intp)
+        self._jitter = np.empty((2, size), dtype=np.float32)
+
+    def _lateral_index(self) -> np.ndarray:
+        """Fresh flat gather indices: each pixel offset by a rounded, clamped Gaussian."""
+        r = MAX_LATERAL_PX
+        jitter = self._jitter
+        self.rng.standard_normal(dtype=np.float32, out=jitter)
+        jitter *= np.float32(self.lateral_std)
+        np.rint(jitter, out=jitter)
+        np.clip(jitter, -r, r, out=jitter)
+        index = self._index
+        np.copyto(index, jitter[0], casting='unsafe')
+        index *= self._pw
+        np.add(index, jitter[1], out=index, casting='unsafe')
+        index += self._base
+        return index
+
+    def apply(self, depth) -> np.ndarray:
+        """Noisy float32 copy of ``depth`` (one or a batch of frames, array or tensor)."""
+        if hasattr(depth, 'detach'):
+            return self._apply_torch(depth)
+        depth = to_numpy(depth)
+        frames = depth.reshape((-1,) + self.shape)
+        if frames.shape[0] != self.batch:
+            self._allocate(frames.shape[0])
+        out = np.empty(frames.shape, dtype=np.float32)
+        flat = out.reshape(-1)
+
+        if self.lateral_std > 0:
+            r = MAX_LATERAL_PX
+            pad = self._padded
+            pad[:, r:-r, r:-r] = frames
+            pad[:, :r, r:-r] = frames[:, :1]
+            pad[:, -r:, r:-r] = frames[:, -1:]
+            pad[:, :, :r] = pad[:, :, r:r + 1]
+            pad[:, :, -r:] = pad[:, :, -r - 1:-r]
+            np.take(pad.reshape(-1), self._lateral_index(), out=flat)
+        else:
+            out[...] = frames
+
+        valid = (flat >= self.min_depth_m) & (flat <= self.max_depth_m)
+        if self.std > 0:
+            self.rng.standard_normal(dtype=np.float32, out=self._draw)
+            self._draw *= np.float32(self.std)
+            np.add(flat, self._draw, out=self._scratch)
+            np.copyto(flat, self._scratch, where=valid)
+        if self.missing_probability > 0:
+            self.rng.random(dtype=np.float32, out=self._draw)
+            np.less(self._draw, self.missing_probability, out=self._missing)
+            np.copyto(flat, np.float32(np.nan), where=self._missing)
+        return out.reshape(depth.shape)
+
+
+    def _torch_generator(self, device):
+        key = str(device)
+        if key not in self._generators:
+            import torch
+            generator = torch.Generator(device=device)
+            generator.manual_seed(int(self.rng.integers(2 ** 63)))
+            self._generators[key] = generator
+        return self._generators[key]
+
+    def _apply_torch(self, depth):
+        """``apply`` for torch tensors, computed on the tensor's device."""
+        import torch
+        import torch.nn.functional as F
+
+        frames = depth.reshape((-1,) + self.shape).float()
+        device = frames.device
+        generator = self._torch_generator(device)
+        h, w = self.shape
+
+        if self.lateral_std > 0:
+            r = MAX_LATERAL_PX
+            pad = F.pad(frames[:, None], (r, r, r, r), mode='replicate')[:, 0]
+            jitter = torch.randn((2,) + tuple(frames.shape), generator=generator, device=device)
+            jitter = (jitter * self.lateral_std).round_().clamp_(-r, r).long()
+            rows = torch.arange(h, device=device)[None, :, None] + r + jitter[0]
+            cols = torch.arange(w, device=device)[None, None, :] + r + jitter[1]
+            out = pad[torch.arange(frames.shape[0], device=device)[:, None, None], rows, cols]
+        else:
+            out = frames.clone()
+
+        valid = (out >= self.min_depth_m) & (out <= self.max_depth_m)
+        if self.std > 0:
+            noise = torch.randn(out.shape, generator=generator, device=device) * self.std
+            out = torch.where(valid, out + noise, out)
+        if self.missing_probability > 0:
+            dropped = torch.rand(out.shape, generator=generator, device=device) < self.missing_probability
+            out = out.masked_fill(dropped, float('nan'))
+        return out.reshape(depth.shape)
+
+class ImuNoise:
+    """White noise plus random-walk bias for accelerometer and gyroscope."""
+
+    def __init__(self, imu_config: Dict, num_envs: int = 1, rng: Optional[np.random.Generator] = None):
+        """Initialize the model and draw turn-on biases.
+
+        Args:
+            imu_config: ``imu`` section of sensors.yaml (``accelerometer`` and
+                ``gyroscope`` subsections)
+            num_envs: Environments N
+            rng: Random generator
+        """
+        self.rng = rng or np.random.default_rng()
+        self.num_envs = int(num_envs)
+        channels = [imu_config.get('accelerometer', {}), imu_config.get('gyroscope', {})]
+        # (2, 1, 1) per-channel parameters broadcast over (2, N, 3)
+        self.noise_density = np.array([c.get('noise_density', 0.0) for c in channels])[:, None, None]
+        self.bias_std = np.array([c.get('bias_std', 0.0) for c in channels])[:, None, None]
+        self.random_walk = np.array([c.get('random_walk', 0.0) for c in channels])[:, None, None]
+        self.bias = np.zeros((2, self.num_envs, 3))
+        self._draw = np.empty((2, self.num_envs, 3))
+        self.reset()
+
+    def reset(self, env_ids: Optional[Sequence[int]] = None):
+        """Redraw the turn-on biases of all (or ``env_ids``) environments."""
+        ids = slice(None) if env_ids is None else np.asarray(env_ids, dtype=np.int64)
+        shape = self.bias[:, ids].shape
+        self.bias[:, ids] = self.rng.standard_normal(shape) * self.bias_std
+
+    def apply(self, accel, gyro, dt: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Noisy accel and gyro (shapes of the inputs, N x 3 values).
+
+        Advances the bias random walk by ``dt``.
+        """
+        self.rng.standard_normal(out=self._draw)
+        self._draw *= self.random_walk * np.sqrt(dt)
+        self.bias += self._draw
+
+        self.rng.standard_normal(out=self._draw)
+        self._draw *= self.noise_density / np.sqrt(dt)
+        self._draw += self.bias
+        noisy_accel = to_numpy(accel).reshape(self.num_envs, 3) + self._draw[0]
+        noisy_gyro = to_numpy(gyro).reshape(self.num_envs, 3) + self._draw[1]
+        return noisy_accel.reshape(tuple(accel.shape)), noisy_gyro.reshape(tuple(gyro.shape))
+
+
+class OdometryNoise:
+    """Per-channel white noise on position, velocity and orientation."""
+
+    def __init__(self, noise_config: Dict, num_envs: int = 1, rng: Optional[np.random.Generator] = None):
+        """Initialize the model.
+
+        Args:
+            noise_config: ``odometry.noise`` section of sensors.yaml
+            num_envs: Environments N
+            rng: Random generator
+        """
+        self.rng = rng or np.random.default_rng()
+        self.num_envs = int(num_envs)
+        self.std = np.array([noise_config.get('position_std_m', 0.0),
+                             noise_config.get('velocity_std_m_s', 0.0),
+                             noise_config.get('orientation_std_rad', 0.0)])[:, None, None]
+        self._draw = np.empty((3, self.num_envs, 3))
+        self._delta = np.empty((self.num_envs, 4))
+
+    def apply(self, pos, vel, quat) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Noisy position, velocity and unit quaternion (shapes of the inputs)."""
+        shapes = tuple(pos.shape), tuple(vel.shape), tuple(quat.shape)
+        self.rng.standard_normal(out=self._draw)
+        self._draw *= self.std
+        pos = to_numpy(pos).reshape(self.num_envs, 3) + self._draw[0]
+        vel = to_numpy(vel).reshape(self.num_envs, 3) + self._draw[1]
+
+        # Body-frame rotation by the small angle vector, exact exponential map
+        angle = np.linalg.norm(self._draw[2], axis=1)
+        self._delta[:, 0] = np.cos(angle / 2)
+        self._delta[:, 1:] = self._draw[2] * (np.sinc(angle / (2 * np.pi)) / 2)[:, None]
+        quat = _quat_multiply(to_numpy(quat).reshape(self.num_envs, 4), self._delta)
+        quat /= np.linalg.norm(quat, axis=1, keepdims=True)
+        return pos.reshape(shapes[0]), vel.reshape(shapes[1]), quat.reshape(shapes[2])
+
+
+class SensorNoise:
+    """The enabled noise models applied to an observation dict."""
+
+    def __init__(self, depth: Optional[DepthNoise] = None, imu: Optional[ImuNoise] = None,
+                 odometry: Optional[OdometryNoise] = None):
+        self.depth = depth
+        self.imu = imu
+        self.odometry = odometry
+
+    @classmethod
+    def from_config(cls, sensor_config: Dict, num_envs: int = 1, seed: Optional[int] = None) -> 'SensorNoise':
+        """Build the models enabled in a parsed sensors.yaml.
+
+        Nothing is enabled when ``global.enable_physics_noise`` is false. The
+        IMU has no ``noise.enabled`` switch and follows ``imu.enabled``.
+        """
+        rng = np.random.default_rng(seed)
+        if not sensor_config.get('global', {}).get('enable_physics_noise', True):
+            return cls()
+
+        camera = sensor_config.get('depth_camera', {})
+        depth = None
+        if camera.get('enabled', False) and camera.get('noise', {}).get('enabled', False):
+            resolution = camera.get('resolution', {})
+            depth = DepthNoise(camera['noise'], (resolution.get('height', 480), resolution.get('width', 640)),
+                               min_depth_m=camera.get('min_depth_m', 0.1),
+                               max_depth_m=camera.get('max_depth_m', 30.0), rng=rng)
+
+        imu_config = sensor_config.get('imu', {})
+        imu = ImuNoise(imu_config, num_envs, rng) if imu_config.get('enabled', False) else None
+
+        odom = sensor_config.get('odometry', {})
+        odometry = None
+        if odom.get('enabled', False) and odom.get('noise', {}).get('enabled', False):
+            odometry = OdometryNoise(odom['noise'], num_envs, rng)
+        return cls(depth, imu, odometry)
+
+    def reset(self, env_ids: Optional[Sequence[int]] = None):
+        """Reset stateful models (IMU biases) for all or ``env_ids`` environments."""
+        if self.imu is not None:
+            self.imu.reset(env_ids)
+
+    def apply(self, obs: Dict, dt: float) -> Dict:
+        """Observation dict with noisy sensor keys (other keys untouched).
+
+        Args:
+            obs: Observation with ``depth``, ``imu_*`` and ``odom_*`` keys
+                (any subset), batched over N environments
+            dt: Time since the previous call (IMU bias random walk)
+        """
+        obs = dict(obs)
+        if self.depth is not None and 'depth' in obs:
+            obs['depth'] = self.depth.apply(obs['depth'])
+        if self.imu is not None and 'imu_accel' in obs:
+            obs['imu_accel'], obs['imu_gyro'] = self.imu.apply(obs['imu_accel'], obs['imu_gyro'], dt)
+        if self.odometry is not None and 'odom_pos' in obs:
+            obs['odom_pos'], obs['odom_vel'], obs['odom_quat'] = self.odometry.apply(
+                obs['odom_pos'], obs['odom_vel'], obs['odom_quat'])
+        return obs
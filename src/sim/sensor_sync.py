@@ -0,0 +1,270 @@
+"""Software timestamp synchronization of depth, IMU and odometry.
+
+``_get_sensor_observations`` returns the latest value of every sensor, so a
+depth image can be paired with an IMU sample or pose from a different tick.
+``SensorSynchronizer`` keeps a short time-indexed buffer per sensor and
+assembles frames anchored on the depth timestamps:
+
+    - for every other sensor the samples bracketing the anchor are found by
+      bisection (O(log n)); when they are at most 2 x ``max_time_diff_s``
+      apart they are interpolated (linear, normalized lerp for quaternions),
+      otherwise the nearest sample is used if it is within ``max_time_diff_s``
+    - a frame waits until every sensor has data at or after its anchor (or a
+      newer anchor arrived), so late samples are not missed
+    - frames that cannot be matched are dropped and counted per sensor in
+      ``rejected``
+
+Repeated samples (a 20 Hz sensor read every 100 Hz step) are skipped by a
+per-sensor rate gate from ``update_rate_hz``; a ``<sensor>_fresh`` flag in
+the observation (``imu_fresh`` from the IMU decimator) overrides it, and a
+``<sensor>_timestamp`` key overrides the observation ``timestamp``. Samples
+flagged invalid (``<sensor>_valid`` False, from ``SensorValidator``) are not
+buffered, so frames are assembled from neighbouring valid samples or rejected.
+
+Example:
+    >>> sync = SensorSynchronizer.from_config(sensor_config)
+    >>> for frame in sync.push_obs(env.step()):
+    ...     mapper.integrate(frame['depth'], frame['odom_pos'], frame['odom_quat'])
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.planning.mapping.depth_projection import to_numpy
+
+# Observation keys per sensor (only those present are buffered)
+SENSOR_KEYS = {
+    'depth': ('depth',),
+    'imu': ('imu_accel', 'imu_gyro', 'imu_delta_v', 'imu_delta_angle'),
+    'odom': ('odom_pos', 'odom_vel', 'odom_quat'),
+}
+QUATERNION_KEYS = ('odom_quat',)
+NO_INTERPOLATION_KEYS = ('depth', 'imu_delta_v', 'imu_delta_angle')   # window quantities
+
+
+class _TimeBuffer:
+    """Append-only (timestamp, sample) buffer trimmed to a time horizon.
+
+    Samples live in plain lists; trimming only advances ``start`` and the
+    lists are compacted once the dead prefix outgrows the live part, so
+    appends and trims are amortized O(1) and lookups bisect the live range.
+    """
+
+    def __init__(self, horizon_s: float):
+        self.horizon_s = float(horizon_s)
+        self.times: List[float] = []
+        self.samples: List[Dict[str, np.ndarray]] = []
+        self.start = 0
+
+    def __len__(self) -> int:
+        return len(self.times) - self.start
+
+    @property
+    def newest(self) -> float:
+        return self.times[-1] if len(self) else -np.inf
+
+    def append(self, timestamp: float, sample: Dict[str, np.ndarray]):
+        self.times.append(timestamp)
+        self.samples.append(sample)
+        self.trim(timestamp - self.horizon_s)
+
+    def trim(self, before: float):
+        """Drop samples older than ``before`` (keeping one to bracket it)."""
+        self.start = max(self.start, bisect_left(self.times, before, self.start) - 1)
+        if self.start > 64 and self.start > len(self):
+            del self.times[:self.start], self.samples[:self.start]
+            self.start = 0
+
+    def clear(self):
+        self.times.clear()
+        self.samples.clear()
+        self.start = 0
+
+
+class SensorSynchronizer:
+    """Assemble depth-anchored frames from independently timed sensors."""
+
+    def __init__(self, max_time_diff_s: float = 0.01, buffer_s: float = 0.5,
+                 rates_hz: Optional[Dict[str, float]] = None, anchor: str = 'depth',
+                 interpolate: bool = True):
+        """Initialize the buffers.
+
+        Args:
+            max_time_diff_s: Largest accepted offset between the anchor and a
+                matched (nearest) sample
+            buffer_s: Time horizon kept per sensor
+            rates_hz: Sensor update rates used to skip repeated reads
+                (sensors not listed accept every new timestamp)
+            anchor: Sensor whose timestamps define the frames
+            interpolate: Interpolate bracketing samples instead of picking the nearest
+        """
+        self.max_time_diff_s = float(max_time_diff_s)
+        self.anchor = anchor
+        self.interpolate = bool(interpolate)
+        self.rates_hz = dict(rates_hz or {})
+        self.buffers = {name: _TimeBuffer(buffer_s) for name in SENSOR_KEYS}
+        self._last_anchor = -np.inf    # timestamp of the last anchor turned into a frame (or dropped)
+
+        self.frames_emitted = 0
+        self.rejected = dict.fromkeys(SENSOR_KEYS, 0)
+        self.interpolated = dict.fromkeys(SENSOR_KEYS, 0)
+        self.invalid = dict.fromkeys(SENSOR_KEYS, 0)
+
+    @classmethod
+    def from_config(cls, sensor_config: Dict, **overrides) -> 'SensorSynchronizer':
+        """Synchronizer for the ``synchronization`` block of sensors.yaml.
+
+        Depth and odometry are gated at ``update_rate_hz``; the IMU at its
+        ``log_rate_hz`` (the decimated stream).
+        """
+        sync = sensor_config.get('synchronization', {})
+        imu = sensor_config.get('imu', {})
+        rates = {
+            'depth': float(sensor_config.get('depth_camera', {}).get('update_rate_hz', 20)),
+            'imu': float(imu.get('log_rate_hz', imu.get('update_rate_hz', 20))),
+            'odom': float(sensor_config.get('odometry', {}).get('update_rate_hz', 20)),
+        }
+        kwargs = dict(max_time_diff_s=sync.get('max_time_diff_s', 0.01), rates_hz=rates)
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    def reset(self):
+        """Drop all buffered samples (e.g. on environment reset)."""
+        for buffer in self.buffers.values():
+            buffer.clear()
+        self._last_anchor = -np.inf
+
+    # ------------------------------------------------------------------
+    # Input
+    # ------------------------------------------------------------------
+
+    def push(self, sensor: str, timestamp: float, sample: Dict, rate_gate: bool = True) -> bool:
+        """Buffer one sample of ``sensor``; False if it was a repeated read.
+
+        Args:
+            sensor: 'depth', 'imu' or 'odom'
+            timestamp: Sample time in seconds
+            sample: Observation keys of the sensor (arrays are copied, the
+                simulator reuses its buffers)
+            rate_gate: Skip samples closer than one sensor period to the previous one
+        """
+        buffer = self.buffers[sensor]
+        timestamp = float(timestamp)
+        if timestamp < buffer.newest - 1e-9:
+            self.reset()                                   # time went backwards: new episode
+        rate = self.rates_hz.get(sensor) if rate_gate else None
+        if timestamp < buffer.newest + max((1.0 / rate if rate else 0.0) - 1e-6, 1e-9):
+            return False
+        buffer.append(timestamp, {key: np.array(to_numpy(value)) for key, value in sample.items()})
+        return True
+
+    def push_obs(self, obs: Dict, force: bool = False) -> List[Dict]:
+        """Buffer the sensors present in an observation and return the frames now complete.
+
+        Args:
+            obs: Observation dict (``_get_sensor_observations`` layout)
+            force: Emit pending frames without waiting for later samples
+        """
+        default_time = float(to_numpy(obs.get('timestamp', 0.0)).reshape(-1)[0])
+        for sensor, keys in SENSOR_KEYS.items():
+            sample = {key: obs[key] for key in keys if obs.get(key) is not None}
+            if not sample:
+                continue
+            fresh = obs.get(f"{sensor}_fresh")
+            if fresh is not None and not bool(to_numpy(fresh).reshape(-1)[0]):
+                continue
+            valid = obs.get(f"{sensor}_valid")
+            if valid is not None and not bool(to_numpy(valid).all()):
+                self.invalid[sensor] += 1
+                continue
+            stamp = obs.get(f"{sensor}_timestamp")
+            timestamp = default_time if stamp is None else float(to_numpy(stamp).reshape(-1)[0])
+            self.push(sensor, timestamp, sample, rate_gate=fresh is None)
+        return self.pop_frames(force)
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def pop_frames(self, force: bool = False) -> List[Dict]:
+        """Emit every pending anchor whose partners are known.
+
+        Each frame holds ``timestamp``, the anchor's keys, the matched keys of
+        the other sensors and ``sync_skew_s`` (largest offset of a nearest
+        match; 0 for exact/interpolated matches). Sensors that never produced
+        a sample are left out instead of rejecting every frame.
+        """
+        anchors = self.buffers[self.anchor]
+        frames = []
+        index = bisect_left(anchors.times, self._last_anchor + 1e-9, anchors.start)
+        while index < len(anchors.times):
+            t = anchors.times[index]
+            newer_anchor = anchors.newest > t + self.max_time_diff_s
+            others = [name for name, buffer in self.buffers.items() if name != self.anchor and len(buffer)]
+            if not (force or newer_anchor or all(self.buffers[name].newest >= t for name in others)):
+                break
+            frame = self._assemble(t, anchors.samples[index])
+            self._last_anchor = t
+            index += 1
+            if frame is not None:
+                frames.append(frame)
+                self.frames_emitted += 1
+        return frames
+
+    def _assemble(self, t: float, anchor_sample: Dict) -> Optional[Dict]:
+        """Frame at anchor time ``t``, or None (counted) if a sensor has no match."""
+        frame = {'timestamp': t, **anchor_sample}
+        skew = 0.0
+        for name, buffer in self.buffers.items():
+            if name == self.anchor or not len(buffer):
+                continue
+            match = self._lookup(buffer, t)
+            if match is None:
+                self.rejected[name] += 1
+                return None
+            sample, offset, interpolated = match
+            self.interpolated[name] += interpolated
+            skew = max(skew, abs(offset))
+            frame.update(sample)
+        frame['sync_skew_s'] = skew
+        return frame
+
+    def _lookup(self, buffer: _TimeBuffer, t: float):
+        """(sample, offset, interpolated) of ``buffer`` at time ``t``, None if out of tolerance."""
+        times, tol = buffer.times, self.max_time_diff_s
+        i = bisect_left(times, t, buffer.start)
+        if i < len(times) and abs(times[i] - t) <= 1e-9:
+            return buffer.samples[i], 0.0, False
+        lo = buffer.samples[i - 1] if i > buffer.start else None
+        hi = buffer.samples[i] if i < len(times) else None
+        if self.interpolate and lo is not None and hi is not None and times[i] - times[i - 1] <= 2 * tol + 1e-9:
+            return _interpolate(lo, hi, (t - times[i - 1]) / (times[i] - times[i - 1])), 0.0, True
+
+        candidates = [(times[j] - t, j) for j in (i - 1, i) if buffer.start <= j < len(times)]
+        offset, j = min(candidates, key=lambda c: abs(c[0]))
+        if abs(offset) > tol + 1e-9:
+            return None
+        return buffer.samples[j], offset, False
+
+    def stats(self) -> Dict:
+        """Emitted/rejected/interpolated frame counts and skipped invalid samples."""
+        return {'frames_emitted': self.frames_emitted, 'rejected': dict(self.rejected),
+                'interpolated': dict(self.interpolated), 'invalid': dict(self.invalid)}
+
+
+def _interpolate(lo: Dict, hi: Dict, alpha: float) -> Dict:
+    """Blend two samples; quaternions by sign-aligned normalized lerp."""
+    out = {}
+    for key, a in lo.items():
+        b = hi.get(key)
+        if b is None or key in NO_INTERPOLATION_KEYS:
+            out[key] = a if alpha < 0.5 or b is None else b
+        elif key in QUATERNION_KEYS:
+            b = np.where(np.sum(a * b, axis=-1, keepdims=True) < 0, -b, b)
+            q = (1 - alpha) * a + alpha * b
+            out[key] = q / np.linalg.norm(q, axis=-1, keepdims=True)
+        else:
+            out[key] = (1 - alpha) * a + alpha * b
+    return out
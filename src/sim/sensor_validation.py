@@ -0,0 +1,137 @@
+"""Per-step validity flags for depth, IMU and odometry observations.
+
+``SensorValidator`` applies the ``validation`` thresholds of sensors.yaml
+(the same limits as the offline QC in ``src/analysis/qc.py``) to each
+observation and attaches the flags, so invalid samples can be dropped
+before they are logged or fused into the map:
+
+    - ``depth_invalid_frac``: fraction of pixels per frame that are
+      non-finite or outside [min_valid_depth_m, max_valid_depth_m];
+      ``depth_valid`` is False above ``max_invalid_pixels_percent``
+    - ``imu_valid``: |accel| <= max_accel_g and |gyro| <= max_gyro_deg_s
+    - ``odom_valid``: |vel| <= max_velocity_m_s and the position moved at
+      most max_position_jump_m since the previous observation
+    - ``sensors_valid``: all of the above
+
+Flags are computed with the array's own library (torch or numpy) by
+reductions over each frame, so a depth tensor on the GPU is reduced there
+and only the per-environment results exist as new memory. In
+``IsaacSimEnvironment`` the validator sees the depth after ``DepthNoise``,
+which also perturbs torch tensors on their device, so no depth frame is
+copied to the host before the flags exist (the small IMU/odometry vectors
+are moved to NumPy by their noise models). Batched observations give (N,)
+flags, single ones scalars. ``SensorDataLogger`` and ``SensorSynchronizer`` skip samples whose
+``<sensor>_valid`` flag is False.
+
+Example:
+    >>> validator = SensorValidator.from_config(sensor_config)
+    >>> obs = validator.apply(obs)
+    >>> if obs['depth_valid']:
+    ...     mapper.integrate(obs['depth'], obs['odom_pos'], obs['odom_quat'])
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.analysis.qc import QcThresholds
+
+SENSOR_FLAGS = ('depth_valid', 'imu_valid', 'odom_valid')
+
+
+def _is_torch(value) -> bool:
+    return type(value).__module__.startswith('torch')
+
+
+def _norm(value):
+    """Euclidean norm over the last axis (torch or numpy)."""
+    if _is_torch(value):
+        return value.norm(dim=-1)
+    return np.linalg.norm(value, axis=-1)
+
+
+class SensorValidator:
+    """Threshold checks on observations, computed where the data lives."""
+
+    def __init__(self, thresholds: Optional[QcThresholds] = None):
+        """Initialize the validator.
+
+        Args:
+            thresholds: Limits (``QcThresholds`` sensor fields; default values
+                match sensors.yaml)
+        """
+        self.thresholds = thresholds or QcThresholds()
+        self._last_pos = None          # previous odom_pos (same device/library as the observations)
+        self.invalid_counts = dict.fromkeys(SENSOR_FLAGS, 0)
+
+    @classmethod
+    def from_config(cls, sensor_config: Dict) -> Optional['SensorValidator']:
+        """Validator for the ``validation`` block of sensors.yaml (None if disabled)."""
+        if not sensor_config.get('validation', {}).get('enabled', True):
+            return None
+        return cls(QcThresholds.from_config(sensor_config))
+
+    def reset(self, env_ids=None):
+        """Forget the previous position (all environments, or ``env_ids``)."""
+        if env_ids is None or self._last_pos is None:
+            self._last_pos = None
+        else:
+            self._last_pos[env_ids] = float('nan')
+
+    # ------------------------------------------------------------------
+    # Checks
+    # ------------------------------------------------------------------
+
+    def depth_invalid_frac(self, depth):
+        """Invalid-pixel fraction per frame: (N,) for (N, H, W[, 1]), scalar for (H, W)."""
+        limits = self.thresholds
+        if _is_torch(depth):
+            import torch
+            valid = torch.isfinite(depth) & (depth >= limits.min_valid_depth_m) & (depth <= limits.max_valid_depth_m)
+            valid = valid.reshape(-1) if depth.dim() == 2 else valid.reshape(depth.shape[0], -1)
+            return 1.0 - valid.float().mean(dim=-1)
+        depth = np.asarray(depth)
+        valid = np.isfinite(depth) & (depth >= limits.min_valid_depth_m) & (depth <= limits.max_valid_depth_m)
+        valid = valid.reshape(-1) if depth.ndim == 2 else valid.reshape(depth.shape[0], -1)
+        return 1.0 - valid.mean(axis=-1)
+
+    def imu_valid(self, accel, gyro):
+        """|accel| and |gyro| inside the limits, per environment."""
+        limits = self.thresholds
+        return (_norm(accel) <= limits.max_accel_m_s2) & (_norm(gyro) <= limits.max_gyro_rad_s)
+
+    def odom_valid(self, pos, vel):
+        """Speed and position jump since the previous call inside the limits."""
+        limits = self.thresholds
+        valid = _norm(vel) <= limits.max_sensor_velocity_m_s
+        previous = self._last_pos
+        if previous is not None and tuple(previous.shape) == tuple(pos.shape):
+            jump = _norm(pos - previous)
+            # NaN (first step after a reset) compares False, i.e. passes
+            valid = valid & ~(jump > limits.max_position_jump_m)
+        self._last_pos = pos.clone() if _is_torch(pos) else np.array(pos, dtype=np.float64)
+        return valid
+
+    def apply(self, obs: Dict) -> Dict:
+        """Attach ``depth_invalid_frac`` and the ``*_valid`` flags to ``obs`` (in place)."""
+        flags = []
+        if obs.get('depth') is not None:
+            frac = self.depth_invalid_frac(obs['depth'])
+            obs['depth_invalid_frac'] = frac
+            obs['depth_valid'] = frac <= self.thresholds.max_invalid_pixels_frac
+            flags.append('depth_valid')
+        if obs.get('imu_accel') is not None and obs.get('imu_gyro') is not None:
+            obs['imu_valid'] = self.imu_valid(obs['imu_accel'], obs['imu_gyro'])
+            flags.append('imu_valid')
+        if obs.get('odom_pos') is not None and obs.get('odom_vel') is not None:
+            obs['odom_valid'] = self.odom_valid(obs['odom_pos'], obs['odom_vel'])
+            flags.append('odom_valid')
+
+        valid = None
+        for flag in flags:
+            valid = obs[flag] if valid is None else valid & obs[flag]
+            if not bool(obs[flag].all()):
+                self.invalid_counts[flag] += 1
+        if valid is not None:
+            obs['sensors_valid'] = valid
+        return obs
@@ -0,0 +1,297 @@
+"""Batched front end over many simulated drones for episode collection.
+
+``VectorEnv`` drives N environments through one ``reset(seeds)`` /
+``step(actions)`` API. The N drones are split over ``num_workers`` worker
+processes, each owning one vectorized backend (``CpuQuadrotorEnvironment``
+by default) for its slice; with ``num_workers=0`` one in-process backend
+holds all N. Workers step in parallel and their stacked observations are
+concatenated back in environment order.
+
+Episodes end on collision, after ``max_episode_steps`` or when ``done_fn``
+says so, and are reset automatically with the environment's next seed
+(``seed + num_envs``, so contiguous seed ranges never repeat). Per-env seeds
+fix the initial conditions of every episode independently of the worker
+layout.
+
+Example:
+    >>> env = VectorEnv(num_envs=1024, num_workers=4, max_episode_steps=2000)
+    >>> obs = env.reset(seeds=0)                    # env i starts with seed i
+    >>> for _ in range(10000):
+    ...     obs = env.step(controller.compute(obs, reference))
+    ...     store(obs['terminal'])                  # final observations of finished episodes
+    >>> env.stats()['steps_per_s']
+"""
+
+import multiprocessing as mp
+import time
+import traceback
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.sim.cpu_backend import CpuQuadrotorEnvironment
+
+# Marker for backends with nothing to do in a command round
+_SKIP = object()
+
+
+def _split_action(action, bounds: List[tuple]) -> List:
+    """Per-worker slices of an (N, ...) array, a dict of them, or None."""
+    if action is None:
+        return [None] * len(bounds)
+    if isinstance(action, dict):
+        parts = [{} for _ in bounds]
+        for key, value in action.items():
+            value = np.asarray(value)
+            for part, (lo, hi) in zip(parts, bounds):
+                part[key] = value[lo:hi]
+        return parts
+    action = np.asarray(action)
+    return [action[lo:hi] for lo, hi in bounds]
+
+
+def _merge(observations: List[Dict], sizes: List[int]) -> Dict:
+    """Concatenate per-worker observation dicts along the environment axis.
+
+    Per-environment arrays (leading dimension equal to the worker's slice)
+    are concatenated; shared values (``timestamp``, flags) come from the
+    first worker.
+    """
+    merged = {}
+    for key, value in observations[0].items():
+        if np.ndim(value) >= 1 and np.shape(value)[0] == sizes[0]:
+            merged[key] = np.concatenate([np.asarray(obs[key]) for obs in observations])
+        else:
+            merged[key] = value
+    return merged
+
+
+def _worker(env_fn: Callable, num_envs: int, conn):
+    """Worker process: own one backend for a slice of the environments."""
+    env = None
+    try:
+        env = env_fn(num_envs=num_envs)
+        while True:
+            command, payload = conn.recv()
+            try:
+                if command == 'step':
+                    result = env.step(payload)
+                elif command == 'reset':
+                    env_ids, seeds = payload
+                    result = env.reset(env_ids=env_ids, seeds=seeds)
+                elif command == 'close':
+                    conn.send((None, None))
+                    return
+                else:
+                    raise ValueError(f"Unknown command '{command}'")
+                conn.send((None, result))
+            except Exception:
+                conn.send((traceback.format_exc(), None))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        if env is not None:
+            env.close()
+        conn.close()
+
+
+class VectorEnv:
+    """N environments behind one batched reset/step API with auto-reset."""
+
+    def __init__(self, num_envs: int,
+                 env_fn: Callable = CpuQuadrotorEnvironment,
+                 num_workers: int = 0,
+                 max_episode_steps: int = 1000,
+                 done_fn: Optional[Callable[[Dict], np.ndarray]] = None,
+                 auto_reset: bool = True,
+                 start_method: Optional[str] = None):
+        """Initialize the backends (worker processes start immediately).
+
+        Args:
+            num_envs: Total number of environments N
+            env_fn: Picklable factory ``env_fn(num_envs=k)`` returning a
+                vectorized backend with ``reset(env_ids=, seeds=)``,
+                ``step(action)`` and ``close()`` (e.g. a ``functools.partial``
+                of ``CpuQuadrotorEnvironment`` with a config)
+            num_workers: Worker processes (0 runs one in-process backend)
+            max_episode_steps: Episode length limit
+            done_fn: Optional extra termination test, (N,) bool from an observation
+            auto_reset: Reset finished environments inside ``step``
+            start_method: multiprocessing start method (platform default)
+        """
+        self.num_envs = int(num_envs)
+        self.max_episode_steps = int(max_episode_steps)
+        self.done_fn = done_fn
+        self.auto_reset = auto_reset
+        self.num_workers = min(int(num_workers), self.num_envs)
+
+        # Contiguous slices of the environment axis per backend
+        parts = max(1, self.num_workers)
+        edges = np.linspace(0, self.num_envs, parts + 1).round().astype(int)
+        self.bounds = [(int(lo), int(hi)) for lo, hi in zip(edges[:-1], edges[1:])]
+        self.sizes = [hi - lo for lo, hi in self.bounds]
+
+        self._env = None
+        self._conns, self._workers = [], []
+        if self.num_workers == 0:
+            self._env = env_fn(num_envs=self.num_envs)
+        else:
+            ctx = mp.get_context(start_method)
+            for size in self.sizes:
+                parent, child = ctx.Pipe()
+                worker = ctx.Process(target=_worker, args=(env_fn, size, child), daemon=True)
+                worker.start()
+                child.close()
+                self._conns.append(parent)
+                self._workers.append(worker)
+
+        self.seeds = np.arange(self.num_envs, dtype=np.int64)
+        self.episode_steps = np.zeros(self.num_envs, dtype=np.int64)
+        self.episodes_completed = 0
+        self.env_steps = 0
+        self._wall_s = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Backend dispatch
+    # ------------------------------------------------------------------
+
+    def _call(self, command: str, payloads: List) -> List[Dict]:
+        """Send one command per backend (all before waiting) and collect the results."""
+        if self._env is not None:
+            if command == 'step':
+                return [self._env.step(payloads[0])]
+            env_ids, seeds = payloads[0]
+            return [self._env.reset(env_ids=env_ids, seeds=seeds)]
+        active = [i for i, payload in enumerate(payloads) if payload is not _SKIP]
+        for i in active:
+            self._conns[i].send((command, payloads[i]))
+        results = []
+        for i in active:
+            error, result = self._conns[i].recv()
+            if error is not None:
+                raise RuntimeError(f"VectorEnv worker {i} failed on '{command}':\n{error}")
+            results.append(result)
+        return results
+
+    def _reset_ids(self, env_ids: np.ndarray, full: bool = False) -> Dict[int, Dict]:
+        """Reset environments with their current seeds; returns each touched backend's observation.
+
+        ``full`` resets whole backends (clock and gust process included);
+        otherwise only the listed environments, so backend clocks stay aligned.
+        """
+        payloads, touched = [], []
+        for w, (lo, hi) in enumerate(self.bounds):
+            local = env_ids[(env_ids >= lo) & (env_ids < hi)]
+            if local.size == 0:
+                payloads.append(_SKIP)
+                continue
+            payloads.append((None if full else local - lo, self.seeds[local]))
+            touched.append(w)
+        results = self._call('reset', payloads)
+        return dict(zip(touched, results))
+
+    # ------------------------------------------------------------------
+    # Batched API
+    # ------------------------------------------------------------------
+
+    def reset(self, seeds=None) -> Dict:
+        """Reset every environment.
+
+        Args:
+            seeds: (N,) seeds, or one int ``s`` for seeds ``s .. s + N - 1``
+                (default: continue from the current seeds)
+
+        Returns:
+            Stacked (N, ...) observation dictionary
+        """
+        if seeds is not None:
+            seeds = np.asarray(seeds, dtype=np.int64)
+            self.seeds = seeds + np.arange(self.num_envs) if seeds.ndim == 0 else seeds.reshape(self.num_envs).copy()
+        self.episode_steps[:] = 0
+        results = self._reset_ids(np.arange(self.num_envs), full=True)
+        obs = _merge([results[w] for w in range(len(self.bounds))], self.sizes)
+        return self._annotate(obs, np.zeros(self.num_envs, dtype=bool))
+
+    def step(self, actions=None) -> Dict:
+        """Advance all environments by one step, auto-resetting finished episodes.
+
+        Args:
+            actions: (N, 4) [thrust, torque] array, dict of (N, ...) arrays
+                (``thrust``/``torque``), or None to hover
+
+        Returns:
+            Stacked observation dictionary with ``done`` (N,) bool,
+            ``episode_step`` (N,) and ``seed`` (N,). When an episode ended,
+            ``terminal`` holds the final observation rows and ``terminal_ids``
+            their indices; the regular keys of those rows already show the
+            next episode's first observation.
+        """
+        t0 = time.perf_counter()
+        obs = _merge(self._call('step', _split_action(actions, self.bounds)), self.sizes)
+        self.episode_steps += 1
+        self.env_steps += self.num_envs
+
+        done = self.episode_steps >= self.max_episode_steps
+        if 'collided' in obs:
+            done |= np.asarray(obs['collided'], dtype=bool).reshape(self.num_envs)
+        if self.done_fn is not None:
+            done |= np.asarray(self.done_fn(obs), dtype=bool).reshape(self.num_envs)
+
+        if done.any() and self.auto_reset:
+            ids = np.flatnonzero(done)
+            obs['terminal'] = {key: value[ids] for key, value in obs.items()
+                               if np.ndim(value) >= 1 and np.shape(value)[0] == self.num_envs}
+            obs['terminal_ids'] = ids
+            self.episodes_completed += ids.size
+            self.seeds[ids] += self.num_envs
+            self.episode_steps[ids] = 0
+            for w, result in self._reset_ids(ids).items():
+                lo, hi = self.bounds[w]
+                rows = ids[(ids >= lo) & (ids < hi)]
+                for key, value in result.items():
+                    if key in obs and np.ndim(value) >= 1 and np.shape(value)[0] == hi - lo:
+                        obs[key][rows] = np.asarray(value)[rows - lo]
+        self._wall_s += time.perf_counter() - t0
+        return self._annotate(obs, done)
+
+    def _annotate(self, obs: Dict, done: np.ndarray) -> Dict:
+        obs['done'] = done
+        obs['episode_step'] = self.episode_steps.copy()
+        obs['seed'] = self.seeds.copy()
+        return obs
+
+    def stats(self) -> Dict[str, float]:
+        """Aggregate throughput: environment steps, episodes, steps per second."""
+        return {
+            'num_envs': self.num_envs,
+            'num_workers': self.num_workers,
+            'env_steps': self.env_steps,
+            'episodes_completed': self.episodes_completed,
+            'step_wall_s': self._wall_s,
+            'steps_per_s': self.env_steps / self._wall_s if self._wall_s > 0 else 0.0,
+        }
+
+    def close(self):
+        """Stop the workers (or close the in-process backend)."""
+        if self._env is not None:
+            self._env.close()
+            self._env = None
+        for conn in self._conns:
+            try:
+                conn.send(('close', None))
+                conn.recv()
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+            conn.close()
+        for worker in self._workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
+        self._conns, self._workers = [], []
+
@@ -0,0 +1,101 @@
+"""Tests for analysis module components."""
+
+import numpy as np
+
+from src.analysis.qc import QcEngine, QcThresholds, accepted_episode_ids
+from src.analysis.trajectory_metrics import evaluate_metrics
+from src.dataset.shards import ShardWriter
+from src.planning.mapping.esdf_builder import EsdfMap
+
+
+def test_jerk_of_cubic_is_constant_inside_episode():
+    t = np.arange(0.0, 4.0, 0.05)
+    pos = np.stack([t ** 3, np.zeros_like(t), np.full_like(t, 1.0)], axis=1)
+
+    metrics = evaluate_metrics({'timestamp': t, 'odom_pos': pos})
+
+    # Central differences are exact for a cubic away from the one-sided ends
+    np.testing.assert_allclose(metrics['per_step']['jerk'][3:-3], 6.0, rtol=1e-6)
+    assert metrics['episodes']['max_speed'][0] > 30.0
+    assert not metrics['episodes']['feasible'][0]
+
+
+def test_batch_matches_per_episode_and_does_not_mix_episodes():
+    rng = np.random.default_rng(0)
+    episodes = []
+    for offset in (0.0, 100.0, -50.0):
+        t = np.arange(60) * 0.05
+        pos = offset + np.cumsum(rng.normal(0.0, 0.02, (60, 3)), axis=0)
+        episodes.append({'timestamp': t, 'odom_pos': pos, 'ref_pos': pos + rng.normal(0.0, 0.1, (60, 3))})
+
+    batch = evaluate_metrics(episodes)['episodes']
+    for i, episode in enumerate(episodes):
+        single = evaluate_metrics(episode)['episodes']
+        for key in ('max_jerk', 'jerk_cost', 'tracking_rms', 'path_length_m', 'max_accel'):
+            np.testing.assert_allclose(batch[key][i], single[key][0])
+    # A 100 m jump between episodes would show up as a huge speed if differenced
+    assert batch['max_speed'].max() < 10.0
+    np.testing.assert_array_equal(batch['num_steps'], [60, 60, 60])
+
+
+def test_list_input_keeps_scalar_episode_ids():
+    t = np.arange(11) * 0.05
+    episodes = [{'episode_id': 7, 'timestamp': t, 'odom_pos': np.zeros((11, 3))},
+                {'episode_id': 9, 'timestamp': t, 'odom_pos': np.full((11, 3), 100.0)}]
+
+    metrics = evaluate_metrics(episodes)['episodes']
+    np.testing.assert_array_equal(metrics['episode_id'], [7, 9])
+    np.testing.assert_array_equal(metrics['num_steps'], [11, 11])
+    assert metrics['max_speed'].max() == 0.0
+
+
+def test_clearance_uses_per_episode_maps():
+    near = EsdfMap(size_m=(10.0, 10.0, 4.0), resolution=0.2)
+    near.occupied[25:30, :, :] = True  # wall around x = 0
+    near.rebuild()
+    empty = EsdfMap(size_m=(10.0, 10.0, 4.0), resolution=0.2)
+    empty.rebuild()
+
+    pos = np.tile([[-1.0, 0.0, 2.0]], (10, 1))
+    columns = {'odom_pos': np.concatenate([pos, pos]), 'episode_id': np.repeat([7, 9], 10)}
+    metrics = evaluate_metrics(columns, esdf={7: near, 9: empty}, dt=0.05)
+
+    clearance = metrics['episodes']['min_clearance']
+    assert 0.0 < clearance[0] < 1.2
+    assert clearance[1] == empty.truncation_m
+
+
+def _qc_episode(seed, family, steps=120, **qc):
+    t = np.arange(steps) * 0.05
+    pos = np.stack([0.5 * t, np.zeros_like(t), np.full_like(t, 1.0)], axis=1)     # 0.5 m/s cruise
+    depth = np.full((steps, 6, 8), 5.0, dtype=np.float32)
+    return {'scene_family': family, 'seed': seed, 'difficulty': 'easy',
+            'qc': {'collision_free': True, 'reached_goal': True, **qc},
+            'timestamp': t, 'odom_pos': pos, 'odom_vel': np.tile([0.5, 0.0, 0.0], (steps, 1)),
+            'ref_pos': pos.copy(), 'depth': depth}
+
+
+def test_qc_engine_scores_timesteps_episodes_and_dataset(tmp_path):
+    episodes = [_qc_episode(seed, 'office' if seed % 2 else 'forest') for seed in range(8)]
+    episodes.append(_qc_episode(8, 'office', steps=60))                        # 2.95 s: too short
+    broken = _qc_episode(9, 'forest')
+    broken['depth'][:20, :3] = 0.0                                              # 50% invalid pixels
+    broken['odom_pos'][100:] += 3.0                                             # jump + tracking error
+    episodes += [broken, _qc_episode(10, 'forest', collision_free=False)]
+    with ShardWriter(tmp_path / 'dataset', max_episodes=4) as writer:
+        for episode in episodes:
+            writer.write_episode(episode)
+
+    engine = QcEngine(QcThresholds(min_scene_families=2, max_family_fraction=0.6), depth_chunk_rows=7)
+    scorecard = engine.run(tmp_path / 'dataset', tmp_path / 'qc', name='unit')
+
+    assert scorecard['episodes']['episodes'] == 11 and scorecard['episodes']['accepted'] == 9
+    assert scorecard['episodes']['rejected'] == {'duration': 1, 'completeness': 1}
+    assert scorecard['scene_families']['forest']['outcome_failures'] == 1
+    fail = scorecard['episodes']['timestep_fail_frac']
+    assert np.isclose(fail['depth'], 20 / scorecard['episodes']['timesteps']) and fail['imu'] == 0.0
+    dataset = scorecard['dataset']
+    assert abs(dataset['failure_rate'] - 1 / 11) < 1e-12 and not dataset['failure_rate_ok']
+    assert dataset['scene_families_ok'] and dataset['family_balance_ok'] and not dataset['passed']
+    assert sorted(accepted_episode_ids(scorecard['files']['episodes'])) == [0, 1, 2, 3, 4, 5, 6, 7, 10]
+    assert (tmp_path / 'qc' / 'unit_scorecard.json').exists()
@@ -0,0 +1,71 @@
+"""Tests for control module components."""
+
+import numpy as np
+
+from src.control.geometric_controller import (GRAVITY, GeometricController, compute_control_commands,
+                                              rotation_matrix_to_quat)
+from src.planning.mapping.depth_projection import quat_to_rotation_matrix
+
+
+def test_rotation_matrix_to_quat_roundtrip():
+    rng = np.random.default_rng(0)
+    quat = rng.normal(size=(200, 4))
+    quat /= np.linalg.norm(quat, axis=1, keepdims=True)
+    quat *= np.sign(quat[:, :1])
+
+    np.testing.assert_allclose(rotation_matrix_to_quat(quat_to_rotation_matrix(quat)), quat, atol=1e-12)
+
+
+def test_hover_commands_balance_gravity():
+    state = {'odom_pos': np.zeros(3), 'odom_vel': np.zeros(3), 'odom_quat': np.array([1.0, 0.0, 0.0, 0.0])}
+    cmd = compute_control_commands(state, {'position': np.zeros(3)})
+
+    assert np.isclose(cmd['thrust'], 1.0 * GRAVITY)
+    np.testing.assert_allclose(cmd['torque'], 0.0, atol=1e-12)
+    np.testing.assert_allclose(cmd['quat_des'], [1.0, 0.0, 0.0, 0.0], atol=1e-12)
+
+
+def test_batched_commands_match_per_drone_calls():
+    rng = np.random.default_rng(1)
+    n = 32
+    controller = GeometricController.randomized(n, rng)
+    quat = np.concatenate([np.ones((n, 1)), rng.normal(0.0, 0.2, (n, 3))], axis=1)
+    state = {'odom_pos': rng.normal(size=(n, 3)), 'odom_vel': rng.normal(size=(n, 3)),
+             'odom_quat': quat / np.linalg.norm(quat, axis=1, keepdims=True), 'imu_gyro': rng.normal(size=(n, 3))}
+    reference = {'position': np.zeros((n, 3)), 'yaw': rng.uniform(-np.pi, np.pi, n)}
+
+    batch = controller.compute(state, reference)
+    for i in (0, 7, n - 1):
+        single = GeometricController(1, mass=controller.mass[i:i + 1], inertia=controller.inertia[i:i + 1],
+                                     kx=controller.kx[i:i + 1], kv=controller.kv[i:i + 1],
+                                     kr=controller.kr[i:i + 1], kw=controller.kw[i:i + 1])
+        cmd = single.compute({k: v[i:i + 1] for k, v in state.items()}, {k: v[i:i + 1] for k, v in reference.items()})
+        np.testing.assert_allclose(cmd['thrust'][0], batch['thrust'][i])
+        np.testing.assert_allclose(cmd['torque'][0], batch['torque'][i])
+
+    # Gains stay within ±15% and mass within ±10% of nominal
+    assert np.all(np.abs(controller.kx / np.array([6.0, 6.0, 8.0]) - 1.0) <= 0.15 + 1e-12)
+    assert np.all(np.abs(controller.mass - 1.0) <= 0.10 + 1e-12)
+
+
+def test_randomized_batch_converges_to_setpoint():
+    rng = np.random.default_rng(2)
+    n, dt = 16, 0.002
+    controller = GeometricController.randomized(n, rng)
+    pos, vel = rng.uniform(-1.0, 1.0, (n, 3)), np.zeros((n, 3))
+    rot, omega = np.tile(np.eye(3), (n, 1, 1)), np.zeros((n, 3))
+
+    for _ in range(2000):
+        cmd = controller.compute({'odom_pos': pos, 'odom_vel': vel, 'odom_quat': rotation_matrix_to_quat(rot),
+                                  'imu_gyro': omega}, {'position': np.zeros(3), 'yaw': 0.3})
+        acc = rot[:, :, 2] * (cmd['thrust'] / controller.mass)[:, None] - np.array([0.0, 0.0, GRAVITY])
+        ang_acc = (cmd['torque'] - np.cross(omega, controller.inertia * omega)) / controller.inertia
+        pos, vel = pos + vel * dt, vel + acc * dt
+        skew = np.zeros((n, 3, 3))
+        skew[:, [2, 0, 1], [1, 2, 0]] = omega
+        skew -= np.transpose(skew, (0, 2, 1))
+        u, _, vt = np.linalg.svd(rot + rot @ skew * dt)
+        rot, omega = u @ vt, omega + ang_acc * dt
+
+    assert np.abs(pos).max() < 0.05
+    np.testing.assert_allclose(np.arctan2(rot[:, 1, 0], rot[:, 0, 0]), 0.3, atol=1e-2)
@@ -0,0 +1,152 @@
+"""Tests for the episode shard format and global index."""
+
+import json
+
+import lz4.frame
+import numpy as np
+import pytest
+
+from src.dataset.loader import EpisodeLoader
+from src.dataset.reader import EpisodeDataset, open_dataset
+from src.dataset.shards import ShardWriter, load_index
+
+
+def make_episode(seed, difficulty='easy', steps=40, family='office', **extra):
+    rng = np.random.default_rng(seed)
+    episode = {
+        'scene_family': family,
+        'seed': seed,
+        'difficulty': difficulty,
+        'qc': {'feasible': True, 'complete': seed % 3 != 0},
+        'timestamp': np.arange(steps) * 0.05,
+        'depth': rng.uniform(0.1, 30.0, size=(steps, 12, 16)).astype(np.float32),
+        'odom_pos': rng.normal(size=(steps, 3)),
+        'action': rng.normal(size=(steps, 4)).astype(np.float32),
+    }
+    episode.update(extra)
+    return episode
+
+
+def sidecar_rows(root, difficulty, shard, column):
+    sidecar = json.loads((root / 'shards' / difficulty / f'shard_{shard:05d}.json').read_text())
+    return sidecar['columns'][column]['chunk_rows']
+
+
+def test_shard_writer_rotates_and_indexes_byte_ranges(tmp_path):
+    with ShardWriter(tmp_path, max_episodes=3, block_kb=4) as writer:
+        for seed in range(7):
+            writer.write_episode(make_episode(seed, 'hard' if seed == 6 else 'easy'))
+
+    index = load_index(tmp_path).to_pydict()
+    assert index['episode_id'] == list(range(7))
+    assert index['shard'][:6] == ['shards/easy/shard_00000.bin'] * 3 + ['shards/easy/shard_00001.bin'] * 3
+    assert index['shard'][6] == 'shards/hard/shard_00000.bin'
+    assert index['qc_passed'] == [seed % 3 != 0 for seed in range(7)]
+
+    # Any column of any episode is one byte range away
+    row = 4
+    with open(tmp_path / index['shard'][row], 'rb') as f:
+        f.seek(index['depth_offset'][row])
+        block = f.read(index['depth_nbytes'][row])
+    num_frames = -(-40 // sidecar_rows(tmp_path, 'easy', 1, 'depth'))
+    sizes = np.frombuffer(block, dtype='<u8', count=num_frames)
+    frames = np.split(np.frombuffer(block, np.uint8, offset=8 * num_frames), np.cumsum(sizes)[:-1])
+    depth = np.frombuffer(b''.join(lz4.frame.decompress(f.tobytes()) for f in frames), dtype=np.float32)
+    np.testing.assert_array_equal(depth.reshape(40, 12, 16), make_episode(4)['depth'])
+
+    sidecar = json.loads((tmp_path / 'shards' / 'easy' / 'shard_00001.json').read_text())
+    assert sidecar['num_episodes'] == 3 and sidecar['columns']['depth']['shape'] == [12, 16]
+
+
+def test_shard_writer_appends_to_existing_index(tmp_path):
+    with ShardWriter(tmp_path, compression='none') as writer:
+        writer.write_episode(make_episode(0))
+    with ShardWriter(tmp_path, compression='none') as writer:
+        row = writer.write_episode(make_episode(1, steps=10))
+
+    index = load_index(tmp_path, columns=['episode_id', 'shard', 'num_steps']).to_pydict()
+    assert index == {'episode_id': [0, 1], 'shard': ['shards/easy/shard_00000.bin', 'shards/easy/shard_00001.bin'],
+                     'num_steps': [40, 10]}
+    raw = np.memmap(tmp_path / row['shard'], dtype=np.float64, mode='r',
+                    offset=row['odom_pos_offset'], shape=(10, 3))
+    np.testing.assert_array_equal(raw, make_episode(1, steps=10)['odom_pos'])
+
+
+def test_reader_returns_zero_copy_depth_windows(tmp_path):
+    episodes = [make_episode(seed, steps=20 + seed) for seed in range(3)]
+    with ShardWriter(tmp_path, compression='none') as writer:
+        for episode in episodes:
+            writer.write_episode(episode)
+
+    dataset = EpisodeDataset(tmp_path, window=4)
+    assert len(dataset) == sum(20 + seed - 3 for seed in range(3))
+    assert dataset.locate(17) == (1, 3)
+
+    sample = dataset[17]
+    np.testing.assert_array_equal(sample['depth'], episodes[1]['depth'][0:4])
+    np.testing.assert_array_equal(sample['action'], episodes[1]['action'][3])
+    assert not sample['depth'].flags.owndata and not sample['depth'].flags.writeable
+    assert np.shares_memory(sample['depth'], dataset.column(1, 'depth'))
+
+
+def test_lz4_frames_hold_whole_depth_windows(tmp_path):
+    # 4 KB blocks would hold 5 rows of depth; frames are never shorter than min_chunk_rows
+    with ShardWriter(tmp_path, block_kb=4, min_chunk_rows=8) as writer:
+        episode = make_episode(0)
+        writer.write_episode(episode)
+    assert sidecar_rows(tmp_path, 'easy', 0, 'depth') == 8
+
+    dataset = EpisodeDataset(tmp_path, window=4)
+    inside, straddling = dataset.sample(0, 7)['depth'], dataset.sample(0, 9)['depth']
+    np.testing.assert_array_equal(inside, episode['depth'][4:8])
+    np.testing.assert_array_equal(straddling, episode['depth'][6:10])
+    assert np.shares_memory(inside, dataset.rows(0, 'depth', 0, 8))
+    assert not np.shares_memory(straddling, dataset.rows(0, 'depth', 0, 8))
+
+
+def test_reader_batches_match_lz4_and_raw_shards(tmp_path):
+    for compression in ('lz4', 'none'):
+        with ShardWriter(tmp_path / compression, max_episodes=2, compression=compression, block_kb=2) as writer:
+            for seed in range(5):
+                writer.write_episode(make_episode(seed, 'medium'))
+
+    indices = np.random.default_rng(0).integers(0, 5 * 37, size=32)
+    lz4_batch = EpisodeDataset(tmp_path / 'lz4').sample_batch(indices)
+    raw_batch = EpisodeDataset(tmp_path / 'none').sample_batch(indices)
+    assert lz4_batch['depth'].shape == (32, 4, 12, 16)
+    for key in raw_batch:
+        np.testing.assert_array_equal(lz4_batch[key], raw_batch[key])
+
+    hard = open_dataset(tmp_path / 'lz4', filters=[('seed', '>=', 3)])
+    assert hard.num_episodes == 2 and hard[0]['episode_id'] == 3
+
+
+def test_loader_pushes_filters_down_and_matches_in_process_batches(tmp_path):
+    with ShardWriter(tmp_path, max_episodes=2, block_kb=2) as writer:
+        for seed in range(8):
+            family = 'forest' if seed % 2 else 'office'
+            writer.write_episode(make_episode(seed, ('easy', 'hard')[seed % 4 == 3], family=family))
+
+    filters = dict(difficulty='hard', scene_families=['forest', 'cave'], qc_passed=True, batch_size=16)
+    serial = EpisodeLoader(tmp_path, num_workers=0, **filters)
+    assert serial.dataset.episode_ids.tolist() == [7]       # seed 3 fails QC
+    expected = [{key: value.copy() for key, value in batch.items()} for batch in serial]
+    assert sum(len(batch['t']) for batch in expected) == len(serial.dataset) == 37
+
+    with EpisodeLoader(tmp_path, num_workers=2, prefetch=2, **filters) as loader:
+        batches = [{key: value.copy() for key, value in batch.items()} for batch in loader]
+        assert loader.stats['batches'] == len(expected)
+    for batch, reference in zip(batches, expected):
+        assert batch.keys() == reference.keys()
+        for key in batch:
+            np.testing.assert_array_equal(batch[key], reference[key])
+    np.testing.assert_array_equal(batches[0]['depth'][0, -1], make_episode(7)['depth'][batches[0]['t'][0]])
+
+
+def test_loader_rejects_shards_with_mismatched_schemas(tmp_path):
+    with ShardWriter(tmp_path, compression='none') as writer:
+        writer.write_episode(make_episode(0))
+        writer.write_episode(make_episode(1, depth=np.zeros((40, 24, 32), dtype=np.float32)))
+
+    with pytest.raises(ValueError, match='shard_00001'):
+        EpisodeLoader(tmp_path, num_workers=0)
@@ -1,5 +1,289 @@
-"""Placeholder tests for planning module."""
+"""Tests for planning module components."""
 
-def test_planning_placeholder():
-    # TODO: Replace with real tests once planner components exist
-    assert True
+import importlib
+
+import numpy as np
+
+from src.planning.mapping.depth_projection import CameraIntrinsics, project_depth_batch, voxel_downsample
+from src.planning.mapping.esdf_builder import EsdfMap, build_esdf, truncated_edt_sq
+from src.planning.mapping.voxel_block_map import VoxelBlockMap
+from src.planning.local.replanner import LocalReplanner, refine_trajectory
+
+# 'global' is a Python keyword, so the subpackage is imported by name
+bspline_optimizer = importlib.import_module('src.planning.global.bspline_optimizer')
+kinodynamic_astar = importlib.import_module('src.planning.global.kinodynamic_astar')
+trajectory_planner = importlib.import_module('src.planning.global.trajectory_planner')
+
+SMALL_CAMERA = CameraIntrinsics(width=64, height=48)
+
+
+def test_truncated_edt_matches_brute_force():
+    rng = np.random.default_rng(0)
+    mask = rng.random((12, 10, 8)) < 0.03
+    radius = 4
+
+    seeds = np.argwhere(mask)
+    grid = np.stack(np.meshgrid(*[np.arange(n) for n in mask.shape], indexing='ij'), axis=-1)
+    brute = ((grid[..., None, :] - seeds) ** 2).sum(-1).min(-1)
+    expected = np.minimum(brute, (radius + 1) ** 2)
+
+    np.testing.assert_array_equal(truncated_edt_sq(mask, radius), expected)
+
+
+def test_incremental_esdf_matches_full_rebuild():
+    esdf = EsdfMap(size_m=(12.0, 12.0, 4.0), resolution=0.2, max_ray_length_m=8.0,
+                   intrinsics=SMALL_CAMERA)
+    depth = np.full((48, 64), 4.0, dtype=np.float32)
+    depth[:, :20] = 2.5
+
+    for step in range(3):
+        yaw = 0.2 * step
+        quat = np.array([np.cos(yaw / 2), 0.0, 0.0, np.sin(yaw / 2)])
+        esdf.integrate_depth(depth, np.array([0.2 * step, 0.0, 2.0]), quat)
+
+    incremental = esdf.distance.copy()
+    esdf.rebuild()
+    np.testing.assert_array_equal(incremental, esdf.distance)
+
+
+def test_build_esdf_places_wall_in_front_of_camera():
+    depth = np.full((48, 64), 3.0, dtype=np.float32)
+    odom = {'odom_pos': np.array([0.0, 0.0, 2.0]), 'odom_quat': np.array([1.0, 0.0, 0.0, 0.0])}
+
+    esdf = build_esdf([depth], [odom], size_m=(12.0, 12.0, 4.0), resolution=0.2,
+                      intrinsics=SMALL_CAMERA)
+
+    # Camera sits 0.1 m ahead of the body, so the wall is at x = 3.1 m
+    wall, near, behind = esdf.query(np.array([[3.1, 0.0, 2.0], [1.6, 0.0, 2.0], [-1.0, 0.0, 2.0]]))
+    assert wall <= 0.0
+    assert near > 1.0
+    assert behind == esdf.truncation_m
+
+
+def test_project_depth_batch_matches_per_frame_projection():
+    rng = np.random.default_rng(1)
+    depth = rng.uniform(0.5, 8.0, size=(3, 48, 64)).astype(np.float32)
+    depth[0, :5, :5] = 50.0  # beyond max_depth_m, dropped
+    positions = rng.uniform(-1.0, 1.0, size=(3, 3))
+    quats = rng.normal(size=(3, 4))
+
+    batch, frame_index = project_depth_batch(depth, positions, quats, SMALL_CAMERA, return_frame_index=True)
+    for k in range(3):
+        single = project_depth_batch(depth[k], positions[k], quats[k], SMALL_CAMERA)
+        np.testing.assert_allclose(batch[frame_index == k], single, atol=1e-5)
+    assert batch.shape[0] == depth.size - 25
+
+
+def test_project_depth_center_pixel_lands_on_optical_axis():
+    depth = np.zeros((1, 3, 3), dtype=np.float32)
+    depth[0, 1, 1] = 2.0
+    camera = CameraIntrinsics(width=3, height=3)
+
+    # Yawed 90 degrees left: optical axis points along world +y
+    yaw = np.pi / 2
+    quat = np.array([[np.cos(yaw / 2), 0.0, 0.0, np.sin(yaw / 2)]])
+    points = project_depth_batch(depth, np.array([[1.0, 0.0, 2.0]]), quat, camera)
+
+    np.testing.assert_allclose(points, [[1.0, 2.1, 2.0]], atol=1e-5)
+
+
+def test_voxel_downsample_merges_points_into_centroids():
+    points = np.array([[0.01, 0.01, 0.01], [0.03, 0.03, 0.03], [0.55, 0.0, 0.0]], dtype=np.float32)
+    merged = voxel_downsample(points, voxel_size=0.1)
+    assert merged.shape == (2, 3)
+    np.testing.assert_allclose(sorted(merged[:, 0]), [0.02, 0.55], atol=1e-6)
+
+
+def test_voxel_block_map_roundtrip_and_default():
+    store = VoxelBlockMap(resolution=0.1, block_size=4, default=-1.0, initial_capacity=1)
+    points = np.array([[0.05, 0.05, 0.05], [-3.21, 7.5, 0.3], [12.0, -0.01, 2.0]])
+    store.set(points, np.array([1.0, 2.0, 3.0]))
+
+    np.testing.assert_array_equal(store.get(points), [1.0, 2.0, 3.0])
+    assert store.get(np.array([[40.0, 40.0, 40.0]]))[0] == -1.0
+    assert store.num_blocks == 3
+
+    store.add(np.array([[0.05, 0.05, 0.05], [0.06, 0.04, 0.01]]), 5.0, clip=(-2.0, 10.0))
+    assert store.get(points[:1])[0] == 10.0
+
+
+def test_voxel_block_map_evicts_blocks_outside_window():
+    store = VoxelBlockMap(resolution=0.1, block_size=8)
+    store.set(np.array([[0.0, 0.0, 0.0], [20.0, 0.0, 0.0], [-20.0, 5.0, 1.0]]), 1.0)
+
+    assert store.evict_outside(center=[0.0, 0.0, 0.0], half_extent_m=(5.0, 5.0, 5.0)) == 2
+    np.testing.assert_array_equal(store.get(np.array([[0.0, 0.0, 0.0], [20.0, 0.0, 0.0]])), [1.0, 0.0])
+
+    # Freed slots are reused and come back clean
+    store.set(np.array([[30.0, 0.0, 0.0]]), 2.0)
+    assert store.get(np.array([[30.35, 0.05, 0.05]]))[0] == 0.0
+
+
+def test_min_time_lower_bound_closed_form_cases():
+    bound = kinodynamic_astar.min_time_lower_bound
+    zero = np.zeros(3)
+
+    # Rest to rest over 10 m at 10 m/s²: accelerate 1 s, brake 1 s
+    t = bound(zero, zero, np.array([10.0, 0.0, 0.0]), zero, max_vel=30.0, max_acc=10.0)
+    assert np.isclose(t, 2.0)
+
+    # Velocity-limited: 100 m at max 10 m/s cruises for 9 s plus 1 s ramping
+    t = bound(zero, zero, np.array([0.0, -100.0, 0.0]), zero, max_vel=10.0, max_acc=10.0)
+    assert np.isclose(t, 11.0)
+
+    # Moving away from the goal has to brake and come back
+    t = bound(zero, np.array([10.0, 0.0, 0.0]), np.array([-5.0, 0.0, 0.0]), zero, max_vel=30.0, max_acc=10.0)
+    assert t > 2.0
+
+
+def test_motion_primitives_are_cached_per_config():
+    config = kinodynamic_astar.KinodynamicConfig()
+    assert kinodynamic_astar.motion_primitives(config) is kinodynamic_astar.motion_primitives(
+        kinodynamic_astar.KinodynamicConfig())
+    prims = kinodynamic_astar.motion_primitives(config)
+    assert np.all(np.linalg.norm(prims.accelerations, axis=1) <= config.max_acc + 1e-9)
+
+
+def _wall_map() -> EsdfMap:
+    esdf = EsdfMap(size_m=(20.0, 20.0, 4.0), resolution=0.2)
+    wall = esdf.world_to_index(np.array([[0.0, -4.0, 0.0], [0.4, 4.0, 4.0]]))
+    esdf.occupied[wall[0, 0]:wall[1, 0], wall[0, 1]:wall[1, 1], :] = True
+    esdf.rebuild()
+    return esdf
+
+
+def test_plan_trajectory_avoids_wall_within_limits():
+    esdf = _wall_map()
+
+    result = trajectory_planner.plan_trajectory({'position': [-6.0, 0.0, 2.0]}, np.array([6.0, 0.0, 2.0]), esdf)
+
+    assert result.success
+    assert result.nodes_expanded > 0
+    _, positions, velocities = result.path.sample(0.02)
+    np.testing.assert_allclose(positions[-1], [6.0, 0.0, 2.0], atol=1e-6)
+    assert esdf.query(positions).min() >= 0.4 - 0.2
+    assert np.linalg.norm(velocities, axis=1).max() <= 30.0 + 1e-6
+
+    times, positions, _ = result.trajectory.sample(0.02)
+    np.testing.assert_allclose(positions[[0, -1]], [[-6.0, 0.0, 2.0], [6.0, 0.0, 2.0]], atol=1e-3)
+    assert esdf.query(positions).min() >= 0.4 - 0.2
+    assert np.abs(result.trajectory.evaluate(times, derivative=2)).max() <= 10.0 * 1.1
+
+
+def test_bspline_cost_gradient_matches_finite_differences():
+    esdf = _wall_map()
+    rng = np.random.default_rng(3)
+    control_points = np.linspace([-1.5, -0.5, 1.8], [1.5, 0.5, 2.2], 12) + rng.normal(0.0, 0.1, (12, 3))
+    config = bspline_optimizer.BsplineOptimizerConfig(safety_distance_m=1.0, max_vel=2.0, max_acc=1.0)
+    optimizer = bspline_optimizer.BsplineOptimizer(config, esdf)
+
+    _, grad = optimizer.cost_and_gradient(control_points, dt=0.3)
+    numeric = np.zeros_like(control_points)
+    eps = 1e-6
+    for i in range(control_points.shape[0]):
+        for j in range(3):
+            step = np.zeros_like(control_points)
+            step[i, j] = eps
+            plus, _ = optimizer.cost_and_gradient(control_points + step, dt=0.3)
+            minus, _ = optimizer.cost_and_gradient(control_points - step, dt=0.3)
+            numeric[i, j] = (plus - minus) / (2 * eps)
+
+    np.testing.assert_allclose(grad, numeric, atol=1e-4 * np.abs(numeric).max())
+
+
+def test_speed_limit_applies_to_the_velocity_norm():
+    # 25 m/s per axis along the diagonal: within a per-axis 30 m/s limit, 43 m/s in norm
+    spline = bspline_optimizer.UniformBspline(np.linspace([0.0, 0.0, 0.0], [50.0, 50.0, 50.0], 11), 0.2)
+    config = bspline_optimizer.BsplineOptimizerConfig(smoothness_weight=0.0)
+    cost, grad = bspline_optimizer.BsplineOptimizer(config).cost_and_gradient(spline.control_points, spline.dt)
+    assert cost > 0 and np.abs(grad).max() > 0
+
+    assert not LocalReplanner()._feasible(spline, None, 0.0, spline.total_time)
+
+
+def test_bspline_fit_and_warm_start_keep_boundary_states():
+    path = kinodynamic_astar.KinodynamicPath()
+    path.append_constant_acc(np.zeros(3), np.array([1.0, 0.0, 0.0]), np.array([0.5, 0.2, 0.0]), 4.0)
+    spline = bspline_optimizer.UniformBspline.from_trajectory(path, control_point_spacing_m=0.5)
+
+    ends = np.array([0.0, path.total_time])
+    np.testing.assert_allclose(spline.evaluate(ends), path.evaluate(ends), atol=1e-6)
+    np.testing.assert_allclose(spline.evaluate(ends, derivative=1), path.evaluate(ends, derivative=1), atol=1e-6)
+
+    optimizer = bspline_optimizer.BsplineOptimizer()
+    cold = optimizer.optimize(spline)
+    warm = optimizer.optimize(spline, warm_start=cold.bspline.control_points)
+    assert warm.iterations <= cold.iterations
+    assert warm.cost <= cold.cost + 1e-9
+    np.testing.assert_array_equal(warm.bspline.control_points[:3], spline.control_points[:3])
+
+
+def test_replanner_reoptimizes_only_the_window_near_a_map_change():
+    esdf = EsdfMap(size_m=(20.0, 20.0, 4.0), resolution=0.2)
+    esdf.rebuild()
+    plan = trajectory_planner.plan_trajectory({'position': [-6.0, 0.0, 2.0]}, np.array([6.0, 0.0, 2.0]), esdf)
+    replanner = LocalReplanner(esdf)
+    assert replanner.refine(plan.trajectory, {'t': 0.0}).status == 'reused'
+
+    # A pillar appears next to the path, ahead of the drone
+    pillar = esdf.world_to_index(np.array([[2.05, 0.15, 0.05], [3.05, 1.15, 4.0]]))
+    esdf.occupied[pillar[0, 0]:pillar[1, 0], pillar[0, 1]:pillar[1, 1], :] = True
+    esdf.rebuild()
+    result = replanner.refine(plan.trajectory, {'t': 0.3})
+
+    assert result.status == 'optimized' and result.feasible
+    _, positions, _ = result.trajectory.sample(0.02)
+    assert esdf.query(positions).min() >= replanner.config.collision_distance_m
+    moved = np.flatnonzero(np.any(result.trajectory.control_points != plan.trajectory.control_points, axis=1))
+    first, last = result.window
+    assert moved.min() >= first and moved.max() <= last
+    assert set(result.timings) == {'detect', 'optimize', 'validate', 'splice', 'total'}
+    assert replanner.refine(result.trajectory, {'t': 0.4}).status == 'reused'
+
+
+def test_replanner_retries_a_change_left_unresolved_by_a_missed_deadline():
+    esdf = EsdfMap(size_m=(20.0, 20.0, 4.0), resolution=0.2)
+    esdf.rebuild()
+    plan = trajectory_planner.plan_trajectory({'position': [-6.0, 0.0, 2.0]}, np.array([6.0, 0.0, 2.0]), esdf)
+    replanner = LocalReplanner(esdf)
+    replanner.refine(plan.trajectory, {'t': 0.0})
+
+    pillar = esdf.world_to_index(np.array([[2.05, 0.15, 0.05], [3.05, 1.15, 4.0]]))
+    esdf.occupied[pillar[0, 0]:pillar[1, 0], pillar[0, 1]:pillar[1, 1], :] = True
+    esdf.rebuild()
+    missed = replanner.refine(plan.trajectory, {'t': 0.3}, budget_s=1e-9)
+    assert missed.deadline_missed and missed.trajectory is plan.trajectory
+
+    assert replanner.refine(plan.trajectory, {'t': 0.3}).status == 'optimized'
+
+
+def test_replanner_keeps_feasible_trajectory_when_change_is_past_the_window():
+    esdf = EsdfMap(size_m=(20.0, 20.0, 4.0), resolution=0.2)
+    esdf.rebuild()
+    trajectory = bspline_optimizer.UniformBspline(np.linspace([-6.0, 0.0, 2.0], [6.0, 0.0, 2.0], 20), 0.2)
+    replanner = LocalReplanner(esdf)
+    assert replanner.refine(trajectory, {'t': 2.8}).status == 'reused'
+
+    # A wall appears just beyond the goal: only the last control points see
+    # it, and they are all within the fixed end of the trajectory
+    wall = esdf.world_to_index(np.array([[6.65, -4.0, 0.0], [7.05, 4.0, 4.0]]))
+    esdf.occupied[wall[0, 0]:wall[1, 0], wall[0, 1]:wall[1, 1], :] = True
+    esdf.rebuild()
+    result = replanner.refine(trajectory, {'t': 2.8})
+
+    assert result.status == 'fallback' and result.feasible
+    assert result.trajectory is trajectory
+
+
+def test_refine_trajectory_reports_deadline_misses():
+    esdf = _wall_map()
+    plan = trajectory_planner.plan_trajectory({'position': [-6.0, 0.0, 2.0]}, np.array([6.0, 0.0, 2.0]), esdf)
+    replanner = LocalReplanner(esdf)
+
+    # Fresh replanner: control points closer than the safety distance are refined
+    result = refine_trajectory(plan, {'position': [-6.0, 0.0, 2.0], 'budget_s': 1e-9}, replanner)
+
+    assert result.deadline_missed
+    assert result.trajectory is plan.trajectory
+    assert replanner.stats['calls'] == 1 and replanner.stats['deadline_misses'] == 1
+    assert 'total' in replanner.timing_summary()
@@ -0,0 +1,423 @@
+"""Tests for the headless CPU simulation backend and the sensor logger."""
+
+import functools
+import threading
+import time
+
+import numpy as np
+import pytest
+import yaml
+
+from src.control.geometric_controller import GRAVITY, GeometricController
+from src.sim.cpu_backend import CpuQuadrotorEnvironment, CpuSimConfig
+from src.sim.data_logger import SensorDataLogger, read_sensor_log
+from src.sim.episode_runner import EpisodeConfig, EpisodeJob, EpisodeResult, EpisodeScheduler, expand_jobs, run_episode
+from src.sim.imu_decimation import ImuDecimator
+from src.analysis.trajectory_metrics import evaluate_metrics
+from src.sim.scene_cache import SceneCache, load_scene_configs
+from src.sim.scene_esdf import load_scene_esdf, rasterize_scene, scene_esdf
+from src.sim.sensor_noise import DepthNoise, SensorNoise
+from src.sim.sensor_sync import SensorSynchronizer
+from src.sim.sensor_validation import SensorValidator
+from src.sim.vector_env import VectorEnv
+from src.sim.scene_generator import generate_scenes, is_free, scene_from_json, scene_to_json
+
+CALM = CpuSimConfig(wind_speed_range=(0.0, 0.0), wind_gust_std=0.0, mass_scale=0.0, inertia_scale=0.0)
+
+
+def test_hover_thrust_holds_position_without_wind():
+    env = CpuQuadrotorEnvironment(num_envs=4, config=CALM)
+    start = env.reset(seed=0)
+
+    for _ in range(100):
+        obs = env.step()
+
+    np.testing.assert_allclose(obs['odom_pos'], start['odom_pos'], atol=1e-9)
+    np.testing.assert_allclose(obs['imu_accel'], np.tile([0.0, 0.0, GRAVITY], (4, 1)), atol=1e-9)
+    assert obs['timestamp'] == 100 * env.config.physics_dt
+    assert set(obs) >= {'timestamp', 'imu_accel', 'imu_gyro', 'odom_pos', 'odom_vel', 'odom_quat'}
+
+
+def test_motor_lag_is_first_order():
+    env = CpuQuadrotorEnvironment(num_envs=1, config=CALM)
+    env.reset(seed=0)
+    hover = env.mass[0] * GRAVITY
+
+    # After two time constants the thrust step is 1 - e^-2 of the way there
+    for _ in range(4):
+        env.step(np.array([[hover + 1.0, 0.0, 0.0, 0.0]]))
+    assert np.isclose(env.wrench[0, 0] - hover, 1.0 - np.exp(-2.0))
+
+
+def test_partial_reset_only_touches_selected_envs():
+    env = CpuQuadrotorEnvironment(num_envs=3)
+    env.reset(seed=1)
+    for _ in range(10):
+        env.step()
+    before = env.position.copy()
+
+    env.reset(env_ids=[1])
+    np.testing.assert_array_equal(env.position[[0, 2]], before[[0, 2]])
+    assert np.all(env.velocity[1] == 0.0)
+
+
+def test_closed_loop_tracks_setpoint_in_wind():
+    env = CpuQuadrotorEnvironment(num_envs=32)
+    controller = GeometricController.randomized(32, np.random.default_rng(0))
+    obs = env.reset(seed=0)
+    reference = {'position': obs['odom_pos'] + np.array([2.0, -1.0, 0.5])}
+
+    for i in range(400):
+        if i % 2 == 0:
+            command = controller.compute(obs, reference)
+        obs = env.step(command)
+
+    assert not obs['collided'].any()
+    assert np.linalg.norm(obs['odom_pos'] - reference['position'], axis=1).max() < 0.5
+
+
+def _sensor_obs(step, dt=0.01):
+    return {'timestamp': step * dt,
+            'depth': np.full((4, 6), step, dtype=np.float32),
+            'imu_accel': np.array([0.0, 0.0, 9.81]), 'imu_gyro': np.zeros(3),
+            'odom_pos': np.full((1, 3), float(step)), 'odom_vel': np.zeros(3),
+            'odom_quat': np.array([1.0, 0.0, 0.0, 0.0])}
+
+
+def test_sensor_logger_round_trip_at_log_rate(tmp_path):
+    logger = SensorDataLogger(tmp_path, buffer_size_mb=1.0, depth_shape=(4, 6), session='run')
+    for step in range(200):                     # 2 s at 100 Hz, logged at 20 Hz
+        logger.log(_sensor_obs(step))
+    logger.close()
+
+    depth = read_sensor_log(tmp_path / 'depth' / 'run.bin')
+    odom = read_sensor_log(tmp_path / 'odom' / 'run.bin')
+    np.testing.assert_allclose(depth['timestamp'], np.arange(40) * 0.05)
+    np.testing.assert_array_equal(depth['depth'][:, 0, 0], np.arange(0, 200, 5))
+    np.testing.assert_array_equal(odom['odom_pos'][:, 0], np.arange(0, 200, 5))
+
+    stats = logger.stats()
+    assert stats['frames_logged'] == {'depth': 40, 'imu': 40, 'odom': 40}
+    assert stats['dropped_frames'] == {'depth': 0, 'imu': 0, 'odom': 0}
+    assert stats['chunks_written'] == 3 and 0 < stats['bytes_written'] < stats['raw_bytes']
+
+
+def test_sensor_logger_drops_instead_of_blocking(tmp_path):
+    logger = SensorDataLogger(tmp_path, buffer_size_mb=0.001, depth_shape=(4, 6), session='run')
+    release = threading.Event()
+    write_chunk = logger._write_chunk
+    logger._write_chunk = lambda *args: (release.wait(), write_chunk(*args))
+
+    for step in range(0, 1000, 5):              # writer stalled: rings fill up
+        logger.log(_sensor_obs(step))
+    dropped = logger.stats()['dropped_frames']
+    assert dropped['depth'] > 0
+    assert logger.frames_logged['depth'] + dropped['depth'] == 200
+
+    release.set()
+    logger.close()
+    assert len(read_sensor_log(tmp_path / 'depth' / 'run.bin')['timestamp']) == logger.frames_logged['depth']
+
+
+def test_scene_cache_keys_on_config_and_evicts_lru(tmp_path):
+    office = {'dimensions': {'ceiling_height': [2.5, 4.0]}}
+    cache = SceneCache(tmp_path, budget_mb=2.5 / 1024)          # 2.5 kB
+
+    def write(path):
+        path.write_bytes(b'#usda 1.0\n' + b' ' * 1014)
+
+    assert cache.lookup('office', 1, office) is None
+    first = cache.store('office', 1, office, write)
+    cache.store('office', 2, office, write)
+    assert cache.lookup('office', 1, office) == first            # now most recent
+    assert cache.lookup('office', 1, {'dimensions': {'ceiling_height': [3.0, 4.0]}}) is None
+
+    cache.store('office', 3, office, write)                     # over budget: seed 2 goes
+    assert cache.stats['evictions'] == 1
+    reopened = SceneCache(tmp_path, budget_mb=2.5 / 1024)
+    assert reopened.lookup('office', 2, office) is None
+    assert reopened.lookup('office', 1, office) == first
+    assert reopened.lookup('office', 3, office) is not None
+
+
+def test_load_scene_configs_rejects_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_scene_configs(tmp_path / 'scenes_config.yaml')
+
+
+def test_scene_generator_is_deterministic_and_respects_config():
+    families = load_scene_configs('config/env/scenes_config.yaml')['scene_families']
+    tasks = [(name, seed, families[name]) for name in ('warehouse', 'maze', 'forest') for seed in (42, 43)]
+    serial = list(generate_scenes(tasks, workers=1))
+    pooled = list(generate_scenes(tasks, workers=2))
+    assert [s['description_hash'] for s in serial] == [s['description_hash'] for s in pooled]
+    assert serial[0]['description_hash'] != serial[1]['description_hash']
+
+    forest = serial[4]
+    trees = forest['primitives']['kind'].count('tree')
+    low, high = next(a['count_range'] for a in families['forest']['assets'] if a['type'] == 'tree')
+    assert low <= trees <= high
+    lo, hi = np.array(families['forest']['dimensions']['size_range'])
+    assert np.all(forest['size'] >= lo) and np.all(forest['size'] <= hi)
+
+    for scene in serial:
+        assert scene['navigable']
+        assert is_free(scene['primitives'], np.stack([scene['start'], scene['goal']])).all()
+        restored = scene_from_json(scene_to_json(scene))
+        assert np.array_equal(restored['primitives']['center'], scene['primitives']['center'])
+
+
+def test_scene_esdf_rasterizes_and_memory_maps_from_cache(tmp_path):
+    scene = {
+        'size': np.array([10.0, 10.0, 4.0]),
+        'primitives': {'kind': ['wall', 'pole'], 'shape': ['box', 'cylinder'],
+                       'center': np.array([[2.0, 0.0, 2.0], [-2.0, 0.0, 1.0]]),
+                       'size': np.array([[0.05, 6.0, 4.0], [0.6, 0.6, 2.0]]), 'yaw': np.zeros(2)},
+        'description_hash': 'test',
+    }
+    occupied, origin = rasterize_scene(scene, resolution=0.2)
+    assert occupied.shape == (52, 52, 22) and np.allclose(origin, [-5.2, -5.2, -0.2])
+    assert occupied[:, :, 0].all() and not occupied[:, :, 1:].all()
+    assert occupied[36, 26, 10]                                   # 5 cm partition kept
+
+    reference = scene_esdf(scene, resolution=0.2, truncation_m=2.0)
+    cache = SceneCache(tmp_path / 'esdf', extension='.npy')
+    built = load_scene_esdf(cache, 'test', 0, {}, scene=scene)
+    mapped = load_scene_esdf(cache, 'test', 0, {}, scene=scene)
+    assert cache.stats['stores'] == 1 and cache.stats['hits'] == 1
+    assert isinstance(mapped.distance, np.memmap) and mapped.distance.dtype == np.int16
+    np.testing.assert_array_equal(mapped.occupied, reference.occupied)
+
+    points = np.array([[1.0, 0.0, 2.0], [0.0, 4.5, 3.0], [-2.0, 1.0, 1.0]])
+    np.testing.assert_allclose(mapped.interpolate(points), reference.interpolate(points), atol=1e-4)
+    assert abs(mapped.query(points[:1])[0] - 1.0) <= 0.2 + 1e-4          # within a voxel of the wall
+    assert abs(built.query(points[1:2])[0] - 2.0) < 1e-4                # truncated
+
+    clearance = evaluate_metrics({'odom_pos': points}, esdf=mapped)['per_step']['clearance']
+    np.testing.assert_allclose(clearance, reference.interpolate(points), atol=1e-4)
+
+
+def test_sensor_noise_matches_config_and_keeps_bias_state():
+    with open('config/env/sensors.yaml', 'r') as f:
+        sensor_config = yaml.safe_load(f)
+    n, dt = 4000, 0.01
+    noise = SensorNoise.from_config(sensor_config, num_envs=n, seed=0)
+    zeros = np.zeros((n, 3))
+
+    accel = np.stack([noise.apply({'imu_accel': zeros, 'imu_gyro': zeros}, dt)['imu_accel'] for _ in range(50)])
+    bias = noise.imu.bias[0].copy()
+    white = accel - accel.mean(axis=0)
+    assert abs(white.std() / (0.002 / np.sqrt(dt)) - 1) < 0.05
+    assert abs(accel.mean(axis=0).std() / 0.01 - 1) < 0.1          # turn-on bias persists across steps
+    noise.reset(env_ids=[0, 1])
+    assert np.all(noise.imu.bias[0, 2:] == bias[2:]) and np.all(noise.imu.bias[0, :2] != bias[:2])
+
+    quat = np.tile([1.0, 0.0, 0.0, 0.0], (n, 1))
+    odom = noise.apply({'odom_pos': zeros, 'odom_vel': zeros, 'odom_quat': quat, 'collided': np.zeros(n)}, dt)
+    assert abs(odom['odom_pos'].std() / 0.01 - 1) < 0.05 and abs(odom['odom_vel'].std() / 0.05 - 1) < 0.05
+    np.testing.assert_allclose(np.linalg.norm(odom['odom_quat'], axis=1), 1.0)
+    assert abs(2 * odom['odom_quat'][:, 1:].std() / 0.005 - 1) < 0.05
+
+    depth = np.full((480, 640), 5.0, dtype=np.float32)
+    depth[:, 600:] = np.inf                                     # no return: never perturbed
+    single = SensorNoise.from_config(sensor_config, seed=1)
+    noisy = single.apply({'depth': depth}, dt)['depth']
+    missing = np.isnan(noisy)
+    assert noisy.shape == depth.shape and abs(missing.mean() - 0.02) < 0.003
+    assert abs(noisy[:, 10:590][~missing[:, 10:590]].std() - 0.01) < 0.001
+    assert np.all(np.isinf(noisy[:, 602:]) | missing[:, 602:])
+    assert not np.array_equal(missing, np.isnan(single.apply({'depth': depth}, dt)['depth']))
+
+
+def test_depth_dropouts_are_independent_across_frames():
+    noise = DepthNoise({'missing_data_probability': 0.3}, shape=(32, 32), rng=np.random.default_rng(0))
+    depth = np.full((32, 32), 5.0, dtype=np.float32)
+    masks = [np.isnan(noise.apply(depth)).reshape(-1) for _ in range(10)]
+
+    # No frame's mask may be a raster-shifted copy of another's over half a frame or more
+    size = masks[0].size
+    for i, a in enumerate(masks):
+        for b in masks[i + 1:]:
+            for shift in range(-size // 2, size // 2 + 1):
+                x, y = (a[shift:], b[:size - shift]) if shift >= 0 else (a[:shift], b[-shift:])
+                assert not np.array_equal(x, y)
+    assert abs(np.mean(masks) - 0.3) < 0.02
+
+
+def test_depth_noise_keeps_torch_tensors_on_their_device():
+    torch = pytest.importorskip('torch')
+    noise = DepthNoise({'depth_noise_std_m': 0.01, 'lateral_noise_std_px': 0.5, 'missing_data_probability': 0.02},
+                       shape=(48, 64), rng=np.random.default_rng(0))
+    depth = torch.full((4, 48, 64), 5.0)
+
+    noisy = noise.apply(depth)
+    assert isinstance(noisy, torch.Tensor) and noisy.device == depth.device and noisy.shape == depth.shape
+    missing = torch.isnan(noisy)
+    assert abs(missing.float().mean().item() - 0.02) < 0.01
+    assert abs(noisy[~missing].std().item() - 0.01) < 0.002
+    assert not torch.equal(missing, torch.isnan(noise.apply(depth)))
+
+
+def test_imu_decimator_preintegrates_windows_and_resets_per_env():
+    decimator = ImuDecimator(100.0, 20.0, num_envs=2)
+    accel = np.array([[1.0, 0.0, 0.0], [0.0, 0.0, 9.81]])
+    gyro = np.array([[0.0, 0.0, 2.0], [0.3, 0.0, 0.0]])
+    emitted = [decimator.push(accel, gyro, 0.01 * k) for k in range(10)]
+    assert emitted == [False] * 4 + [True] + [False] * 4 + [True]
+    assert decimator.timestamp == 0.09
+
+    np.testing.assert_allclose(decimator.imu_delta_angle, gyro * 0.05, atol=1e-12)
+    np.testing.assert_allclose(decimator.imu_gyro, gyro, atol=1e-10)
+    # Constant body-frame force while yawing: delta-v rotates with the body (sculling)
+    angles = 2.0 * 0.01 * np.arange(5)
+    expected = 0.01 * np.array([np.cos(angles).sum(), np.sin(angles).sum(), 0.0])
+    np.testing.assert_allclose(decimator.imu_delta_v[0], expected, atol=1e-12)
+    angles = 0.3 * 0.01 * np.arange(5)
+    expected = 0.01 * 9.81 * np.array([0.0, -np.sin(angles).sum(), np.cos(angles).sum()])
+    np.testing.assert_allclose(decimator.imu_delta_v[1], expected, atol=1e-12)
+
+    # Env 1 reset mid-window: only its post-reset samples are averaged
+    for k in range(3):
+        decimator.push(accel, gyro, 0.1 + 0.01 * k)
+    decimator.reset(env_ids=[1])
+    decimator.push(accel, 2 * gyro, 0.13)
+    obs = decimator.apply({'imu_accel': accel, 'imu_gyro': 2 * gyro, 'timestamp': 0.14})
+    assert obs['imu_fresh'] and obs['imu_timestamp'] == 0.14
+    np.testing.assert_allclose(obs['imu_delta_angle'][1], 2 * gyro[1] * 0.02, atol=1e-12)
+    np.testing.assert_allclose(obs['imu_gyro'][0], gyro[0] * 1.4, atol=1e-10)
+
+
+def test_sensor_synchronizer_aligns_depth_with_imu_and_odometry():
+    sync = SensorSynchronizer.from_config({'synchronization': {'max_time_diff_s': 0.01}},
+                                          rates_hz={'depth': 20.0})
+    frames = []
+    for k in range(40):
+        t = 0.01 * k
+        obs = {'timestamp': t, 'depth': np.full((4, 4), float(k), dtype=np.float32),
+               'depth_timestamp': 0.05 * (k // 5) + 0.003,          # 20 Hz camera, read every step
+               'imu_accel': np.array([k, 0.0, 0.0]), 'imu_gyro': np.zeros(3), 'imu_fresh': k % 5 == 0}
+        if not 20 <= k < 28:                                        # odometry outage
+            obs.update(odom_pos=np.array([t, 0.0, 0.0]), odom_vel=np.zeros(3),
+                       odom_quat=np.array([1.0, 0.0, 0.0, 0.0]))
+        frames += sync.push_obs(obs)
+    assert len(frames) == 5                                         # last anchor still waits for the IMU
+    frames += sync.pop_frames(force=True)
+
+    assert [round(f['timestamp'], 3) for f in frames] == [0.003, 0.053, 0.103, 0.153, 0.303, 0.353]
+    assert sync.rejected == {'depth': 0, 'imu': 0, 'odom': 2}
+    first = frames[0]
+    assert first['depth'][0, 0] == 0 and first['imu_accel'][0] == 0
+    np.testing.assert_allclose(first['odom_pos'], [0.003, 0.0, 0.0])  # interpolated between 100 Hz poses
+    assert abs(first['sync_skew_s'] - 0.003) < 1e-9                 # nearest IMU sample 3 ms early
+    assert frames[1]['depth'][0, 0] == 5 and frames[1]['imu_accel'][0] == 5
+
+
+def test_vector_env_auto_resets_and_matches_across_worker_layouts():
+    env_fn = functools.partial(CpuQuadrotorEnvironment, config=CpuSimConfig(wind_gust_std=0.0))
+    runs = []
+    for workers in (0, 2):
+        with VectorEnv(5, env_fn=env_fn, num_workers=workers, max_episode_steps=4) as env:
+            first = env.reset(seeds=100)['odom_pos']
+            for _ in range(6):
+                obs = env.step(np.tile([9.81, 0.0, 0.0, 0.0], (5, 1)))
+                if obs['done'].any():
+                    terminal = obs
+            runs.append((first, obs['odom_pos'], env.stats()))
+
+    assert np.array_equal(terminal['terminal_ids'], np.arange(5)) and terminal['terminal']['odom_pos'].shape == (5, 3)
+    np.testing.assert_array_equal(obs['seed'], np.arange(105, 110))
+    np.testing.assert_array_equal(obs['episode_step'], 2)
+    np.testing.assert_allclose(runs[0][0], runs[1][0])
+    np.testing.assert_allclose(runs[0][1], runs[1][1])
+    assert runs[1][2]['episodes_completed'] == 5 and runs[1][2]['env_steps'] == 30
+    assert runs[1][2]['steps_per_s'] > 0
+
+
+
+def _fake_episode(job, hang_seed):
+    if job.seed == hang_seed:
+        time.sleep(60)
+    if job.seed < 0:
+        raise RuntimeError("bad seed")
+    return EpisodeResult(job, 'ok', metrics={'seed': job.seed})
+
+
+def test_episode_scheduler_times_out_and_resumes_from_checkpoint(tmp_path):
+    families = {'office': {'difficulty': 'easy'}, 'forest': {'difficulty': 'hard'}}
+    jobs = expand_jobs(families, seeds=[-1, 1, 2, 3], difficulties=['easy'])
+    assert [job.job_id for job in jobs] == ['office_seed-1', 'office_seed1', 'office_seed2', 'office_seed3']
+
+    checkpoint = tmp_path / 'checkpoint.jsonl'
+    scheduler = EpisodeScheduler(_fake_episode, (2,), workers=2, timeout_s=1.0, checkpoint_path=checkpoint)
+    results = {r.job.seed: r for r in scheduler.run(jobs)}
+    assert {seed: r.status for seed, r in results.items()} == {-1: 'error', 1: 'ok', 2: 'timeout', 3: 'ok'}
+    assert 'bad seed' in results[-1].error and scheduler.stats['timeouts'] == 1
+
+    scheduler.commit(results.values())                          # failures are not committed
+    resumed = EpisodeScheduler(_fake_episode, (None,), workers=2, checkpoint_path=checkpoint)
+    assert sorted(r.job.seed for r in resumed.run(jobs)) == [-1, 2]
+    assert resumed.stats['skipped'] == 2
+
+
+def test_episode_scheduler_retries_failed_jobs_on_resume(tmp_path):
+    jobs = expand_jobs({'office': {'difficulty': 'easy'}}, seeds=[-1, 1])
+    checkpoint = tmp_path / 'checkpoint.jsonl'
+
+    for _ in range(2):
+        scheduler = EpisodeScheduler(_fake_episode, (None,), workers=1, checkpoint_path=checkpoint)
+        results = list(scheduler.run(jobs))
+        scheduler.commit(results)
+    assert [(r.job.seed, r.status) for r in results] == [(-1, 'error')]
+    assert scheduler.completed_ids() == {'office_seed1'}
+
+
+def test_run_episode_plans_and_tracks_an_office_scene():
+    families = load_scene_configs('config/env/scenes_config.yaml')['scene_families']
+    result = run_episode(EpisodeJob('office', 43, 'easy'), EpisodeConfig(scene_families=families))
+
+    assert result.status == 'ok'
+    episode, metrics = result.episode, result.metrics
+    assert episode['odom_pos'].shape == (len(episode['timestamp']), 3) and episode['action'].shape[1] == 4
+    np.testing.assert_allclose(np.diff(episode['timestamp']), 0.05, atol=1e-9)   # 20 Hz recording
+    assert episode['qc']['collision_free'] and episode['qc']['reached_goal']
+    assert metrics['job_id'] == 'office_seed43' and metrics['goal_error_m'] < 1.0
+
+
+def test_sensor_validator_flags_bad_frames_and_logger_skips_them(tmp_path):
+    sensor_config = yaml.safe_load(open('config/env/sensors.yaml'))
+    validator = SensorValidator.from_config(sensor_config)
+    env = CpuQuadrotorEnvironment(num_envs=3, config=CALM, sensor_validator=validator)
+    obs = env.reset(seed=0)
+    assert obs['odom_valid'].all() and obs['imu_valid'].all() and obs['sensors_valid'].shape == (3,)
+
+    env.position[1] += 2.0                                         # teleport: 2 m jump in one step
+    env.angular_velocity[2] = [50.0, 0.0, 0.0]                     # above 2500 deg/s
+    obs = env.step()
+    np.testing.assert_array_equal(obs['odom_valid'], [True, False, True])
+    np.testing.assert_array_equal(obs['imu_valid'], [True, True, False])
+    env.position[0] += 2.0
+    env.reset(env_ids=np.array([0]))                               # a reset is not a jump
+    assert env.step()['odom_valid'][0]
+
+    depth = np.full((3, 10, 10), 5.0, dtype=np.float32)
+    depth[0, :3] = np.nan                                          # 30% invalid
+    depth[1, :1] = 50.0                                            # 10% beyond max range
+    flags = validator.apply({'depth': depth})
+    np.testing.assert_allclose(flags['depth_invalid_frac'], [0.3, 0.1, 0.0])
+    np.testing.assert_array_equal(flags['depth_valid'], [False, True, True])
+
+    logger = SensorDataLogger(tmp_path, buffer_size_mb=1.0, depth_shape=(4, 6), session='run')
+    sync = SensorSynchronizer(rates_hz={})
+    validator.reset()
+    for step in range(0, 40, 5):
+        obs = _sensor_obs(step)
+        obs['depth'] = obs['depth'] * 0.1 + 1.0                   # 1-4.5 m
+        obs['odom_pos'] *= 0.01                                    # 5 cm per logged step
+        if step == 10:
+            obs['depth'][:] = 0.0                                  # blank frame
+        obs = validator.apply(obs)
+        logger.log(obs)
+        sync.push_obs(obs)
+    logger.close()
+    assert logger.stats()['invalid_frames']['depth'] == 1 and logger.frames_logged['depth'] == 7
+    assert sync.stats()['invalid'] == {'depth': 1, 'imu': 0, 'odom': 0}
@@ -0,0 +1,88 @@
+"""Tests for tools helpers."""
+
+import json
+
+import numpy as np
+
+from tools.logging_utils import MetricsStore
+from tools.profiling import StageProfiler, configure_profiler, get_profiler, profiled
+
+
+def test_profiler_percentiles_and_dump(tmp_path):
+    profiler = StageProfiler(name='unit', output_dir=tmp_path, dump_interval_s=0)
+    for ms in np.arange(1, 101):
+        profiler.record('stage', ms * 1e-3)
+    with profiler.stage('block'):
+        with profiler.stage('block'):                       # nesting the same stage is fine
+            pass
+    try:
+        with profiler.stage('failing'):
+            raise ValueError
+    except ValueError:
+        pass
+
+    summary = profiler.summary()
+    assert summary['stage']['count'] == 100 and summary['block']['count'] == 2
+    for q in (50, 95, 99):                                  # log bins: ~12% resolution
+        assert abs(summary['stage'][f'p{q}_ms'] / q - 1) < 0.13
+    assert summary['stage']['max_ms'] == 100.0 and summary['failing']['errors'] == 1
+
+    path = profiler.dump()
+    report = json.loads(path.read_text())
+    assert report['stages']['stage']['count'] == 100 and sum(report['bins']['stage'].values()) == 100
+    assert profiler.maybe_dump() is None                    # periodic dumps disabled
+
+
+def test_disabled_profiler_is_a_no_op_and_decorator_follows_process_profiler():
+    previous = get_profiler()
+    try:
+        @profiled('work')
+        def work(x):
+            return x + 1
+
+        disabled = configure_profiler(enabled=False)
+        with disabled.stage('anything'):
+            assert work(1) == 2
+        assert disabled.summary() == {} and disabled.dump() is None
+
+        enabled = configure_profiler(enabled=True)
+        assert work(2) == 3 and work(3) == 4
+        assert enabled.summary()['work']['count'] == 2
+    finally:
+        configure_profiler(previous)
+
+
+def test_metrics_store_partitions_rows_and_aggregates_per_family(tmp_path):
+    store = MetricsStore(tmp_path, run_id='run1', flush_rows=4)
+    store.append([{'scene_family': 'forest', 'status': 'ok', 'qc_collision_free': True, 'jerk_cost': 1.0},
+                  {'scene_family': 'forest', 'status': 'ok', 'qc_collision_free': False, 'jerk_cost': 2.0},
+                  {'scene_family': 'office', 'status': 'plan_failed'}])
+    assert not (tmp_path / 'episodes').exists()                    # still buffered
+    store.append({'scene_family': 'office', 'status': 'ok', 'qc_collision_free': True, 'jerk_cost': np.float64(3.0)})
+    assert store.rows_written == 4                                  # flush_rows reached
+
+    store.append({'jerk': np.arange(101.0), 'clearance': np.linspace(0, 1, 101)}, table='timesteps', scene_family='forest')
+    store.append({'jerk': np.full(10, 5.0), 'clearance': np.full(10, 2.0)}, table='timesteps', scene_family='office')
+    store.close()
+    assert (tmp_path / 'timesteps' / 'run=run1' / 'scene_family=forest').is_dir()
+
+    assert store.failure_rate() == {'forest': 0.5, 'office': 0.5}
+    assert store.percentile('jerk', 95) == {'forest': 95.0, 'office': 5.0}
+    edges, counts = store.histogram('clearance', bins=[0.0, 0.5, 1.0])
+    assert counts['forest'].tolist() == [50, 51] and counts['office'].tolist() == [0, 10]   # clipped into the last bin
+    assert store.query('episodes', ['run', 'jerk_cost'], runs=['run1']).num_rows == 4
+    assert store.query('episodes', runs=['other']).num_rows == 0
+
+
+def test_metrics_store_compacts_checkpoint_flushes_on_close(tmp_path):
+    store = MetricsStore(tmp_path, run_id='run1')
+    for seed in range(5):                                           # one flush per checkpoint
+        store.append({'scene_family': 'forest', 'seed': seed, 'status': 'ok' if seed else 'plan_failed'})
+        store.flush()
+    assert len(list((tmp_path / 'episodes' / 'run=run1' / 'scene_family=forest').glob('*.parquet'))) == 5
+
+    store.close()
+    files = list((tmp_path / 'episodes' / 'run=run1' / 'scene_family=forest').glob('*.parquet'))
+    assert len(files) == 1
+    assert sorted(store.query('episodes', ['seed']).column('seed').to_pylist()) == list(range(5))
+    assert store.failure_rate() == {'forest': 0.2}
@@ -1,5 +1,364 @@
-"""Logging helpers for planner and controller modules."""
+"""Logging helpers for planner and controller modules.
 
-def record_metrics(metrics):
-    # TODO: Persist planner metrics to the data/qc directory
-    return None
+``record_metrics`` appends metric rows to a columnar store under
+``data/qc/metrics``; ``MetricsStore`` holds the rows in memory and writes
+them in batches as Parquet row groups, partitioned by table, run and scene
+family (hive layout, each flush one immutable file). Callers may flush often
+for durability (the planner runner flushes at every checkpoint); on close the
+files a store wrote are compacted into one file per partition::
+
+    metrics/<table>/run=<run_id>/scene_family=<family>/part-<session>-<pid>-00000.parquet
+
+Tables are free-form: the planner runner writes one ``episodes`` row per
+episode (trajectory metrics, status, QC flags) and ``timesteps`` columns
+(speed, jerk, clearance ... per recorded step). Queries scan only the
+projected columns of the matching partitions, so scorecards over millions
+of timestep rows never load everything at once:
+
+    >>> record_metrics(result.metrics)                              # one row (dict)
+    >>> record_metrics(per_step, table='timesteps', scene_family='forest')  # columns
+    >>> store = get_metrics_store()
+    >>> store.percentile('jerk', q=95, table='timesteps')           # {'forest': 41.2, ...}
+    >>> store.failure_rate()                                        # {'forest': 0.12, ...}
+    >>> edges, counts = store.histogram('clearance', bins=np.linspace(0, 2, 21))
+"""
+
+import atexit
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+PARTITION_KEYS = ('run', 'scene_family')
+UNKNOWN_FAMILY = 'unknown'
+FAILURE_FLAGS = ('qc_collision_free', 'qc_reached_goal')
+
+
+def _group_codes(column) -> Tuple[List[str], np.ndarray]:
+    """Group names and per-row group codes of a (chunked) pyarrow column."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    encoded = pc.dictionary_encode(pc.cast(column, pa.string()))
+    names = [str(name) for name in encoded.dictionary.to_pylist()]
+    return names, encoded.indices.to_numpy(zero_copy_only=False).astype(np.intp)
+
+
+def _to_arrow(column):
+    """pyarrow array of a buffered column (2-D arrays become fixed-size lists)."""
+    import pyarrow as pa
+
+    if isinstance(column, list):
+        return pa.array(column)
+    column = np.asarray(column)
+    if column.ndim > 1:
+        width = int(np.prod(column.shape[1:]))
+        return pa.FixedSizeListArray.from_arrays(pa.array(column.reshape(-1)), width)
+    return pa.array(column)
+
+
+class MetricsStore:
+    """Append-only, partitioned Parquet store of metric rows."""
+
+    def __init__(self, root='data/qc/metrics', run_id: Optional[str] = None,
+                 flush_rows: int = 65536, compression: str = 'zstd'):
+        """Initialize the store (nothing is written until the first flush).
+
+        Args:
+            root: Store directory (one subdirectory per table)
+            run_id: Partition of this run (default: start timestamp)
+            flush_rows: Buffered rows that trigger a flush (one row group per partition)
+            compression: Parquet codec
+        """
+        self.root = Path(root)
+        self.session = time.strftime('%Y%m%d_%H%M%S')
+        self.run_id = str(run_id) if run_id is not None else self.session
+        self.flush_rows = int(flush_rows)
+        self.compression = compression
+        # (table, scene_family) -> list of column chunks (dict of arrays or lists)
+        self._buffers: Dict[Tuple[str, str], List[Dict]] = defaultdict(list)
+        self._buffered_rows = 0
+        self._parts = 0
+        # (table, scene_family) -> files written by this store (compacted on close)
+        self._written: Dict[Tuple[str, str], List[Path]] = defaultdict(list)
+        self.rows_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, metrics, table: str = 'episodes', scene_family: Optional[str] = None) -> int:
+        """Buffer metric rows; returns the number of rows added.
+
+        Args:
+            metrics: One row (dict of scalars), a list of rows, or columns
+                (dict of equally long 1-D/2-D arrays, e.g. ``evaluate_metrics``
+                ``per_step``)
+            table: Table name
+            scene_family: Partition of the rows (default: their
+                ``scene_family`` value, else ``'unknown'``)
+        """
+        if isinstance(metrics, dict) and metrics and all(np.ndim(v) >= 1 for v in metrics.values()):
+            chunk = {key: np.asarray(value) for key, value in metrics.items()}
+        else:
+            rows = [metrics] if isinstance(metrics, dict) else list(metrics)
+            if not rows:
+                return 0
+            names = list(dict.fromkeys(key for row in rows for key in row))
+            chunk = {name: [_plain(row.get(name)) for row in rows] for name in names}
+        num_rows = len(next(iter(chunk.values())))
+        for key, value in chunk.items():
+            if len(value) != num_rows:
+                raise ValueError(f"Metric column '{key}' has {len(value)} rows, expected {num_rows}")
+
+        families = chunk.pop('scene_family', None)
+        if scene_family is not None or families is None:
+            self._buffers[(table, scene_family or UNKNOWN_FAMILY)].append(chunk)
+        else:
+            families = np.asarray(families, dtype=str)
+            for family in np.unique(families):
+                rows = np.flatnonzero(families == family)
+                self._buffers[(table, str(family))].append(
+                    {key: _take(value, rows) for key, value in chunk.items()})
+        self._buffered_rows += num_rows
+        if self._buffered_rows >= self.flush_rows:
+            self.flush()
+        return num_rows
+
+    def flush(self) -> List[Path]:
+        """Write every buffered partition as one Parquet file (temp file + rename)."""
+        import pyarrow as pa
+
+        paths = []
+        for (table, family), chunks in self._buffers.items():
+            names = list(dict.fromkeys(key for chunk in chunks for key in chunk))
+            parts = []
+            for chunk in chunks:
+                rows = len(next(iter(chunk.values())))
+                parts.append(pa.table({name: _to_arrow(chunk[name]) if name in chunk
+                                       else pa.nulls(rows) for name in names}))
+            data = pa.concat_tables(parts, promote_options='permissive')
+            path = self._write_part(table, family, data, row_group_size=max(data.num_rows, 1))
+            self._written[(table, family)].append(path)
+            self.rows_written += data.num_rows
+            paths.append(path)
+        self._buffers.clear()
+        self._buffered_rows = 0
+        return paths
+
+    def _write_part(self, table: str, family: str, data, row_group_size: int) -> Path:
+        """Write one partition file (temp file + rename) and return its path."""
+        import pyarrow.parquet as pq
+
+        directory = self.root / table / f"run={self.run_id}" / f"scene_family={family}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"part-{self.session}-{os.getpid()}-{self._parts:05d}.parquet"
+        tmp = path.with_name(f".{path.name}.tmp")             # dot prefix: ignored by dataset scans
+        pq.write_table(data, tmp, row_group_size=row_group_size, compression=self.compression)
+        os.replace(tmp, path)
+        self._parts += 1
+        return path
+
+    def compact(self) -> List[Path]:
+        """Merge the files this store wrote into one file per partition.
+
+        Rows are rewritten in row groups of ``flush_rows``; files of other
+        stores (earlier runs, other processes) are left alone. A query that
+        runs between the merged file appearing and the parts being removed
+        can see those rows twice.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        paths = []
+        for key, files in self._written.items():
+            if len(files) > 1:
+                data = pa.concat_tables([pq.ParquetFile(path).read() for path in files],
+                                        promote_options='permissive')
+                merged = self._write_part(*key, data, row_group_size=max(self.flush_rows, 1))
+                for path in files:
+                    path.unlink()
+                self._written[key] = [merged]
+            paths.extend(self._written[key])
+        return paths
+
+    def close(self):
+        """Flush the remaining rows and compact this store's files."""
+        if self._buffered_rows:
+            self.flush()
+        self.compact()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def dataset(self, table: str = 'episodes'):
+        """pyarrow Dataset of ``table`` over all runs (partition columns ``run``/``scene_family``).
+
+        Buffered rows of the table are flushed first. Files written with
+        different column sets are read with their unified schema.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        if any(key[0] == table for key in self._buffers):
+            self.flush()
+        path = self.root / table
+        partitioning = ds.partitioning(pa.schema([(key, pa.string()) for key in PARTITION_KEYS]), flavor='hive')
+        if not path.exists():
+            return ds.dataset(pa.table({}))
+        files = ds.dataset(path, format='parquet', partitioning=partitioning)
+        schema = pa.unify_schemas([fragment.physical_schema for fragment in files.get_fragments()]
+                                  + [partitioning.schema], promote_options='permissive')
+        return ds.dataset(path, format='parquet', partitioning=partitioning, schema=schema)
+
+    def query(self, table: str = 'episodes', columns: Optional[Sequence[str]] = None,
+              filter=None, runs: Optional[Sequence[str]] = None):
+        """Read (a projection of) ``table`` as a pyarrow Table.
+
+        Args:
+            table: Table name
+            columns: Column projection (default: all)
+            filter: Optional ``pyarrow.dataset`` expression
+            runs: Restrict to these run ids
+        """
+        import pyarrow as pa
+
+        dataset = self.dataset(table)
+        if not dataset.schema.names:
+            return pa.table({})
+        return dataset.to_table(columns=list(columns) if columns is not None else None,
+                                filter=_run_filter(runs, filter))
+
+    def percentile(self, column: str, q: float = 95.0, by: str = 'scene_family',
+                   table: str = 'timesteps', filter=None, runs: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """``q``-th percentile of ``column`` per ``by`` group (NaNs ignored)."""
+        data = self.query(table, [by, column], filter, runs)
+        if not data.num_rows:
+            return {}
+        groups, inverse = _group_codes(data.column(by))
+        values = data.column(column).to_numpy(zero_copy_only=False).astype(np.float64)
+        order = np.argsort(inverse, kind='stable')
+        splits = np.split(values[order], np.cumsum(np.bincount(inverse, minlength=len(groups)))[:-1])
+        return {group: float(np.nanpercentile(part, q)) if np.isfinite(part).any() else float('nan')
+                for group, part in sorted(zip(groups, splits), key=lambda item: item[0])}
+
+    def failure_rate(self, by: str = 'scene_family', table: str = 'episodes',
+                     flags: Sequence[str] = FAILURE_FLAGS, filter=None,
+                     runs: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """Fraction of rows per group whose ``status`` is not 'ok' or whose QC ``flags`` are not all true."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        dataset = self.dataset(table)
+        names = dataset.schema.names
+        columns = [by] + [name for name in ('status', *flags) if name in names]
+        data = self.query(table, columns, filter, runs)
+        if not data.num_rows:
+            return {}
+        failed = pa.array(np.zeros(data.num_rows, dtype=bool))
+        for name in columns[1:]:
+            if name == 'status':
+                # Missing status counts as a failure, missing QC flags do not
+                failed = pc.or_(failed, pc.fill_null(pc.not_equal(data.column(name), 'ok'), True))
+            else:
+                failed = pc.or_(failed, pc.fill_null(pc.invert(pc.cast(data.column(name), pa.bool_())), False))
+        grouped = pa.table({by: data.column(by), 'failed': pc.cast(failed, pa.float64())})
+        rates = grouped.group_by(by).aggregate([('failed', 'mean')])
+        return {str(group): float(rate) for group, rate in
+                sorted(zip(rates.column(by).to_pylist(), rates.column('failed_mean').to_pylist()),
+                       key=lambda item: str(item[0]))}
+
+    def histogram(self, column: str, bins, by: str = 'scene_family', table: str = 'timesteps',
+                  filter=None, runs: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Histogram of ``column`` per group, accumulated batch by batch.
+
+        Args:
+            column: Numeric column (e.g. ``clearance``)
+            bins: Bin edges (values outside are clipped into the end bins)
+
+        Returns:
+            (edges, {group: counts})
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        edges = np.asarray(bins, dtype=np.float64)
+        counts: Dict[str, np.ndarray] = {}
+        dataset = self.dataset(table)
+        if not dataset.schema.names:
+            return edges, counts
+        num_bins = len(edges) - 1
+        for batch in dataset.to_batches(columns=[by, column], filter=_run_filter(runs, filter)):
+            values = pc.cast(batch.column(1), pa.float64())
+            keep = pc.is_finite(values)                       # null for missing values: dropped too
+            groups, codes = _group_codes(pc.filter(batch.column(0), keep))
+            values = pc.filter(values, keep).to_numpy(zero_copy_only=False)
+            if not values.size:
+                continue
+            index = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, num_bins - 1)
+            binned = np.bincount(codes * num_bins + index, minlength=len(groups) * num_bins)
+            for group, row in zip(groups, binned.reshape(len(groups), num_bins)):
+                total = counts.setdefault(group, np.zeros(num_bins, dtype=np.int64))
+                total += row
+        return edges, dict(sorted(counts.items()))
+
+
+def _plain(value):
+    """Python scalar for numpy scalars (rows are built with ``pa.array``)."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _take(column, rows: np.ndarray):
+    return [column[i] for i in rows] if isinstance(column, list) else column[rows]
+
+
+def _run_filter(runs: Optional[Sequence[str]], filter=None):
+    import pyarrow.dataset as ds
+
+    if not runs:
+        return filter
+    expression = ds.field('run').isin([str(run) for run in runs])
+    return expression if filter is None else expression & filter
+
+
+# ----------------------------------------------------------------------
+# Process-wide store
+# ----------------------------------------------------------------------
+
+_STORE: Optional[MetricsStore] = None
+
+
+def get_metrics_store() -> MetricsStore:
+    """The process-wide store (created on first use, flushed at exit)."""
+    global _STORE
+    if _STORE is None:
+        configure_metrics_store()
+    return _STORE
+
+
+def configure_metrics_store(store: Optional[MetricsStore] = None, **kwargs) -> MetricsStore:
+    """Replace the process-wide store (``store`` or ``MetricsStore(**kwargs)``), closing the old one."""
+    global _STORE
+    if _STORE is not None:
+        _STORE.close()
+        atexit.unregister(_STORE.close)
+    _STORE = store if store is not None else MetricsStore(**kwargs)
+    atexit.register(_STORE.close)
+    return _STORE
+
+
+def record_metrics(metrics, table: str = 'episodes', scene_family: Optional[str] = None) -> int:
+    """Append planner/controller metrics to the process-wide store (see ``MetricsStore.append``)."""
+    return get_metrics_store().append(metrics, table=table, scene_family=scene_family)
@@ -0,0 +1,294 @@
+"""Opt-in stage timers for hot paths (simulation step, planner, controller).
+
+``StageProfiler`` aggregates wall-clock durations per named stage into
+log-spaced histograms (20 bins per decade, ~12% relative resolution from
+100 ns to 100 s), so memory is constant however long a run is and
+p50/p95/p99 can be reported at any time. Summaries are dumped as JSON to
+``data/qc/profiles`` every ``dump_interval_s`` (via ``maybe_dump``, called
+once per step) and on ``close``.
+
+When disabled, ``stage()`` returns a shared no-op context manager and
+``profiled`` wrappers call straight through, so instrumentation can stay in
+the code permanently. Modules instrument through the process-wide profiler
+(``get_profiler``/``configure_profiler``) unless they own one:
+
+    >>> from tools.profiling import configure_profiler, profile_stage, profiled
+    >>> configure_profiler(enabled=True, name='smoke_test')
+    >>> with profile_stage('physics'):
+    ...     world.step()
+    >>> @profiled('controller')
+    ... def compute(state, reference): ...
+    >>> get_profiler().summary()['physics']['p95_ms']
+"""
+
+import functools
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+MIN_TIME_NS = 100                   # first histogram bin edge
+BINS_PER_DECADE = 20
+NUM_BINS = 9 * BINS_PER_DECADE      # 100 ns .. 100 s
+PERCENTILES = (50, 95, 99)
+
+
+class _Histogram:
+    """Log-binned duration histogram with exact count/total/max."""
+
+    __slots__ = ('counts', 'count', 'total_ns', 'max_ns', 'errors')
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (NUM_BINS + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.errors = 0
+
+    def add(self, elapsed_ns: int):
+        index = int(math.log10(max(elapsed_ns, MIN_TIME_NS) / MIN_TIME_NS) * BINS_PER_DECADE)
+        self.counts[min(index, NUM_BINS)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def percentile_ns(self, q: float) -> float:
+        """Geometric centre of the bin holding the ``q``-th percentile (clamped to max)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q / 100.0 * self.count, 0
+        for index, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                break
+        centre = MIN_TIME_NS * 10 ** ((index + 0.5) / BINS_PER_DECADE)
+        return min(centre, float(self.max_ns))
+
+
+class _StageTimer:
+    """Reusable context manager timing one stage (nesting-safe).
+
+    One instance is shared by every caller of a stage name and neither its
+    start stack nor the histogram is locked, so it is not thread-safe: time
+    a stage from one thread only (or give each thread its own profiler).
+    """
+
+    __slots__ = ('histogram', 'starts')
+
+    def __init__(self, histogram: _Histogram):
+        self.histogram = histogram
+        self.starts: List[int] = []
+
+    def __enter__(self):
+        self.starts.append(time.perf_counter_ns())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.add(time.perf_counter_ns() - self.starts.pop())
+        if exc_type is not None:
+            self.histogram.errors += 1
+        return False
+
+
+class _NullTimer:
+    """No-op stand-in returned while profiling is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class StageProfiler:
+    """Per-stage duration histograms with periodic JSON dumps.
+
+    Not thread-safe: stages are meant to be timed from the thread running
+    the loop being profiled (see ``_StageTimer``).
+
+    Example:
+        >>> profiler = StageProfiler(name='isaac_step', enabled=True)
+        >>> with profiler.stage('physics'):
+        ...     world.step()
+        >>> profiler.maybe_dump()
+    """
+
+    def __init__(self, name: str = 'profile', enabled: bool = True,
+                 output_dir='data/qc/profiles', dump_interval_s: float = 60.0):
+        """Initialize the profiler.
+
+        Args:
+            name: File stem of the dumps (a start timestamp is appended)
+            enabled: Record timings; when False every call is a no-op
+            output_dir: Directory of the JSON dumps
+            dump_interval_s: Minimum time between ``maybe_dump`` writes (<= 0 disables)
+        """
+        self.name = name
+        self.enabled = bool(enabled)
+        self.output_dir = Path(output_dir)
+        self.dump_interval_s = float(dump_interval_s)
+        self.session = time.strftime('%Y%m%d_%H%M%S')
+        self.histograms: Dict[str, _Histogram] = {}
+        self._timers: Dict[str, _StageTimer] = {}
+        self._started = time.time()
+        self._next_dump = time.monotonic() + self.dump_interval_s
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict], name: str = 'profile') -> 'StageProfiler':
+        """Build from a ``profiling`` config section (``enabled``, ``output_dir``, ``dump_interval_s``).
+
+        The ``UAV_PROFILE=1`` environment variable enables profiling regardless of the config.
+        """
+        config = config or {}
+        enabled = bool(config.get('enabled', False)) or os.environ.get('UAV_PROFILE', '') not in ('', '0')
+        return cls(name=name, enabled=enabled,
+                   output_dir=str(config.get('output_dir', 'data/qc/profiles')).replace('\\', '/'),
+                   dump_interval_s=config.get('dump_interval_s', 60.0))
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def _histogram(self, stage: str) -> _Histogram:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = _Histogram()
+        return histogram
+
+    def stage(self, stage: str):
+        """Context manager timing the enclosed block as ``stage``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        timer = self._timers.get(stage)
+        if timer is None:
+            timer = self._timers[stage] = _StageTimer(self._histogram(stage))
+        return timer
+
+    def record(self, stage: str, seconds: float):
+        """Add an externally measured duration."""
+        if self.enabled:
+            self._histogram(stage).add(int(seconds * 1e9))
+
+    def error(self, stage: str):
+        """Count an exception that was handled inside ``stage``."""
+        if self.enabled:
+            self._histogram(stage).errors += 1
+
+    def timed(self, stage: Optional[str] = None) -> Callable:
+        """Decorator timing every call of a function (default stage: its qualified name)."""
+        def decorate(fn):
+            name = stage or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        """Drop all recorded timings."""
+        self.histograms.clear()
+        self._timers.clear()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, error count, mean/p50/p95/p99/max (ms) and total (s) per stage."""
+        summary = {}
+        for stage, h in sorted(self.histograms.items()):
+            entry = {'count': h.count, 'errors': h.errors, 'total_s': h.total_ns * 1e-9,
+                     'mean_ms': h.total_ns / h.count * 1e-6 if h.count else 0.0}
+            for q in PERCENTILES:
+                entry[f'p{q}_ms'] = h.percentile_ns(q) * 1e-6
+            entry['max_ms'] = h.max_ns * 1e-6
+            summary[stage] = entry
+        return summary
+
+    def dump(self, path=None) -> Optional[Path]:
+        """Write the summary and raw histograms as JSON (atomically); returns the path."""
+        if not self.enabled or not self.histograms:
+            return None
+        path = Path(path) if path is not None else self.output_dir / f"{self.name}_{self.session}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            'name': self.name,
+            'started_unix': self._started,
+            'dumped_unix': time.time(),
+            'histogram': {'min_ns': MIN_TIME_NS, 'bins_per_decade': BINS_PER_DECADE},
+            'stages': self.summary(),
+            'bins': {stage: {str(i): c for i, c in enumerate(h.counts) if c}
+                     for stage, h in self.histograms.items()},
+        }
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+        return path
+
+    def maybe_dump(self) -> Optional[Path]:
+        """``dump`` if ``dump_interval_s`` has passed since the last one."""
+        if not self.enabled or self.dump_interval_s <= 0 or time.monotonic() < self._next_dump:
+            return None
+        self._next_dump = time.monotonic() + self.dump_interval_s
+        return self.dump()
+
+    def format_table(self) -> str:
+        """Human-readable summary table."""
+        lines = [f"{'stage':<28}{'count':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'total s':>10}"]
+        for stage, s in self.summary().items():
+            lines.append(f"{stage:<28}{s['count']:>9d}{s['p50_ms']:>10.3f}{s['p95_ms']:>10.3f}"
+                         f"{s['p99_ms']:>10.3f}{s['max_ms']:>10.3f}{s['total_s']:>10.2f}")
+        return "\n".join(lines)
+
+
+# ----------------------------------------------------------------------
+# Process-wide profiler
+# ----------------------------------------------------------------------
+
+_PROFILER = StageProfiler.from_config(None, name='process')
+
+
+def get_profiler() -> StageProfiler:
+    """The process-wide profiler (disabled unless configured or ``UAV_PROFILE`` is set)."""
+    return _PROFILER
+
+
+def configure_profiler(profiler: Optional[StageProfiler] = None, **kwargs) -> StageProfiler:
+    """Replace the process-wide profiler (``profiler`` or ``StageProfiler(**kwargs)``)."""
+    global _PROFILER
+    _PROFILER = profiler if profiler is not None else StageProfiler(**kwargs)
+    return _PROFILER
+
+
+def profile_stage(stage: str):
+    """Context manager timing ``stage`` on the process-wide profiler."""
+    return _PROFILER.stage(stage)
+
+
+def profiled(stage: Optional[str] = None) -> Callable:
+    """Decorator timing a function on whichever profiler is process-wide at call time."""
+    def decorate(fn):
+        name = stage or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = _PROFILER
+            if not profiler.enabled:
+                return fn(*args, **kwargs)
+            with profiler.stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate